@@ -17,35 +17,56 @@ import sys
 
 from src.backtest_stats import BacktestStats
 from src.input_data import InputData
+from src.profiler import StageProfiler
 from src.run_backtest import RunBacktest
 from src.stocks_fetcher import StocksFetcher
+from src.weights_cache import WeightsCache
 
 sys.path.append("/.../src")
 
 if __name__ == "__main__":
     # Getting user input
     user_input = InputData()
+    profiler = StageProfiler(enabled=user_input.get_profile())
 
     # Initialising and fetching stocks data
-    fetcher = StocksFetcher()
-    stocks_data = fetcher.fetch_stocks_data(
-        tickers=user_input.get_tickers(),
-        beginning_date=user_input.get_beginning_date(),
-        ending_date=user_input.get_ending_date(),
-    )
+    fetcher = StocksFetcher(cache_dir=user_input.get_cache_dir())
+    with profiler.stage("fetch_stocks_data"):
+        stocks_data = fetcher.fetch_stocks_data(
+            tickers=user_input.get_tickers(),
+            beginning_date=user_input.get_beginning_date(),
+            ending_date=user_input.get_ending_date(),
+            lookback=user_input.get_lookback(),
+        )
 
     # Running the backtest simulation
-    backtest = RunBacktest(
-        stocks_data=stocks_data,
-        initial_aum=user_input.get_initial_aum(),
-        beginning_date=user_input.get_beginning_date(),
-        optimizer=user_input.get_optimizer(),
-    )
-    backtest.fill_up_portfolio_performance()
+    optimizers = user_input.get_optimizers()
+    weights_cache_dir = user_input.get_weights_cache()
+    with profiler.stage("backtest"):
+        backtest = RunBacktest(
+            stocks_data=stocks_data,
+            initial_aum=user_input.get_initial_aum(),
+            beginning_date=user_input.get_beginning_date(),
+            optimizer=optimizers[0] if len(optimizers) == 1 else optimizers,
+            lookback=user_input.get_lookback(),
+            rebalance=user_input.get_rebalance(),
+            n_workers=user_input.get_workers(),
+            cov=user_input.get_cov(),
+            profiler=profiler,
+            time_budget=user_input.get_time_budget(),
+            warm_start=user_input.get_warm_start(),
+            weights_cache=None if weights_cache_dir is None
+            else WeightsCache(weights_cache_dir),
+            hrp_mode=user_input.get_hrp_mode(),
+        )
+        backtest.fill_up_portfolio_performance()
+    for fallback in backtest.fallback_record:
+        print(f"Rebalance on {fallback['datetime']} of {fallback['optimizer']}"
+              f" fell back to {fallback['fallback']}: {fallback['reason']}")
 
     # Getting the backtest performance and portfolio weights
     portfolio_perf = backtest.portfolio_performance
-    weights_rec = backtest.weights_record
+    weights_rec = backtest.history
 
     # Calculating backtest statistics
     backtest_statistics = BacktestStats(
@@ -53,6 +74,22 @@ if __name__ == "__main__":
     )
 
     # Printing statistics summary and geenrating plots
-    backtest_statistics.print_summary()
+    with profiler.stage("backtest_stats"):
+        backtest_statistics.print_summary()
     if user_input.get_plot_weights():
-        backtest_statistics.plot_portfolio_weights()
+        with profiler.stage("plot_weights"):
+            if len(optimizers) == 1:
+                backtest_statistics.plot_portfolio_weights()
+            else:
+                for optimizer, stats in \
+                        backtest_statistics.get_strategy_stats().items():
+                    stats.plot_portfolio_weights(
+                        f"portfolio_weights_{optimizer}"
+                    )
+
+    # Printing and saving the profile
+    if user_input.get_profile():
+        profiler.close()
+        profiler.print_report()
+        if user_input.get_profile_json() is not None:
+            profiler.dump_json(user_input.get_profile_json())
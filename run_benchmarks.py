@@ -0,0 +1,106 @@
+"""
+Benchmarks the backtest on synthetic markets of increasing size and writes
+the time and memory spent in each stage to a JSON file, so the throughput
+of each commit can be compared.
+"""
+import argparse
+import sys
+from typing import Any, Dict
+
+from src.benchmark_suite import (
+    DEFAULT_OPTIMIZERS,
+    DEFAULT_TICKERS,
+    DEFAULT_YEARS,
+    BenchmarkSuite,
+)
+from src.trading_calendar import DEFAULT_LOOKBACK
+
+sys.path.append("/.../src")
+
+# Constants
+DEFAULT_OUTPUT = "benchmarks.json"
+
+
+def get_args() -> argparse.ArgumentParser:
+    """
+    argparse.ArgumentParser: Returns the parser of the benchmark command
+        line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="""Benchmarks the backtest on synthetic markets
+    over a grid of numbers of tickers, years and optimizers."""
+    )
+    parser.add_argument(
+        "--tickers",
+        type=str,
+        help="The comma-separated numbers of tickers (optional, defaults to "
+        "10,100,1000)",
+        default=",".join(map(str, DEFAULT_TICKERS)),
+    )
+    parser.add_argument(
+        "--years",
+        type=str,
+        help="The comma-separated numbers of years (optional, defaults to "
+        "1,5,20)",
+        default=",".join(map(str, DEFAULT_YEARS)),
+    )
+    parser.add_argument(
+        "--optimizers",
+        type=str,
+        help="The comma-separated optimizers (optional, defaults to "
+        "msr,mv,hrp)",
+        default=",".join(DEFAULT_OPTIMIZERS),
+    )
+    parser.add_argument(
+        "--lookback",
+        type=int,
+        help="The number of trading days in the rolling window (optional, "
+        "defaults to 250)",
+        default=DEFAULT_LOOKBACK,
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="The seed of the synthetic markets (optional, defaults to 0)",
+        default=0,
+    )
+    parser.add_argument(
+        "--no_memory",
+        help="To skip tracing the peak memory, which slows the backtests",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="The path of the JSON results (optional, defaults to "
+        "benchmarks.json)",
+        default=DEFAULT_OUTPUT,
+    )
+    return parser
+
+
+def print_case(case: Dict[str, Any]) -> None:
+    """
+    None: Prints a line summarising the result of a benchmark case.
+    """
+    outcome = f"error: {case['error']}" if case["error"] else \
+        f"{case['n_rebalances']} rebalances"
+    print(f"{case['n_tickers']:>6} tickers {case['n_years']:>4} years "
+          f"{case['optimizer']:>4}: {case['wall_time']:9.3f}s "
+          f"{case['peak_memory'] / 2**20:9.2f}MiB ({outcome})")
+
+
+if __name__ == "__main__":
+    args = get_args().parse_args()
+    suite = BenchmarkSuite(
+        tickers_grid=[int(n_tickers) for n_tickers in args.tickers.split(",")],
+        years_grid=[float(n_years) for n_years in args.years.split(",")],
+        optimizers=[optimizer.strip().lower()
+                    for optimizer in args.optimizers.split(",")],
+        lookback=args.lookback,
+        seed=args.seed,
+        trace_memory=not args.no_memory,
+    )
+    results = suite.run(callback=print_case)
+    BenchmarkSuite.dump_json(results, args.output)
+    print(f"Results written to {args.output}")
@@ -3,29 +3,53 @@ This module is responsible for the backtest statistics.
 """
 from collections import OrderedDict
 from math import sqrt
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from matplotlib import animation
 
+from src.portfolio_history import PortfolioHistory
+
 # Constants
 DATETIME = "datetime"
 AUM = "aum"
 IC = "ic"
 TRADING_DAYS_PER_YEAR = 250
+METRIC_COLUMNS = [
+    "annual_return",
+    "annual_volatility",
+    "annual_sharpe_ratio",
+    "total_return",
+    "profit_loss",
+    "final_aum",
+]
 
 
 class BacktestStats:
     """
     Defines the BacktestStats class which calculates statistics based
     on the backtest portfolio performance and monthly portfolio weights.
+    A backtest of several optimizers has one AUM column and one weights
+    record per optimizer, and the statistics are calculated for the
+    strategy in aum_column. The weights record is either the portfolio
+    history of the backtest, which is read as arrays, or a tuple of lists.
+    The daily returns and their moments are computed once with NumPy and
+    memoized until the portfolio performance is replaced or grows, or
+    invalidate is called after modifying it in place.
     """
 
     def __init__(
         self,
         portfolio_performance: pd.DataFrame,
-        weights_record: Tuple[List[str], List[OrderedDict[str, float]]],
+        weights_record: Union[
+            PortfolioHistory,
+            Tuple[List[str], List[OrderedDict[str, float]]],
+            Dict[str, Union[PortfolioHistory,
+                            Tuple[List[str], List[OrderedDict[str, float]]]]],
+        ],
+        aum_column: Optional[str] = None,
     ):
         """
         This method initialises the BacktestStats class.
@@ -34,33 +58,103 @@ class BacktestStats:
             portfolio_performance (pd.Dataframe): The dataframe containing
                 the portfolio performance information calculated during the
                 backtest simulation.
-            weights_record (Tuple[List[str], List[OrderedDict[str, float]]]):
-                The tuple containing the portfolio weight information
-                calculated during the backtest simulation.
+            weights_record (Union[PortfolioHistory, Tuple[List[str],
+                List[OrderedDict[str, float]]], Dict[str, ...]]): The
+                portfolio history of the backtest simulation, or the tuple
+                containing the portfolio weight information calculated
+                during it, or a dictionary of either keyed by optimizer.
+            aum_column (Optional[str]): The column of the AUM of the
+                strategy. Defaults to "aum", or to the first optimizer of a
+                dictionary of weights records.
         """
         self.portfolio_performance: pd.DataFrame = portfolio_performance
-        self.weights_record: Tuple[
-            List[str], List[OrderedDict[str, float]]
-        ] = weights_record
+        self.weights_records: Dict[
+            str, Union[PortfolioHistory,
+                       Tuple[List[str], List[OrderedDict[str, float]]]]
+        ] = weights_record if isinstance(weights_record, dict) else {}
+        if aum_column is None:
+            aum_column = next(iter(self.weights_records), AUM)
+        self.aum_column: str = aum_column
+        self.weights_record: Union[
+            PortfolioHistory, Tuple[List[str], List[OrderedDict[str, float]]]
+        ] = self.weights_records.get(aum_column, weights_record)
 
         """
         beginning_trading_date (pd.Timestamp): The timestamp of the
             beginning trading day.
         ending_trading_date (pd.Timestamp): The timestamp of the
             ending trading day.
+        cached_performance (Optional[pd.DataFrame]): The portfolio
+            performance which the memoized statistics were computed from.
+        cached_length (int): The number of rows of the portfolio
+            performance when the statistics were computed.
+        cached_stats (Dict[str, Any]): The memoized daily returns and their
+            moments.
+        """
+        self.beginning_trading_date: pd.Timestamp = \
+            self.portfolio_performance[DATETIME].iloc[0]
+        self.ending_trading_date: pd.Timestamp = \
+            self.portfolio_performance[DATETIME].iloc[-1]
+        self.cached_performance: Optional[pd.DataFrame] = None
+        self.cached_length: int = 0
+        self.cached_stats: Dict[str, Any] = {}
+
+    def get_aum(self) -> np.ndarray:
+        """
+        np.ndarray: Returns the daily AUM of the strategy.
+        """
+        return self.portfolio_performance[self.aum_column].to_numpy(
+            dtype="float64"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Computes the daily returns of the strategy and their moments, unless
+        they were computed from the same portfolio performance with the same
+        number of rows before. Checking this costs O(1) rather than a
+        comparison of the whole AUM, so changes made to the AUM in place
+        must be followed by a call to invalidate.
+
+        Returns:
+            Dict[str, Any]: Returns the AUM ("aum"), the daily returns
+                ("daily_returns"), their mean ("mean") and their population
+                standard deviation ("std").
+        """
+        if self.cached_performance is self.portfolio_performance and \
+                self.cached_length == len(self.portfolio_performance):
+            return self.cached_stats
+
+        aum = self.get_aum().copy()
+        daily_returns = np.diff(aum) / aum[:-1]
+        mean = daily_returns.mean() if len(daily_returns) else np.nan
+        deviations = daily_returns - mean
+        self.cached_performance = self.portfolio_performance
+        self.cached_length = len(self.portfolio_performance)
+        self.cached_stats = {
+            "aum": aum,
+            "daily_returns": daily_returns,
+            "mean": float(mean),
+            "std": float(sqrt(deviations @ deviations / len(daily_returns)))
+            if len(daily_returns) else np.nan,
+        }
+        return self.cached_stats
+
+    def invalidate(self) -> None:
+        """
+        None: Discards the memoized statistics, so that they are computed
+            again after the AUM was modified in place.
         """
-        self.beginning_trading_date: pd.Timestamp = self.portfolio_performance[
-            DATETIME
-        ][0]
-        self.ending_trading_date: pd.Timestamp = list(
-            self.portfolio_performance[DATETIME]
-        )[-1]
+        self.cached_performance = None
+        self.cached_stats = {}
 
     def get_number_of_days(self) -> int:
         """
         int: Returns the number of calendar days from the beginning date
             to the ending date.
         """
+        dates = self.portfolio_performance[DATETIME]
+        self.beginning_trading_date = dates.iloc[0]
+        self.ending_trading_date = dates.iloc[-1]
         return (self.ending_trading_date - self.beginning_trading_date)\
             .round("1d").days
 
@@ -68,13 +162,13 @@ class BacktestStats:
         """
         float: Returns the initial assets under management amount.
         """
-        return self.portfolio_performance[AUM][0]
+        return float(self.get_stats()["aum"][0])
 
     def get_final_aum(self) -> float:
         """
         float: Returns the final assets under management amount.
         """
-        return list(self.portfolio_performance[AUM])[-1]
+        return float(self.get_stats()["aum"][-1])
 
     def get_profit_loss(self) -> float:
         """
@@ -105,39 +199,20 @@ class BacktestStats:
         """
         List[float]: Returns a list of daily returns of the portfolio.
         """
-        daily_returns = []
-        daily_aum_list = list(self.portfolio_performance[AUM])
-        for idx, daily_aum in enumerate(daily_aum_list[1:]):
-            yesterday_aum = daily_aum_list[idx - 1]
-            daily_return = (daily_aum - yesterday_aum) / yesterday_aum
-            daily_returns.append(daily_return)
-        return daily_returns
+        return self.get_stats()["daily_returns"].tolist()
 
     def get_average_daily_return(self) -> float:
         """
         float: Returns the average daily return of the portfolio.
         """
-        daily_returns = self.get_daily_returns()
-        return sum(daily_returns) / len(daily_returns)
+        return self.get_stats()["mean"]
 
     def get_daily_standard_deviation(self) -> float:
         """
         float: Returns the standard deviation of the daily returns
             of the portfolio.
         """
-        daily_returns = self.get_daily_returns()
-        average_daily_return = self.get_average_daily_return()
-        daily_deviations = [
-            daily_return - average_daily_return \
-                for daily_return in daily_returns
-        ]
-        squared_daily_deviations = [
-            daily_deviation**2 for daily_deviation in daily_deviations
-        ]
-        average_squared_daily_deviations = sum(squared_daily_deviations) / len(
-            squared_daily_deviations
-        )
-        return sqrt(average_squared_daily_deviations)
+        return self.get_stats()["std"]
 
     def get_annualized_volatility(self) -> float:
         """
@@ -169,11 +244,76 @@ class BacktestStats:
         """
         return self.get_daily_sharpe_ratio() * sqrt(TRADING_DAYS_PER_YEAR)
 
+    def get_weights_frame(self) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns the portfolio weights with a row per rebalance
+            date, in format YYYY-MM-DD, and a column per ticker.
+        """
+        if isinstance(self.weights_record, PortfolioHistory):
+            return self.weights_record.get_weights_frame()
+        return pd.DataFrame(self.weights_record[1],
+                            index=self.weights_record[0])
+
+    def get_strategy_stats(self) -> Dict[str, "BacktestStats"]:
+        """
+        Dict[str, BacktestStats]: Returns the statistics of each optimizer
+            of a backtest of several optimizers.
+        """
+        return {
+            optimizer: BacktestStats(self.portfolio_performance,
+                                     weights_record, aum_column=optimizer)
+            for optimizer, weights_record in self.weights_records.items()
+        }
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Dict[str, float]: Returns the portfolio statistics keyed by their
+            column names in result tables.
+        """
+        return {
+            "annual_return": self.get_annualized_rate_of_return(),
+            "annual_volatility": self.get_annualized_volatility(),
+            "annual_sharpe_ratio": self.get_annualized_sharpe_ratio(),
+            "total_return": self.get_total_stock_return(),
+            "profit_loss": self.get_profit_loss(),
+            "final_aum": self.get_final_aum(),
+        }
+
+    def get_summary(self) -> Dict[str, str]:
+        """
+        Dict[str, str]: Returns the formatted portfolio statistics keyed by
+            their names.
+        """
+        return {
+            "Annual Return":
+                f"{self.get_annualized_rate_of_return() * 100:.3f}%",
+            "Annual Volatility":
+                f"{self.get_annualized_volatility() * 100:.3f}%",
+            "Annual Sharpe Ratio":
+                f"{self.get_annualized_sharpe_ratio():.5f}",
+            "Total Stock Return":
+                f"{self.get_total_stock_return() * 100:.3f}%",
+            "Profit and Loss": f"{self.get_profit_loss():.5f}",
+        }
+
     def print_summary(self) -> None:
         """
         None: Prints the formatted summary of the calculated portfolio
-            statistics.
-        """
+            statistics, side by side for a backtest of several optimizers.
+        """
+        if self.weights_records:
+            summaries = {
+                optimizer.upper(): stats.get_summary()
+                for optimizer, stats in self.get_strategy_stats().items()
+            }
+            table = pd.DataFrame(summaries)
+            print(f"""
+    Backtest Stats
+
+{table.to_string()}
+    """)
+            return
+
         out_str = f"""
     Backtest Stats
 
@@ -203,8 +343,7 @@ class BacktestStats:
             None: Generates a plot of the portfolio weights and saves it to
                 a file.
         """
-        weights = pd.DataFrame(self.weights_record[1],
-                               index=self.weights_record[0])
+        weights = self.get_weights_frame()
 
         if plot == "line":
             weights.index = pd.to_datetime(weights.index)
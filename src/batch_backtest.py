@@ -0,0 +1,232 @@
+"""
+This module is responsible for backtesting many subsets of one universe of
+stocks together.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+from pypfopt.exceptions import OptimizationError
+
+from src.backtest_stats import METRIC_COLUMNS, BacktestStats
+from src.rebalance_calendar import (
+    MONTH_END,
+    RebalanceCalendar,
+    get_rebalance_calendar,
+)
+from src.rolling_moments import RollingMoments
+from src.run_backtest import RunBacktest
+from src.stocks_fetcher import StocksFetcher
+from src.subset_moments import SubsetMoments
+from src.trading_calendar import DEFAULT_LOOKBACK
+
+# Constants
+SUBSET = "subset"
+TICKERS = "tickers"
+OPTIMIZER = "optimizer"
+RESULT_COLUMNS = [SUBSET, TICKERS, OPTIMIZER] + METRIC_COLUMNS + ["error"]
+
+
+def get_column_views(stocks_data: pd.DataFrame,
+                     tickers: List[str]) -> pd.DataFrame:
+    """
+    Builds a dataframe of some columns of the stocks data whose columns are
+    views of the columns of the stocks data. Selecting the columns with
+    stocks_data[tickers] would copy their prices into a new matrix.
+
+    Args:
+        stocks_data (pd.DataFrame): The prices of the universe.
+        tickers (List[str]): The tickers of the columns.
+
+    Returns:
+        pd.DataFrame: Returns the prices of the tickers, which share memory
+            with the stocks data and must not be modified in place.
+    """
+    return pd.concat([stocks_data[ticker] for ticker in tickers], axis=1,
+                     copy=False)
+
+
+class BatchBacktest:
+    """
+    Defines the BatchBacktest class which backtests the same strategy on
+    many subsets of one universe of stocks, e.g. client portfolios drawn
+    from a master universe. The prices are given once for the union of the
+    subsets, and the rolling moments are computed once for the union. The
+    expected returns and covariance matrix of each subset are sliced out of
+    them, and the subsets are moved through the rebalance dates together,
+    so the cost of the moments scales with the union rather than with the
+    sum of the subsets. The prices of the union are also stored once, and
+    each subset reads its columns through views of them. The optimizations
+    and the AUM of each subset are then computed as in a backtest of the
+    subset alone.
+    """
+
+    def __init__(
+        self,
+        stocks_data: pd.DataFrame,
+        initial_aum: int,
+        beginning_date: str,
+        optimizer: Union[str, List[str]],
+        subsets: List[List[str]],
+        *,
+        lookback: int = DEFAULT_LOOKBACK,
+        rebalance: Union[str, RebalanceCalendar] = MONTH_END,
+    ) -> None:
+        """
+        This method initialises the BatchBacktest class.
+
+        Args:
+            stocks_data (pd.DataFrame): The dataframe containing the adjusted
+                close price of every ticker of the subsets throughout the
+                time frame.
+            initial_aum (int): The initial asset under management amount of
+                each subset.
+            beginning_date (str): The beginning date of the backtest period.
+            optimizer (Union[str, List[str]]): The optimizer to use for
+                asset allocation, or a list of optimizers. See RunBacktest.
+            subsets (List[List[str]]): The tickers of each subset.
+            lookback (int): The number of trading days in the rolling window
+                used by the optimizer. Defaults to 250.
+            rebalance (Union[str, RebalanceCalendar]): The rebalance
+                calendar, or its frequency. Defaults to "month_end".
+
+        Raises:
+            ValueError: If there are no subsets, if a subset is empty or has
+                tickers which are not in the stocks data, or if the stocks
+                data does not hold a full lookback window before the first
+                rebalance date.
+        """
+        if not subsets or any(len(subset) == 0 for subset in subsets):
+            raise ValueError("Subsets must be a non-empty list of non-empty "
+                             "lists of tickers.")
+        union = list(OrderedDict.fromkeys(
+            ticker for subset in subsets for ticker in subset
+        ))
+        missing = pd.Index(union).difference(stocks_data.columns)
+        if len(missing) > 0:
+            raise ValueError("Stocks data is missing tickers: "
+                             + ", ".join(map(str, missing)))
+        self.subsets: List[List[str]] = [list(subset) for subset in subsets]
+        self.optimizers: List[str] = \
+            [optimizer] if isinstance(optimizer, str) else list(optimizer)
+
+        # drop the prices before the first lookback window, like RunBacktest
+        rebalance_indexes = np.flatnonzero(
+            get_rebalance_calendar(rebalance).get_rebalance_mask(
+                stocks_data.index, beginning_date
+            )
+        )
+        start = max(0, rebalance_indexes[0] - lookback + 1) \
+            if len(rebalance_indexes) else 0
+
+        """
+        stocks_data (pd.DataFrame): The prices of the union of the subsets
+            from the lookback window of the first rebalance date, which the
+            backtests of the subsets share.
+        moments (RollingMoments): The rolling moments of the union.
+        backtests (List[RunBacktest]): The backtest of each subset, whose
+            moments are sliced out of the moments of the union. They have an
+            AUM column per optimizer, like a backtest of several optimizers.
+        errors (List[Optional[str]]): The error of each subset whose
+            backtest failed, or None.
+        """
+        self.stocks_data: pd.DataFrame = stocks_data[union][start:]
+        self.moments: RollingMoments = RollingMoments(self.stocks_data,
+                                                      lookback)
+        self.backtests: List[RunBacktest] = []
+        for subset in self.subsets:
+            subset_data = get_column_views(self.stocks_data, subset)
+            self.backtests.append(RunBacktest(
+                subset_data, initial_aum, beginning_date, self.optimizers,
+                lookback=lookback, rebalance=rebalance,
+                moments=SubsetMoments(subset_data, self.moments),
+            ))
+        self.errors: List[Optional[str]] = [None] * len(self.subsets)
+
+    @staticmethod
+    def fetch_stocks_data(
+        fetcher: StocksFetcher,
+        subsets: List[List[str]],
+        beginning_date: str,
+        ending_date: str,
+        lookback: int = DEFAULT_LOOKBACK,
+    ) -> pd.DataFrame:
+        """
+        Fetches the prices of the union of the subsets once.
+
+        Args:
+            fetcher (StocksFetcher): The fetcher of the stocks data.
+            subsets (List[List[str]]): The tickers of each subset.
+            beginning_date (str): The beginning date of the backtest period.
+            ending_date (str): The ending date of the backtest period.
+            lookback (int): The number of trading days in the rolling window.
+                Defaults to 250.
+
+        Returns:
+            pd.DataFrame: Returns the prices of every ticker of the subsets.
+        """
+        tickers = sorted({ticker for subset in subsets for ticker in subset})
+        return fetcher.fetch_stocks_data(tickers, beginning_date, ending_date,
+                                         lookback=lookback)
+
+    def optimize_rebalances(self) -> List[Dict[str, List[OrderedDict]]]:
+        """
+        Calculates the portfolio weights of every subset at every rebalance
+        date, date by date, so the window of the union is moved once per
+        date. A subset whose optimization fails records its error and is
+        not optimized any further.
+
+        Returns:
+            List[Dict[str, List[OrderedDict]]]: Returns the weights at each
+                rebalance date for each optimizer of each subset.
+        """
+        rebalance_weights = [
+            {optimizer: [] for optimizer in self.optimizers}
+            for _ in self.backtests
+        ]
+        for date_index in self.backtests[0].rebalance_indexes:
+            for position, backtest in enumerate(self.backtests):
+                if self.errors[position] is not None:
+                    continue
+                try:
+                    weights = backtest.optimize_rebalances([date_index])
+                except (ValueError, OptimizationError,
+                        cp.SolverError) as error:
+                    self.errors[position] = str(error)
+                    continue
+                for optimizer, optimizer_weights in weights.items():
+                    rebalance_weights[position][optimizer] += \
+                        optimizer_weights
+        return rebalance_weights
+
+    def run(self) -> pd.DataFrame:
+        """
+        Backtests every subset and calculates its statistics.
+
+        Returns:
+            pd.DataFrame: Returns the statistics of each optimizer of each
+                subset, with the error of the subsets which failed.
+        """
+        rebalance_weights = self.optimize_rebalances()
+        rows: List[Dict[str, Any]] = []
+        for position, backtest in enumerate(self.backtests):
+            stats = {}
+            if self.errors[position] is None:
+                backtest.fill_up_portfolio_performance(
+                    rebalance_weights[position]
+                )
+                stats = BacktestStats(backtest.portfolio_performance,
+                                      backtest.history).get_strategy_stats()
+            for optimizer in self.optimizers:
+                row = {
+                    SUBSET: position,
+                    TICKERS: ",".join(self.subsets[position]),
+                    OPTIMIZER: optimizer,
+                    "error": self.errors[position] or "",
+                }
+                if optimizer in stats:
+                    row.update(stats[optimizer].get_metrics())
+                rows.append(row)
+        return pd.DataFrame(rows, columns=RESULT_COLUMNS)
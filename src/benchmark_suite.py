@@ -0,0 +1,215 @@
+"""
+This module is responsible for benchmarking the backtest over scaling grids
+of synthetic markets.
+"""
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pypfopt
+
+from src.backtest_stats import BacktestStats
+from src.profiler import PEAK_MEMORY, WALL_TIME, StageProfiler
+from src.rebalance_calendar import DATE_FORMAT, MONTH_END
+from src.run_backtest import (
+    HRP,
+    MSR,
+    MV,
+    OPTIMIZATION_ERRORS,
+    RunBacktest,
+)
+from src.synthetic_market import SyntheticMarket
+from src.trading_calendar import DEFAULT_LOOKBACK
+
+# Constants
+DEFAULT_TICKERS = (10, 100, 1000)
+DEFAULT_YEARS = (1, 5, 20)
+DEFAULT_OPTIMIZERS = (MSR, MV, HRP)
+INITIAL_AUM = 10000
+
+
+class BenchmarkSuite:
+    """
+    Defines the BenchmarkSuite class which backtests every optimizer on
+    synthetic markets of every size in a grid of numbers of tickers and
+    years. Each case is profiled stage by stage, and the results are
+    gathered with the environment in a JSON serializable dictionary, so
+    the throughput and memory of each commit can be tracked.
+    """
+
+    def __init__(
+        self,
+        tickers_grid: Sequence[int] = DEFAULT_TICKERS,
+        years_grid: Sequence[float] = DEFAULT_YEARS,
+        optimizers: Sequence[str] = DEFAULT_OPTIMIZERS,
+        *,
+        lookback: int = DEFAULT_LOOKBACK,
+        rebalance: str = MONTH_END,
+        seed: int = 0,
+        trace_memory: bool = True,
+    ) -> None:
+        """
+        This method initialises the BenchmarkSuite class.
+
+        Args:
+            tickers_grid (Sequence[int]): The numbers of tickers. Defaults to
+                10, 100 and 1000.
+            years_grid (Sequence[float]): The numbers of backtested years.
+                Defaults to 1, 5 and 20.
+            optimizers (Sequence[str]): The optimizers. Defaults to msr, mv and
+                hrp.
+            lookback (int): The number of trading days in the rolling
+                window. Defaults to 250.
+            rebalance (str): The rebalance frequency. Defaults to
+                "month_end".
+            seed (int): The seed of the synthetic markets. Defaults to 0.
+            trace_memory (bool): Whether the peak memory of each stage is
+                traced, which slows the backtests down. Defaults to True.
+        """
+        self.tickers_grid: List[int] = list(tickers_grid)
+        self.years_grid: List[float] = list(years_grid)
+        self.optimizers: List[str] = list(optimizers)
+        self.lookback: int = lookback
+        self.rebalance: str = rebalance
+        self.seed: int = seed
+        self.trace_memory: bool = trace_memory
+
+    @staticmethod
+    def get_environment() -> Dict[str, Any]:
+        """
+        Dict[str, Any]: Returns the commit, time, machine and library
+            versions of the benchmark run.
+        """
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True,
+                text=True, check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "time": datetime.now(timezone.utc).isoformat(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pypfopt": pypfopt.__version__,
+        }
+
+    def run_case(
+        self, stocks_data: pd.DataFrame, n_years: float, optimizer: str
+    ) -> Dict[str, Any]:
+        """
+        Backtests an optimizer on a synthetic market and profiles it.
+
+        Args:
+            stocks_data (pd.DataFrame): The prices of the synthetic market,
+                starting with the lookback window.
+            n_years (float): The number of backtested years.
+            optimizer (str): The optimizer.
+
+        Returns:
+            Dict[str, Any]: Returns the size, total wall time, rebalances
+                per second, peak memory and stage breakdown of the case, and
+                the error if the backtest failed.
+        """
+        beginning_date = \
+            stocks_data.index[self.lookback - 1].strftime(DATE_FORMAT)
+        profiler = StageProfiler(enabled=True, trace_memory=self.trace_memory)
+        result = {
+            "n_tickers": len(stocks_data.columns),
+            "n_years": n_years,
+            "optimizer": optimizer,
+            "n_rebalances": 0,
+            "error": None,
+        }
+        try:
+            with profiler.stage("total"):
+                with profiler.stage("backtest"):
+                    backtest = RunBacktest(
+                        stocks_data, INITIAL_AUM, beginning_date, optimizer,
+                        lookback=self.lookback, rebalance=self.rebalance,
+                        profiler=profiler,
+                    )
+                    backtest.fill_up_portfolio_performance()
+                with profiler.stage("backtest_stats"):
+                    BacktestStats(backtest.portfolio_performance,
+                                  backtest.history).get_metrics()
+            result["n_rebalances"] = len(backtest.rebalance_indexes)
+        except OPTIMIZATION_ERRORS as error:
+            result["error"] = str(error)
+        finally:
+            profiler.close()
+
+        stages = profiler.to_dict()
+        total = stages.get("total", {WALL_TIME: 0.0, PEAK_MEMORY: 0})
+        result.update({
+            WALL_TIME: total[WALL_TIME],
+            "rebalances_per_second": result["n_rebalances"] / total[WALL_TIME]
+            if total[WALL_TIME] > 0 else None,
+            PEAK_MEMORY: total[PEAK_MEMORY],
+            "stages": stages,
+        })
+        return result
+
+    def run(
+        self, callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Runs every case of the grid. Each synthetic market is generated
+        once and shared by the optimizers.
+
+        Args:
+            callback (Optional[Callable[[Dict[str, Any]], None]]): The
+                function called with the result of each case as soon as it
+                finishes, e.g. to report progress. Defaults to None.
+
+        Returns:
+            Dict[str, Any]: Returns the environment, the settings and the
+                results of the cases.
+        """
+        cases = []
+        for n_tickers in self.tickers_grid:
+            for n_years in self.years_grid:
+                start = time.perf_counter()
+                stocks_data = SyntheticMarket(
+                    n_tickers, n_years, lookback=self.lookback, seed=self.seed
+                ).generate_prices()
+                generate_time = time.perf_counter() - start
+                for optimizer in self.optimizers:
+                    case = self.run_case(stocks_data, n_years, optimizer)
+                    case["generate_time"] = generate_time
+                    cases.append(case)
+                    if callback is not None:
+                        callback(case)
+        return {
+            "environment": self.get_environment(),
+            "settings": {
+                "lookback": self.lookback,
+                "rebalance": self.rebalance,
+                "seed": self.seed,
+                "trace_memory": self.trace_memory,
+            },
+            "cases": cases,
+        }
+
+    @staticmethod
+    def dump_json(results: Dict[str, Any], path: str) -> None:
+        """
+        Writes the results of a benchmark run to a JSON file.
+
+        Args:
+            results (Dict[str, Any]): The results. See run.
+            path (str): The path of the JSON file.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
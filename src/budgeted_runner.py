@@ -0,0 +1,173 @@
+"""
+This module is responsible for running function calls in separate processes
+within a time budget.
+"""
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, List, Optional, Tuple, Type
+
+
+def run_task(
+    function: Callable,
+    task: tuple,
+    connection: Connection,
+    errors: Tuple[Type[Exception], ...],
+) -> None:
+    """
+    Calls a function in a child process and sends back its result, the
+    reason it failed if it raised one of the expected errors, or any other
+    error it raised.
+
+    Args:
+        function (Callable): The function to call.
+        task (tuple): The arguments of the call.
+        connection (Connection): The connection to the parent process.
+        errors (Tuple[Type[Exception], ...]): The errors reported as
+            failures of the call.
+    """
+    try:
+        outcome = (function(*task), None, None)
+    except errors as error:
+        outcome = (None, f"{type(error).__name__}: {error}", None)
+    # other errors are sent back to be raised in the parent process
+    except Exception as error:  # pylint: disable=broad-except
+        outcome = (None, None, error)
+    connection.send(outcome)
+    connection.close()
+
+
+class BudgetedRunner:
+    """
+    Defines the BudgetedRunner class which runs each call of a function in
+    its own child process, at most n_workers at a time, and terminates the
+    calls still running when their time budget runs out. The children are
+    forked where possible, so the function and its arguments are not
+    pickled. A call which raises one of the expected errors, times out or
+    kills its process is reported with the reason instead of stopping the
+    other calls. Any other error is raised in the parent process.
+    """
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = None,
+        n_workers: int = 1,
+        errors: Tuple[Type[Exception], ...] = (Exception,),
+    ) -> None:
+        """
+        This method initialises the BudgetedRunner class.
+
+        Args:
+            time_budget (Optional[float]): The number of seconds each call
+                may run for. Defaults to None, which does not limit them.
+            n_workers (int): The number of calls which run at once.
+                Defaults to 1.
+            errors (Tuple[Type[Exception], ...]): The errors of a call which
+                are reported as its failure. Defaults to every Exception.
+        """
+        self.time_budget: Optional[float] = time_budget
+        self.n_workers: int = max(1, n_workers)
+        self.errors: Tuple[Type[Exception], ...] = errors
+        self.context = multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods()
+            else None
+        )
+
+    def start(
+        self, function: Callable, task: tuple
+    ) -> Tuple[Connection, multiprocessing.Process, Optional[float]]:
+        """
+        Starts a call in a child process.
+
+        Args:
+            function (Callable): The function to call.
+            task (tuple): The arguments of the call.
+
+        Returns:
+            Tuple[Connection, multiprocessing.Process, Optional[float]]:
+                Returns the connection receiving the outcome, the process
+                and the monotonic deadline of the call.
+        """
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=run_task, args=(function, task, sender, self.errors),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        deadline = None if self.time_budget is None else \
+            time.monotonic() + self.time_budget
+        return receiver, process, deadline
+
+    def run(
+        self, function: Callable, tasks: List[tuple]
+    ) -> List[Tuple[Any, Optional[str]]]:
+        """
+        Calls a function with each of the given arguments.
+
+        Args:
+            function (Callable): The function to call.
+            tasks (List[tuple]): The arguments of each call.
+
+        Raises:
+            Exception: The error of a call which is not one of the expected
+                errors. The calls still running are stopped first.
+
+        Returns:
+            List[Tuple[Any, Optional[str]]]: Returns the result of each call
+                and None, or None and the reason the call failed, in the
+                order of the tasks.
+        """
+        outcomes: List[Tuple[Any, Optional[str]]] = [None] * len(tasks)
+        pending = deque(range(len(tasks)))
+        running = {}
+        try:
+            while pending or running:
+                while pending and len(running) < self.n_workers:
+                    position = pending.popleft()
+                    receiver, process, deadline = self.start(
+                        function, tasks[position]
+                    )
+                    running[receiver] = (position, process, deadline)
+
+                deadlines = [deadline for _, _, deadline in running.values()
+                             if deadline is not None]
+                timeout = None if not deadlines else \
+                    max(0.0, min(deadlines) - time.monotonic())
+                for receiver in wait(list(running), timeout):
+                    position, process, _ = running.pop(receiver)
+                    try:
+                        result, reason, error = receiver.recv()
+                    except EOFError:
+                        process.join()
+                        result, reason, error = (
+                            None,
+                            f"Process exited with code {process.exitcode}",
+                            None,
+                        )
+                    receiver.close()
+                    process.join()
+                    if error is not None:
+                        raise error
+                    outcomes[position] = (result, reason)
+
+                now = time.monotonic()
+                for receiver, (position, process, deadline) in \
+                        list(running.items()):
+                    if deadline is not None and now >= deadline:
+                        process.terminate()
+                        process.join()
+                        receiver.close()
+                        del running[receiver]
+                        outcomes[position] = (
+                            None,
+                            f"Timed out after {self.time_budget:g} seconds",
+                        )
+        finally:
+            # calls still running when an error is raised are stopped
+            for receiver, (_, process, _) in running.items():
+                process.terminate()
+                process.join()
+                receiver.close()
+        return outcomes
@@ -0,0 +1,295 @@
+"""
+This module is responsible for estimating the covariance matrices of all
+the rebalance windows of the backtest at once.
+"""
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from pypfopt import expected_returns, risk_models
+
+from src.rolling_moments import FREQUENCY, RollingMoments
+
+# Constants
+SAMPLE = "sample"
+LEDOIT_WOLF = "ledoit_wolf"
+EXP = "exp"
+CONSTANT_CORRELATION = "constant_correlation"
+DEFAULT_SPAN = 180
+DEFAULT_CHUNK_SIZE = 32
+
+
+def sample_covariance(returns: np.ndarray) -> np.ndarray:
+    """
+    Calculates the sample covariance matrix of each window, like
+    risk_models.sample_cov.
+
+    Args:
+        returns (np.ndarray): The (windows x dates x stocks) daily returns.
+
+    Returns:
+        np.ndarray: Returns the (windows x stocks x stocks) daily covariance
+            matrices.
+    """
+    centred = returns - returns.mean(axis=1, keepdims=True)
+    return np.einsum("rti,rtj->rij", centred, centred) / (returns.shape[1] - 1)
+
+
+def ledoit_wolf_covariance(returns: np.ndarray) -> np.ndarray:
+    """
+    Calculates the Ledoit-Wolf shrinkage of the covariance matrix of each
+    window towards a constant variance target, like
+    CovarianceShrinkage.ledoit_wolf with sklearn's estimator.
+
+    Args:
+        returns (np.ndarray): The (windows x dates x stocks) daily returns.
+
+    Returns:
+        np.ndarray: Returns the (windows x stocks x stocks) daily covariance
+            matrices.
+    """
+    n_samples, n_features = returns.shape[1:]
+    centred = returns - returns.mean(axis=1, keepdims=True)
+    squared = centred**2
+    emp_cov = np.einsum("rti,rtj->rij", centred, centred) / n_samples
+    emp_cov_trace = squared.sum(axis=1) / n_samples
+    mu = emp_cov_trace.sum(axis=1) / n_features
+
+    # sum of (X^2)^T X^2 and of (X^T X)^2, as in sklearn
+    beta_ = (squared.sum(axis=2) ** 2).sum(axis=1)
+    delta_ = (emp_cov**2).sum(axis=(1, 2))
+    beta = (beta_ / n_samples - delta_) / (n_features * n_samples)
+    delta = (delta_ - 2 * mu * emp_cov_trace.sum(axis=1)
+             + n_features * mu**2) / n_features
+    beta = np.minimum(beta, delta)
+    shrinkage = np.divide(beta, delta, out=np.zeros_like(beta),
+                          where=beta != 0)
+
+    shrunk = (1 - shrinkage)[:, None, None] * emp_cov
+    diagonal = np.arange(n_features)
+    shrunk[:, diagonal, diagonal] += (shrinkage * mu)[:, None]
+    return shrunk
+
+
+def exp_covariance(
+    returns: np.ndarray, span: int = DEFAULT_SPAN
+) -> np.ndarray:
+    """
+    Calculates the exponentially weighted covariance matrix of each window,
+    like risk_models.exp_cov.
+
+    Args:
+        returns (np.ndarray): The (windows x dates x stocks) daily returns.
+        span (int): The span of the exponential weights. Defaults to 180.
+
+    Returns:
+        np.ndarray: Returns the (windows x stocks x stocks) daily covariance
+            matrices.
+    """
+    n_samples = returns.shape[1]
+    decay = 1 - 2 / (span + 1)
+    weights = decay ** np.arange(n_samples - 1, -1, -1)
+    weights /= weights.sum()
+    centred = returns - returns.mean(axis=1, keepdims=True)
+    return np.einsum("t,rti,rtj->rij", weights, centred, centred)
+
+
+def constant_correlation_covariance(returns: np.ndarray) -> np.ndarray:
+    """
+    Calculates the Ledoit-Wolf shrinkage of the covariance matrix of each
+    window towards a constant correlation target, like
+    CovarianceShrinkage.ledoit_wolf("constant_correlation").
+
+    Args:
+        returns (np.ndarray): The (windows x dates x stocks) daily returns.
+
+    Returns:
+        np.ndarray: Returns the (windows x stocks x stocks) daily covariance
+            matrices.
+    """
+    n_samples, n_features = returns.shape[1:]
+    centred = returns - returns.mean(axis=1, keepdims=True)
+    cross = np.einsum("rti,rtj->rij", centred, centred)
+    sample = cross / (n_samples - 1)
+    diagonal = np.arange(n_features)
+
+    # constant correlation target
+    var = sample[:, diagonal, diagonal]
+    std = np.sqrt(var)
+    std_outer = std[:, :, None] * std[:, None, :]
+    r_bar = ((sample / std_outer).sum(axis=(1, 2)) - n_features) / \
+        (n_features * (n_features - 1))
+    target = r_bar[:, None, None] * std_outer
+    target[:, diagonal, diagonal] = var
+
+    # estimate pi
+    squared = centred**2
+    pi_mat = np.einsum("rti,rtj->rij", squared, squared) / n_samples \
+        - 2 * cross * sample / n_samples + sample**2
+    pi_hat = pi_mat.sum(axis=(1, 2))
+
+    # estimate rho
+    help_ = cross / n_samples
+    theta = np.einsum("rti,rtj->rij", centred**3, centred) / n_samples \
+        - help_[:, diagonal, diagonal][:, :, None] * sample \
+        - help_ * var[:, :, None] \
+        + var[:, :, None] * sample
+    theta[:, diagonal, diagonal] = 0
+    ratio = std[:, None, :] / std[:, :, None]
+    rho_hat = pi_mat[:, diagonal, diagonal].sum(axis=1) + \
+        r_bar * (ratio * theta).sum(axis=(1, 2))
+
+    # estimate gamma and the shrinkage constant
+    gamma_hat = ((sample - target) ** 2).sum(axis=(1, 2))
+    shrinkage = np.clip((pi_hat - rho_hat) / gamma_hat / n_samples, 0.0, 1.0)
+    return shrinkage[:, None, None] * target + \
+        (1 - shrinkage)[:, None, None] * sample
+
+
+ESTIMATORS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    SAMPLE: sample_covariance,
+    LEDOIT_WOLF: ledoit_wolf_covariance,
+    EXP: exp_covariance,
+    CONSTANT_CORRELATION: constant_correlation_covariance,
+}
+
+
+def estimate_window(window: pd.DataFrame, estimator: str) -> pd.DataFrame:
+    """
+    Estimates the covariance matrix of a single window with PyPortfolioOpt,
+    which handles missing prices.
+
+    Args:
+        window (pd.DataFrame): The prices in the window.
+        estimator (str): The covariance estimator.
+
+    Returns:
+        pd.DataFrame: Returns the annualised covariance matrix.
+    """
+    if estimator == SAMPLE:
+        return risk_models.sample_cov(window)
+    if estimator == EXP:
+        return risk_models.exp_cov(window, span=DEFAULT_SPAN)
+    shrinkage = risk_models.CovarianceShrinkage(window)
+    if estimator == LEDOIT_WOLF:
+        return shrinkage.ledoit_wolf()
+    return shrinkage.ledoit_wolf(shrinkage_target=CONSTANT_CORRELATION)
+
+
+class BatchedMoments(RollingMoments):
+    """
+    Defines the BatchedMoments class which estimates the covariance matrices
+    of the windows ending at all the rebalance dates in batched NumPy
+    passes. The returns of a chunk of windows are gathered into a (windows x
+    dates x stocks) array, and the estimator computes the stacked (windows
+    x stocks x stocks) covariance matrices with einsum, matching the
+    corresponding PyPortfolioOpt risk model. The expected returns are the
+    mean historical returns of RollingMoments.
+    """
+
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        lookback: int,
+        date_indexes: List[int],
+        estimator: str = LEDOIT_WOLF,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        This method initialises the BatchedMoments class.
+
+        Args:
+            prices (pd.DataFrame): The dataframe containing the adjusted close
+                price for all stocks throughout the time frame.
+            lookback (int): The number of prices in each window.
+            date_indexes (List[int]): The indexes of the last dates of the
+                windows to estimate in advance.
+            estimator (str): The covariance estimator, either "sample",
+                "ledoit_wolf", "exp" or "constant_correlation". Defaults to
+                "ledoit_wolf".
+            chunk_size (int): The number of windows estimated in each pass,
+                which bounds the memory used by the gathered returns.
+                Defaults to 32.
+
+        Raises:
+            ValueError: If the estimator is unknown.
+        """
+        if estimator not in ESTIMATORS:
+            raise ValueError(
+                "Covariance estimator must be one of " + ", ".join(ESTIMATORS)
+            )
+        super().__init__(prices, lookback)
+        self.estimator: str = estimator
+        self.chunk_size: int = chunk_size
+
+        """
+        positions (Dict[int, int]): The position of the covariance matrix of
+            each estimated window in the stack.
+        covariances (np.ndarray): The stacked annualised covariance
+            matrices of the estimated windows.
+        """
+        date_indexes = [
+            date_index for date_index in date_indexes
+            if not self.has_missing_prices(date_index)
+        ]
+        self.positions: Dict[int, int] = {
+            date_index: position
+            for position, date_index in enumerate(date_indexes)
+        }
+        self.covariances: np.ndarray = self.estimate(date_indexes)
+
+    def estimate(self, date_indexes: List[int]) -> np.ndarray:
+        """
+        Estimates the covariance matrices of windows without missing prices.
+
+        Args:
+            date_indexes (List[int]): The indexes of the last dates of the
+                windows.
+
+        Returns:
+            np.ndarray: Returns the stacked annualised covariance matrices.
+        """
+        n_stocks = len(self.tickers)
+        covariances = np.empty((len(date_indexes), n_stocks, n_stocks))
+        windows = sliding_window_view(self.values, self.lookback, axis=0)
+        for start in range(0, len(date_indexes), self.chunk_size):
+            ends = np.asarray(date_indexes[start : start + self.chunk_size])
+            # (windows x stocks x dates) to (windows x dates x stocks)
+            prices = windows[ends - self.lookback + 1].transpose(0, 2, 1)
+            returns = prices[:, 1:] / prices[:, :-1] - 1
+            covariances[start : start + len(ends)] = \
+                ESTIMATORS[self.estimator](returns) * FREQUENCY
+        return covariances
+
+    def get_moments(self, date_index: int) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Looks up the annualised expected returns and covariance matrix of the
+        window of lookback prices ending at a date index, estimating them if
+        the window was not estimated in advance.
+
+        Args:
+            date_index (int): The index of the last date of the window.
+
+        Returns:
+            Tuple[pd.Series, pd.DataFrame]: Returns the expected returns of
+                each stock and the covariance matrix of the stocks.
+        """
+        if self.has_missing_prices(date_index):
+            window = self.get_window(date_index)
+            return (
+                expected_returns.mean_historical_return(window),
+                estimate_window(window, self.estimator),
+            )
+
+        if date_index in self.positions:
+            covariance = self.covariances[self.positions[date_index]]
+        else:
+            covariance = self.estimate([date_index])[0]
+        return (
+            self.get_mean_returns(date_index),
+            risk_models.fix_nonpositive_semidefinite(
+                pd.DataFrame(covariance, index=self.tickers,
+                             columns=self.tickers)
+            ),
+        )
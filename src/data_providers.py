@@ -0,0 +1,255 @@
+"""
+This module is responsible for the market data providers used by the
+stocks fetcher.
+"""
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, only needed for Parquet files
+    pq = None
+
+# Constants
+YF_DATE_FORMAT = "%Y-%m-%d"
+YF_ADJUSTED_CLOSE = "Adj Close"
+DATE_COLUMN = "Date"
+CSV_SUFFIX = ".csv"
+PARQUET_SUFFIX = ".parquet"
+CSV_CHUNK_ROWS = 50000
+
+
+class DataProvider(ABC):
+    """
+    Defines the DataProvider interface which returns the adjusted close
+    prices of multiple tickers as one wide dataframe.
+    """
+
+    @abstractmethod
+    def fetch(
+        self, tickers: List[str], dt_start: datetime, dt_end: datetime
+    ) -> pd.DataFrame:
+        """
+        Fetches the adjusted closing prices for multiple tickers.
+
+        Args:
+            tickers (List[str]): The ticker symbols of each stock.
+            dt_start (datetime): The first date to fetch.
+            dt_end (datetime): The exclusive last date to fetch.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe indexed by date containing
+                the adjusted close price of each stock, with one column
+                per ticker.
+        """
+
+
+class YahooFinanceProvider(DataProvider):
+    """
+    Defines the YahooFinanceProvider class which downloads stocks data
+    from yFinance.
+    """
+
+    def fetch(
+        self, tickers: List[str], dt_start: datetime, dt_end: datetime
+    ) -> pd.DataFrame:
+        """
+        Downloads the adjusted closing prices for multiple tickers from
+        Yahoo Finance. See DataProvider.fetch.
+        """
+        data = yf.download(
+            tickers,
+            dt_start.strftime(YF_DATE_FORMAT),
+            dt_end.strftime(YF_DATE_FORMAT),
+            progress=False,
+        )[YF_ADJUSTED_CLOSE]
+        if len(tickers) == 1:
+            res = data.to_frame()
+            res.rename(columns={YF_ADJUSTED_CLOSE: tickers[0]}, inplace=True)
+            return res
+        return data
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Defines the LocalFileProvider class which reads stocks data from a
+    directory of CSV or Parquet files. A file is either wide, with a date
+    column and one column per ticker (like test/data/stocks_data.csv), or
+    holds a single ticker named after the file with an "Adj Close" column.
+    Files without the date column are ignored. Rows are assumed to be
+    sorted by date.
+    """
+
+    def __init__(self, directory: str, date_column: str = DATE_COLUMN) -> None:
+        """
+        This method initialises the LocalFileProvider class.
+
+        Args:
+            directory (str): The directory containing the price files.
+            date_column (str): The name of the date column in the files.
+                Defaults to "Date".
+        """
+        self.directory: str = directory
+        self.date_column: str = date_column
+
+        """
+        ticker_locations (Dict[str, Tuple[str, str]]): The dictionary
+            matching each available ticker to the path of the file and the
+            column holding its prices.
+        """
+        self.ticker_locations: Dict[str, Tuple[str, str]] = \
+            self.index_directory()
+
+    def read_columns(self, path: str) -> List[str]:
+        """
+        Reads only the column names of a price file.
+
+        Args:
+            path (str): The path of the CSV or Parquet file.
+
+        Raises:
+            ImportError: If the file is a Parquet file and pyarrow is not
+                installed.
+
+        Returns:
+            List[str]: Returns the list of column names in the file.
+        """
+        if path.endswith(PARQUET_SUFFIX):
+            if pq is None:
+                raise ImportError("Reading Parquet files requires pyarrow.")
+            return pq.read_schema(path).names
+        return pd.read_csv(path, nrows=0).columns.to_list()
+
+    def index_directory(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Dict[str, Tuple[str, str]]: Returns the location of each ticker
+            available in the directory.
+        """
+        locations = {}
+        for file_name in sorted(os.listdir(self.directory)):
+            stem, suffix = os.path.splitext(file_name)
+            if suffix not in (CSV_SUFFIX, PARQUET_SUFFIX):
+                continue
+            path = os.path.join(self.directory, file_name)
+            columns = self.read_columns(path)
+            if self.date_column not in columns:
+                continue
+            if YF_ADJUSTED_CLOSE in columns:
+                locations[stem] = (path, YF_ADJUSTED_CLOSE)
+                continue
+            for column in columns:
+                if column != self.date_column:
+                    locations.setdefault(column, (path, column))
+        return locations
+
+    def read_csv(
+        self,
+        path: str,
+        columns: List[str],
+        dt_start: datetime,
+        dt_end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Reads the given columns of a CSV file within a date range. The file
+        is read in chunks and reading stops once the range has been passed.
+
+        Args:
+            path (str): The path of the CSV file.
+            columns (List[str]): The price columns to read.
+            dt_start (datetime): The first date to read.
+            dt_end (datetime): The exclusive last date to read.
+
+        Returns:
+            pd.DataFrame: Returns the prices indexed by date.
+        """
+        chunks = []
+        reader = pd.read_csv(
+            path,
+            usecols=[self.date_column] + columns,
+            parse_dates=[self.date_column],
+            index_col=self.date_column,
+            chunksize=CSV_CHUNK_ROWS,
+        )
+        with reader:
+            for chunk in reader:
+                chunks.append(
+                    chunk[(chunk.index >= dt_start) & (chunk.index < dt_end)]
+                )
+                if len(chunk.index) > 0 and chunk.index[-1] >= dt_end:
+                    break
+        return pd.concat(chunks)
+
+    def read_parquet(
+        self,
+        path: str,
+        columns: List[str],
+        dt_start: datetime,
+        dt_end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Reads the given columns of a Parquet file within a date range, letting
+        the reader skip the row groups outside of the range.
+
+        Args:
+            path (str): The path of the Parquet file.
+            columns (List[str]): The price columns to read.
+            dt_start (datetime): The first date to read.
+            dt_end (datetime): The exclusive last date to read.
+
+        Returns:
+            pd.DataFrame: Returns the prices indexed by date.
+        """
+        data = pd.read_parquet(
+            path,
+            columns=[self.date_column] + columns,
+            filters=[
+                (self.date_column, ">=", pd.Timestamp(dt_start)),
+                (self.date_column, "<", pd.Timestamp(dt_end)),
+            ],
+        )
+        if self.date_column in data.columns:
+            data = data.set_index(self.date_column)
+        return data
+
+    def fetch(
+        self, tickers: List[str], dt_start: datetime, dt_end: datetime
+    ) -> pd.DataFrame:
+        """
+        Reads the adjusted closing prices for multiple tickers from the
+        local files, reading only the requested columns and dates. See
+        DataProvider.fetch.
+
+        Raises:
+            ValueError: If a ticker is not available in the directory.
+        """
+        missing = [
+            ticker for ticker in tickers if ticker not in self.ticker_locations
+        ]
+        if missing:
+            raise ValueError(
+                f"No local data found for tickers: {', '.join(missing)}."
+            )
+
+        files: Dict[str, Dict[str, str]] = {}
+        for ticker in tickers:
+            path, column = self.ticker_locations[ticker]
+            files.setdefault(path, {})[column] = ticker
+
+        frames = []
+        for path, renames in files.items():
+            read = self.read_parquet if path.endswith(PARQUET_SUFFIX) \
+                else self.read_csv
+            frames.append(
+                read(path, list(renames), dt_start, dt_end).rename(
+                    columns=renames
+                )
+            )
+        data = pd.concat(frames, axis=1).sort_index()
+        data.index.name = DATE_COLUMN
+        # mirror the column order of yFinance downloads
+        return data[sorted(tickers)] if len(tickers) > 1 else data[tickers]
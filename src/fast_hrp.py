@@ -0,0 +1,278 @@
+"""
+This module is responsible for the hierarchical risk parity optimizer of
+large universes.
+"""
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.optimizer_session import clean_weights
+
+# Constants
+DEFAULT_REUSE_TOLERANCE = 1e-3
+DEFAULT_BLOCK_SIZE = 256
+
+
+def get_condensed_index(n_assets: int, row: int) -> int:
+    """
+    int: Returns the position of the distance between an asset and the
+        next asset in a condensed distance matrix.
+    """
+    return n_assets * row - row * (row + 1) // 2
+
+
+def get_distance_row(
+    distances: np.ndarray, n_assets: int, row: int
+) -> np.ndarray:
+    """
+    Gathers the distances from an asset to all assets out of a condensed
+    distance matrix.
+
+    Args:
+        distances (np.ndarray): The condensed distance matrix.
+        n_assets (int): The number of assets.
+        row (int): The position of the asset.
+
+    Returns:
+        np.ndarray: Returns the distance to each asset, and infinity for the
+            asset itself.
+    """
+    others = np.arange(row)
+    full_row = np.empty(n_assets, dtype=np.float64)
+    full_row[:row] = distances[
+        get_condensed_index(n_assets, others) + row - others - 1
+    ]
+    full_row[row] = np.inf
+    start = get_condensed_index(n_assets, row)
+    full_row[row + 1 :] = distances[start : start + n_assets - row - 1]
+    return full_row
+
+
+def single_linkage(distances: np.ndarray, n_assets: int) -> np.ndarray:
+    """
+    Clusters the assets with single linkage, building the minimum spanning
+    tree with Prim's algorithm like scipy's linkage(method="single"),
+    including its tie-breaking and cluster labels, with each step
+    vectorized over the assets.
+
+    Args:
+        distances (np.ndarray): The condensed distance matrix.
+        n_assets (int): The number of assets.
+
+    Returns:
+        np.ndarray: Returns the linkage matrix.
+    """
+    links = np.empty((n_assets - 1, 4))
+    merged = np.zeros(n_assets, dtype=bool)
+    nearest = np.full(n_assets, np.inf)
+    current = 0
+    for step in range(n_assets - 1):
+        merged[current] = True
+        np.minimum(nearest, get_distance_row(distances, n_assets, current),
+                   out=nearest)
+        candidates = np.where(merged, np.inf, nearest)
+        closest = int(np.argmin(candidates))
+        links[step, :3] = current, closest, candidates[closest]
+        current = closest
+    links = links[np.argsort(links[:, 2], kind="mergesort")]
+
+    # label the clusters like scipy, with a union-find over the merges
+    parents = np.arange(2 * n_assets - 1)
+    sizes = np.ones(2 * n_assets - 1)
+
+    def find(node: int) -> int:
+        root = node
+        while parents[root] != root:
+            root = parents[root]
+        while parents[node] != root:
+            parents[node], node = root, parents[node]
+        return root
+
+    for step in range(n_assets - 1):
+        first, second = find(int(links[step, 0])), find(int(links[step, 1]))
+        links[step, 0], links[step, 1] = min(first, second), max(first, second)
+        parents[first] = parents[second] = n_assets + step
+        sizes[n_assets + step] = sizes[first] + sizes[second]
+        links[step, 3] = sizes[n_assets + step]
+    return links
+
+
+def get_quasi_diag(links: np.ndarray) -> List[int]:
+    """
+    Orders the assets like the leaves of the cluster tree in pre-order,
+    like scipy's to_tree(links).pre_order().
+
+    Args:
+        links (np.ndarray): The linkage matrix.
+
+    Returns:
+        List[int]: Returns the positions of the assets in quasi-diagonal
+            order.
+    """
+    n_assets = len(links) + 1
+    order = []
+    stack = [2 * n_assets - 2]
+    while stack:
+        node = stack.pop()
+        if node < n_assets:
+            order.append(node)
+        else:
+            stack.append(int(links[node - n_assets, 1]))
+            stack.append(int(links[node - n_assets, 0]))
+    return order
+
+
+class FastHRP:
+    """
+    Defines the FastHRP class which computes the hierarchical risk parity
+    weights of the same windows as HRPOpt(prices, cov), that is from the
+    correlation and covariance of the window prices, without dense n x n
+    matrices:
+
+    - the correlation distances are computed in blocks of assets and stored
+      as a float32 condensed matrix, a quarter of the dense float64 one,
+    - the single linkage is built with a vectorized Prim's algorithm,
+    - the variance of each cluster is computed from the centred prices of
+      its assets instead of a slice of the covariance matrix, and
+    - the quasi-diagonal ordering of the previous window is reused when no
+      distance has changed by more than reuse_tolerance.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        reuse_tolerance: float = DEFAULT_REUSE_TOLERANCE,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ) -> None:
+        """
+        This method initialises the FastHRP class.
+
+        Args:
+            tickers (List[str]): The tickers of the universe.
+            reuse_tolerance (float): The largest change of any distance
+                for which the previous ordering is reused. Defaults to 1e-3,
+                and 0 always clusters the assets again.
+            block_size (int): The number of assets whose correlations are
+                computed at once. Defaults to 256.
+        """
+        self.tickers: List[str] = list(tickers)
+        self.reuse_tolerance: float = reuse_tolerance
+        self.block_size: int = block_size
+
+        """
+        distances (Optional[np.ndarray]): The condensed distance matrix
+            which the current ordering was clustered from.
+        order (Optional[List[int]]): The current quasi-diagonal ordering.
+        reuses (int): The number of windows which reused the ordering.
+        """
+        self.distances: Optional[np.ndarray] = None
+        self.order: Optional[List[int]] = None
+        self.reuses: int = 0
+
+    def get_distances(self, centred: np.ndarray) -> np.ndarray:
+        """
+        Computes the condensed correlation distance matrix of the window,
+        sqrt((1 - corr) / 2), in blocks of assets.
+
+        Args:
+            centred (np.ndarray): The (dates x assets) centred prices.
+
+        Returns:
+            np.ndarray: Returns the float32 condensed distance matrix.
+        """
+        n_assets = centred.shape[1]
+        scaled = centred / np.sqrt((centred**2).sum(axis=0))
+        distances = np.empty(n_assets * (n_assets - 1) // 2, dtype=np.float32)
+        for start in range(0, n_assets, self.block_size):
+            stop = min(start + self.block_size, n_assets)
+            correlations = scaled[:, start:stop].T @ scaled[:, start:]
+            block = np.sqrt(np.clip((1.0 - correlations) / 2.0, 0.0, 1.0))
+            for row in range(start, stop):
+                offset = get_condensed_index(n_assets, row)
+                distances[offset : offset + n_assets - row - 1] = \
+                    block[row - start, row - start + 1 :]
+        return distances
+
+    def get_order(self, distances: np.ndarray) -> List[int]:
+        """
+        Orders the assets by clustering them, unless the distances are close
+        enough to the ones of the current ordering.
+
+        Args:
+            distances (np.ndarray): The condensed distance matrix.
+
+        Returns:
+            List[int]: Returns the quasi-diagonal ordering.
+        """
+        if (
+            self.order is not None
+            and self.reuse_tolerance > 0
+            and np.abs(distances - self.distances).max() <= self.reuse_tolerance
+        ):
+            self.reuses += 1
+            return self.order
+        self.distances = distances
+        self.order = get_quasi_diag(
+            single_linkage(distances, len(self.tickers))
+        )
+        return self.order
+
+    @staticmethod
+    def get_allocation(centred: np.ndarray, order: List[int]) -> np.ndarray:
+        """
+        Splits the weights by recursive bisection of the ordered assets, like
+        HRPOpt, with the inverse variance portfolio of each cluster.
+
+        Args:
+            centred (np.ndarray): The (dates x assets) centred prices.
+            order (List[int]): The quasi-diagonal ordering.
+
+        Returns:
+            np.ndarray: Returns the raw weight of each asset.
+        """
+        ordered = centred[:, order]
+        variances = (ordered**2).sum(axis=0) / (len(ordered) - 1)
+
+        def get_cluster_variance(start: int, stop: int) -> float:
+            weights = 1 / variances[start:stop]
+            weights /= weights.sum()
+            returns = ordered[:, start:stop] @ weights
+            return returns @ returns / (len(ordered) - 1)
+
+        weights = np.ones(len(order))
+        clusters = [(0, len(order))]
+        while clusters:
+            clusters = [
+                bounds for start, stop in clusters if stop - start > 1
+                for bounds in ((start, (start + stop) // 2),
+                               ((start + stop) // 2, stop))
+            ]
+            for idx in range(0, len(clusters), 2):
+                first, second = clusters[idx], clusters[idx + 1]
+                first_variance = get_cluster_variance(*first)
+                second_variance = get_cluster_variance(*second)
+                alpha = 1 - first_variance / (first_variance + second_variance)
+                weights[first[0] : first[1]] *= alpha
+                weights[second[0] : second[1]] *= 1 - alpha
+
+        raw_weights = np.empty(len(order))
+        raw_weights[order] = weights
+        return raw_weights
+
+    def optimize(self, window: pd.DataFrame) -> OrderedDict:
+        """
+        Calculates the hierarchical risk parity weights of a window.
+
+        Args:
+            window (pd.DataFrame): The prices in the lookback window, without
+                missing prices.
+
+        Returns:
+            OrderedDict: Returns the cleaned weight of each ticker.
+        """
+        prices = window[self.tickers].to_numpy(dtype="float64")
+        centred = prices - prices.mean(axis=0)
+        order = self.get_order(self.get_distances(centred))
+        return clean_weights(self.tickers, self.get_allocation(centred, order))
@@ -0,0 +1,236 @@
+"""
+This module is responsible for coalescing concurrent stocks data requests
+made within one process into a single superset fetch.
+"""
+import threading
+import time
+import warnings
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+
+import pandas as pd
+
+from src.fetch_scheduler import TRANSIENT_ERRORS
+from src.stocks_fetcher import StocksFetcher
+from src.trading_calendar import DEFAULT_LOOKBACK
+
+# Constants
+DEFAULT_BATCH_WINDOW = 0.05
+# errors of the superset fetch which are raised in every request of its
+# batch, i.e. the download errors and the errors about the data itself,
+# such as tickers which are not available
+BATCH_ERRORS: Tuple[Type[Exception], ...] = \
+    TRANSIENT_ERRORS + (KeyError, ValueError)
+
+
+class FetchBatch:
+    """
+    Defines the FetchBatch class which collects the requests waiting for
+    the same superset fetch.
+    """
+
+    def __init__(self) -> None:
+        """
+        This method initialises the FetchBatch class.
+        """
+        self.tickers: set = set()
+        self.dt_start: Optional[datetime] = None
+        self.dt_end: Optional[datetime] = None
+        self.done: threading.Event = threading.Event()
+        self.data: Optional[pd.DataFrame] = None
+        self.error: Optional[Exception] = None
+
+    def add(self, tickers: List[str], dt_start: datetime, dt_end: datetime):
+        """
+        Widens the batch to include a request.
+
+        Args:
+            tickers (List[str]): The ticker symbols of the request.
+            dt_start (datetime): The first date of the request.
+            dt_end (datetime): The exclusive last date of the request.
+        """
+        self.tickers.update(tickers)
+        self.dt_start = dt_start if self.dt_start is None \
+            else min(self.dt_start, dt_start)
+        self.dt_end = dt_end if self.dt_end is None \
+            else max(self.dt_end, dt_end)
+
+
+class FetchCoalescer:
+    """
+    Defines the FetchCoalescer class which wraps a StocksFetcher so that
+    requests arriving from several threads within a short batch window are
+    merged into one download of the union of their tickers over the widest
+    date span. Each caller then gets a slice of the shared superset frame,
+    which is also kept to serve later requests that it already covers.
+    Tickers missing from the superset frame, e.g. from chunks that failed
+    to download, are reported to the requests which asked for them, and are
+    fetched again by later requests.
+    """
+
+    def __init__(
+        self, fetcher: StocksFetcher, batch_window: float = DEFAULT_BATCH_WINDOW
+    ) -> None:
+        """
+        This method initialises the FetchCoalescer class.
+
+        Args:
+            fetcher (StocksFetcher): The fetcher used for the superset
+                downloads.
+            batch_window (float): The number of seconds the first request of
+                a batch waits for other requests to join. Defaults to 0.05.
+        """
+        self.fetcher: StocksFetcher = fetcher
+        self.batch_window: float = batch_window
+        self.lock: threading.Lock = threading.Lock()
+
+        """
+        pending (Optional[FetchBatch]): The batch accepting new requests.
+        shared (Optional[FetchBatch]): The last completed batch, whose
+            frame is sliced for the requests it covers.
+        """
+        self.pending: Optional[FetchBatch] = None
+        self.shared: Optional[FetchBatch] = None
+
+    @staticmethod
+    def covers(
+        batch: Optional[FetchBatch],
+        tickers: List[str],
+        dt_start: datetime,
+        dt_end: datetime,
+    ) -> bool:
+        """
+        bool: Returns whether a completed batch holds all the requested
+            tickers and dates.
+        """
+        return (
+            batch is not None
+            and batch.data is not None
+            and batch.tickers.issuperset(tickers)
+            and batch.dt_start <= dt_start
+            and batch.dt_end >= dt_end
+        )
+
+    @staticmethod
+    def slice_frame(
+        data: pd.DataFrame,
+        tickers: List[str],
+        dt_start: datetime,
+        dt_end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Slices the requested tickers and dates out of a superset frame. The
+        slice is a view when the requested tickers are adjacent in the
+        superset frame and they traded on every date of the range. It is a
+        copy when the columns are not adjacent, when dates only traded by
+        other tickers of the superset frame have to be dropped, or when
+        tickers are missing from the superset frame, which are reported with
+        a warning and left empty.
+
+        Args:
+            data (pd.DataFrame): The superset frame.
+            tickers (List[str]): The ticker symbols of the request.
+            dt_start (datetime): The first date of the request.
+            dt_end (datetime): The exclusive last date of the request.
+
+        Raises:
+            ValueError: If none of the tickers are in the superset frame.
+
+        Returns:
+            pd.DataFrame: Returns the prices of the request, which must not
+                be modified in place since they may share memory with the
+                superset frame.
+        """
+        missing = [ticker for ticker in tickers if ticker not in data.columns]
+        if missing:
+            if len(missing) == len(tickers):
+                raise ValueError(
+                    f"No data returned for tickers: {', '.join(missing)}."
+                )
+            warnings.warn("Failed to fetch tickers: " + ", ".join(missing))
+            fetched = [ticker for ticker in tickers if ticker not in missing]
+            res = FetchCoalescer.slice_frame(data, fetched, dt_start, dt_end)
+            return res.reindex(
+                columns=sorted(tickers) if len(tickers) > 1 else tickers
+            )
+
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        row_start = index.searchsorted(dt_start, side="left")
+        row_end = index.searchsorted(dt_end, side="left")
+
+        if len(tickers) > 1:
+            tickers = sorted(tickers)
+        positions = [data.columns.get_loc(ticker) for ticker in tickers]
+        if positions == list(range(positions[0], positions[-1] + 1)):
+            res = data.iloc[row_start:row_end, positions[0] : positions[-1] + 1]
+        else:
+            res = data.iloc[row_start:row_end, positions]
+        # dates only traded by other tickers of the superset are dropped
+        if res.isna().all(axis=1).any():
+            res = res.dropna(how="all")
+        return res
+
+    def fetch_stocks_data(
+        self,
+        tickers: List[str],
+        beginning_date: str,
+        ending_date: str,
+        lookback: int = DEFAULT_LOOKBACK,
+    ) -> pd.DataFrame:
+        """
+        Fetches the adjusted closing prices like
+        StocksFetcher.fetch_stocks_data, sharing the download with the other
+        requests of the same batch.
+
+        Args:
+            tickers (List[str]): The ticker symbols of each stock in the
+                universe.
+            beginning_date (str): The beginning date given by the user.
+            ending_date (str): The ending date given by the user.
+            lookback (int): The number of trading days in the rolling window
+                of the backtest. Defaults to 250.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe containing the adjusted close
+                price for each stock in the universe at each trading date in
+                the time frame, which must not be modified in place.
+        """
+        dt_start, dt_end = self.fetcher.get_fetch_window(
+            beginning_date, ending_date, lookback
+        )
+        with self.lock:
+            if self.covers(self.shared, tickers, dt_start, dt_end):
+                return self.slice_frame(self.shared.data, tickers, dt_start,
+                                        dt_end)
+            is_leader = self.pending is None
+            if is_leader:
+                self.pending = FetchBatch()
+            batch = self.pending
+            batch.add(tickers, dt_start, dt_end)
+
+        if is_leader:
+            time.sleep(self.batch_window)
+            with self.lock:
+                self.pending = None
+            try:
+                batch.data = self.fetcher.fetch_range(
+                    sorted(batch.tickers), batch.dt_start, batch.dt_end
+                )
+                # tickers missing from the frame are not covered by it
+                batch.tickers &= set(batch.data.columns)
+                with self.lock:
+                    self.shared = batch
+            except BATCH_ERRORS as error:
+                batch.error = error
+            finally:
+                if batch.data is None and batch.error is None:
+                    batch.error = RuntimeError("Superset fetch failed.")
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return self.slice_frame(batch.data, tickers, dt_start, dt_end)
@@ -0,0 +1,252 @@
+"""
+This module is responsible for scheduling concurrent, chunked downloads of
+the stocks data.
+"""
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Tuple, Type
+
+import pandas as pd
+
+from src.data_providers import DataProvider
+
+# Constants
+DEFAULT_CHUNK_SIZE = 50
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RATE = 2.0
+DEFAULT_BURST = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+# Network and HTTP errors, including those of requests and urllib, are
+# OSErrors, and are the only errors worth retrying
+TRANSIENT_ERRORS: Tuple[Type[Exception], ...] = (OSError,)
+
+
+class EmptyDownloadError(OSError):
+    """
+    Defines the EmptyDownloadError class which is raised when a download
+    returns no prices at all. yfinance reports failed requests this way
+    instead of raising their HTTP errors, so it is retried like them.
+    """
+
+
+class TokenBucket:
+    """
+    Defines the TokenBucket class which limits the rate of requests. Tokens
+    are refilled continuously at a fixed rate up to a maximum capacity and
+    each request consumes one token.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        This method initialises the TokenBucket class.
+
+        Args:
+            rate (float): The number of tokens refilled per second.
+            capacity (int): The maximum number of tokens, i.e. the size of
+                the largest burst of requests.
+            clock (Callable[[], float]): The monotonic clock in seconds.
+                Defaults to time.monotonic.
+            sleep (Callable[[float], None]): The function used to wait.
+                Defaults to time.sleep.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1.")
+        self.rate: float = rate
+        self.capacity: int = capacity
+        self.clock: Callable[[], float] = clock
+        self.sleep: Callable[[float], None] = sleep
+        self.tokens: float = float(capacity)
+        self.last_refill: float = clock()
+        self.lock: threading.Lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: Returns 0 if a token was taken, otherwise the number of
+                seconds until the next token is available.
+        """
+        with self.lock:
+            now = self.clock()
+            refill = (now - self.last_refill) * self.rate
+            self.tokens = min(self.capacity, self.tokens + refill)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> None:
+        """
+        None: Blocks until a token is available and takes it.
+        """
+        wait = self.try_acquire()
+        while wait > 0:
+            self.sleep(wait)
+            wait = self.try_acquire()
+
+
+class FetchScheduler:
+    """
+    Defines the FetchScheduler class which splits a universe of tickers into
+    chunks, fetches the chunks concurrently from a data provider with rate
+    limiting and retries, and merges the results into one aligned dataframe.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        This method initialises the FetchScheduler class.
+
+        Args:
+            chunk_size (int): The maximum number of tickers per request.
+            max_workers (int): The maximum number of concurrent requests.
+            rate (float): The maximum sustained number of requests per second.
+            burst (int): The maximum number of requests sent at once.
+            max_retries (int): The number of retries of a failed chunk.
+            backoff (float): The wait in seconds before the first retry,
+                doubled at every further retry.
+            sleep (Callable[[float], None]): The function used to wait.
+                Defaults to time.sleep.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1.")
+        if max_workers < 1:
+            raise ValueError("Max workers must be at least 1.")
+        self.chunk_size: int = chunk_size
+        self.max_workers: int = max_workers
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.sleep: Callable[[float], None] = sleep
+        self.rate_limiter: TokenBucket = TokenBucket(rate, burst, sleep=sleep)
+
+        """
+        failed_tickers (List[str]): The tickers of the chunks that still
+            failed after all retries during the last fetch.
+        """
+        self.failed_tickers: List[str] = []
+
+    def split_chunks(self, tickers: List[str]) -> List[List[str]]:
+        """
+        List[List[str]]: Returns the tickers split into chunks of at most
+            chunk_size tickers.
+        """
+        return [
+            tickers[idx : idx + self.chunk_size]
+            for idx in range(0, len(tickers), self.chunk_size)
+        ]
+
+    def fetch_chunk(
+        self,
+        provider: DataProvider,
+        chunk: List[str],
+        dt_start: datetime,
+        dt_end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Fetches one chunk of tickers, retrying with exponential backoff.
+
+        Args:
+            provider (DataProvider): The market data provider.
+            chunk (List[str]): The ticker symbols of the chunk.
+            dt_start (datetime): The first date to fetch.
+            dt_end (datetime): The exclusive last date to fetch.
+
+        Raises:
+            OSError: The last download or HTTP error if every attempt
+                failed. Other errors are raised at once.
+
+        Returns:
+            pd.DataFrame: Returns the adjusted close prices of the chunk.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                data = provider.fetch(chunk, dt_start, dt_end)
+                if data.empty or data.isna().all().all():
+                    raise EmptyDownloadError(
+                        f"No data returned for tickers: {', '.join(chunk)}."
+                    )
+                return data
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                self.sleep(self.backoff * 2**attempt)
+
+    def fetch(
+        self,
+        provider: DataProvider,
+        tickers: List[str],
+        dt_start: datetime,
+        dt_end: datetime,
+    ) -> pd.DataFrame:
+        """
+        Fetches the adjusted closing prices of all tickers chunk by chunk.
+        Chunks whose downloads still fail after all retries are left out of
+        the result and recorded in failed_tickers.
+
+        Args:
+            provider (DataProvider): The market data provider.
+            tickers (List[str]): The ticker symbols of each stock.
+            dt_start (datetime): The first date to fetch.
+            dt_end (datetime): The exclusive last date to fetch.
+
+        Raises:
+            OSError: The error of the first chunk if every chunk failed to
+                download. Other errors of any chunk are raised as they are.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe containing the adjusted close
+                price of each fetched stock at each trading date.
+        """
+        chunks = self.split_chunks(tickers)
+        self.failed_tickers = []
+        frames = []
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self.fetch_chunk, provider, chunk, dt_start, dt_end
+                )
+                for chunk in chunks
+            ]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    frames.append(future.result())
+                except TRANSIENT_ERRORS as error:
+                    self.failed_tickers.extend(chunk)
+                    errors.append(error)
+
+        if not frames:
+            raise errors[0]
+        if self.failed_tickers:
+            warnings.warn(
+                "Failed to fetch tickers: " + ", ".join(self.failed_tickers)
+            )
+        data = pd.concat(frames, axis=1).sort_index()
+        fetched = [
+            ticker for ticker in tickers if ticker not in self.failed_tickers
+        ]
+        return data[sorted(fetched)] if len(tickers) > 1 else data
@@ -3,7 +3,9 @@ This module is responsible for getting, validating and organizing user input.
 """
 import argparse
 from datetime import datetime
-from typing import List
+from typing import List, Optional
+
+from src.trading_calendar import DEFAULT_LOOKBACK
 
 # Constants
 DATETIME_FORMAT = "%Y%m%d"
@@ -12,6 +14,14 @@ MIN_TICKER_LENGTH = 1
 MAX_TICKER_LENGTH = 5
 DATE_LENGTH = 8
 OPTIMIZERS = ["msr", "mv", "hrp"]
+MIN_LOOKBACK = 3
+REBALANCE_FREQUENCIES = ["month_end", "week_end", "quarter_end"]
+DEFAULT_REBALANCE = "month_end"
+DEFAULT_WORKERS = 1
+COVARIANCE_ESTIMATORS = ["sample", "ledoit_wolf", "exp", "constant_correlation"]
+DEFAULT_COVARIANCE = "sample"
+HRP_MODES = ["auto", "exact", "fast"]
+DEFAULT_HRP_MODE = "auto"
 
 
 def get_args() -> argparse.Namespace:
@@ -51,14 +61,98 @@ def get_args() -> argparse.Namespace:
     parser.add_argument(
         "--optimizer",
         type=str,
-        help="The optimizer to use (either msr, mv, hrp)",
+        help="The optimizer to use (either msr, mv, hrp), or a comma "
+        "separated list of optimizers to compare",
         required=True,
     )
+    parser.add_argument(
+        "--lookback",
+        type=int,
+        help="The number of trading days in the rolling window used by the "
+        "optimizer (optional, defaults to 250)",
+        default=DEFAULT_LOOKBACK,
+        required=False,
+    )
+    parser.add_argument(
+        "--rebalance",
+        type=str,
+        help="The rebalance frequency, either month_end, week_end, "
+        "quarter_end or a number of trading days (optional, defaults to "
+        "month_end)",
+        default=DEFAULT_REBALANCE,
+        required=False,
+    )
+    parser.add_argument(
+        "--cov",
+        type=str,
+        help="The covariance estimator, either sample, ledoit_wolf, exp or "
+        "constant_correlation (optional, defaults to sample)",
+        default=DEFAULT_COVARIANCE,
+        required=False,
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="The number of processes which optimize the rebalance dates "
+        "in parallel (optional, defaults to 1)",
+        default=DEFAULT_WORKERS,
+        required=False,
+    )
+    parser.add_argument(
+        "--time_budget",
+        type=float,
+        help="The number of seconds each rebalance optimization may run for "
+        "before it falls back to the previous weights, mv or hrp (optional, "
+        "defaults to no limit)",
+        required=False,
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        help="The directory in which the fetched prices are cached, so that "
+        "later runs only download the missing dates (optional, defaults to "
+        "no caching)",
+        required=False,
+    )
+    parser.add_argument(
+        "--weights_cache",
+        type=str,
+        help="The directory in which the optimized weights of each "
+        "rebalance are cached, so that later runs only optimize the new "
+        "rebalance dates (optional, defaults to no caching)",
+        required=False,
+    )
+    parser.add_argument(
+        "--warm_start",
+        help="To build the msr and mv problems once and re-solve them at "
+        "each rebalance",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--hrp_mode",
+        type=str,
+        help="The hrp optimizer, either auto, exact or fast (optional, "
+        "defaults to auto)",
+        default=DEFAULT_HRP_MODE,
+        required=False,
+    )
     parser.add_argument(
         "--plot_weights",
         help="To plot the weights of the portfolio",
         action="store_true",
     )
+    parser.add_argument(
+        "--profile",
+        help="To print the time and memory spent in each stage of the run",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile_json",
+        type=str,
+        help="The path of a JSON file to write the profile to (optional, "
+        "implies --profile)",
+        required=False,
+    )
 
     return parser
 
@@ -76,6 +170,18 @@ class InputData:
         initial_aum: int = -1,
         optimizer: str = -1,
         plot_weights: bool = -1,
+        *,
+        lookback: int = -1,
+        rebalance: str = -1,
+        workers: int = -1,
+        cov: str = -1,
+        time_budget: float = -1,
+        profile: bool = -1,
+        profile_json: str = -1,
+        cache_dir: str = -1,
+        weights_cache: str = -1,
+        warm_start: bool = -1,
+        hrp_mode: str = -1,
     ) -> None:
         """
         This method initialises the InputData class.
@@ -88,6 +194,22 @@ class InputData:
             optimizer (str): The user input of the optimizer to use.
             plot_weights (bool): The user input of plotting the portfolio
                 weights
+            lookback (int): The user input of the lookback window length.
+            rebalance (str): The user input of the rebalance frequency.
+            workers (int): The user input of the number of optimizer
+                processes.
+            cov (str): The user input of the covariance estimator.
+            time_budget (float): The user input of the time budget of each
+                rebalance optimization.
+            profile (bool): The user input of profiling the run.
+            profile_json (str): The user input of the path of the profile
+                JSON file.
+            cache_dir (str): The user input of the price cache directory.
+            weights_cache (str): The user input of the weights cache
+                directory.
+            warm_start (bool): The user input of warm starting the msr and
+                mv optimizers.
+            hrp_mode (str): The user input of the hrp optimizer to use.
         """
         if tickers == -1:
             self.tickers = get_args().parse_args().tickers
@@ -119,6 +241,61 @@ class InputData:
         else:
             self.plot_weights = plot_weights
 
+        if lookback == -1:
+            self.lookback = get_args().parse_args().lookback
+        else:
+            self.lookback = lookback
+
+        if rebalance == -1:
+            self.rebalance = get_args().parse_args().rebalance
+        else:
+            self.rebalance = rebalance
+
+        if workers == -1:
+            self.workers = get_args().parse_args().workers
+        else:
+            self.workers = workers
+
+        if cov == -1:
+            self.cov = get_args().parse_args().cov
+        else:
+            self.cov = cov
+
+        if time_budget == -1:
+            self.time_budget = get_args().parse_args().time_budget
+        else:
+            self.time_budget = time_budget
+
+        if profile == -1:
+            self.profile = get_args().parse_args().profile
+        else:
+            self.profile = profile
+
+        if profile_json == -1:
+            self.profile_json = get_args().parse_args().profile_json
+        else:
+            self.profile_json = profile_json
+
+        if cache_dir == -1:
+            self.cache_dir = get_args().parse_args().cache_dir
+        else:
+            self.cache_dir = cache_dir
+
+        if weights_cache == -1:
+            self.weights_cache = get_args().parse_args().weights_cache
+        else:
+            self.weights_cache = weights_cache
+
+        if warm_start == -1:
+            self.warm_start = get_args().parse_args().warm_start
+        else:
+            self.warm_start = warm_start
+
+        if hrp_mode == -1:
+            self.hrp_mode = get_args().parse_args().hrp_mode
+        else:
+            self.hrp_mode = hrp_mode
+
     def get_tickers(self) -> List[str]:
         """
         Returns a validated list of tickers from user input.
@@ -240,6 +417,33 @@ class InputData:
             raise ValueError("Optimizer must be either msr, mv, or hrp")
         return self.optimizer
 
+    def get_optimizers(self) -> List[str]:
+        """
+        Returns a validated list of optimizers from the user input, which
+        may hold several comma separated optimizers to compare.
+
+        Raises:
+            ValueError: If the optimizers are not a string, or an optimizer
+                is not valid or is repeated.
+
+        Returns:
+            List[str]: Returns the list of lowercase optimizers if each
+                optimizer has been validated.
+        """
+        if self.optimizer is None:
+            raise ValueError("Optimizer must be specified.")
+        if not isinstance(self.optimizer, str):
+            raise ValueError("Optimizer must be a string.")
+        optimizers = [
+            optimizer.strip().lower() for optimizer in self.optimizer.split(",")
+        ]
+        for optimizer in optimizers:
+            if optimizer not in OPTIMIZERS:
+                raise ValueError("Optimizer must be either msr, mv, or hrp")
+        if len(set(optimizers)) != len(optimizers):
+            raise ValueError("Optimizers must not be repeated.")
+        return optimizers
+
     def get_plot_weights(self) -> bool:
         """
         Returns a validated plot weights boolean from the user input.
@@ -253,3 +457,215 @@ class InputData:
         if self.plot_weights is None:
             raise ValueError("Plot weights must be specified.")
         return self.plot_weights
+
+    def get_lookback(self) -> int:
+        """
+        Returns a validated lookback window length from the user input.
+
+        Raises:
+            ValueError: If the lookback is not an integer or is shorter than
+                3 trading days.
+
+        Returns:
+            int: Returns the lookback if it has been validated.
+        """
+        if self.lookback is None:
+            return DEFAULT_LOOKBACK
+        if not isinstance(self.lookback, int):
+            raise ValueError("Lookback must be an integer.")
+        if self.lookback < MIN_LOOKBACK:
+            raise ValueError(
+                f"Lookback must be at least {MIN_LOOKBACK} trading days."
+            )
+        return self.lookback
+
+    def get_rebalance(self) -> str:
+        """
+        Returns a validated rebalance frequency from the user input.
+
+        Raises:
+            ValueError: If the rebalance frequency is not a string, or is
+                neither a valid frequency nor a positive number of days.
+
+        Returns:
+            str: Returns the rebalance frequency if it has been validated.
+        """
+        if self.rebalance is None:
+            return DEFAULT_REBALANCE
+        if not isinstance(self.rebalance, str):
+            raise ValueError("Rebalance frequency must be a string.")
+        if self.rebalance.isdigit() and int(self.rebalance) > 0:
+            return self.rebalance
+        if self.rebalance.lower() not in REBALANCE_FREQUENCIES:
+            raise ValueError(
+                "Rebalance frequency must be either month_end, week_end, "
+                "quarter_end or a positive number of days."
+            )
+        return self.rebalance.lower()
+
+    def get_workers(self) -> int:
+        """
+        Returns a validated number of optimizer processes from the user input.
+
+        Raises:
+            ValueError: If the number of processes is not a positive integer.
+
+        Returns:
+            int: Returns the number of processes if it has been validated.
+        """
+        if self.workers is None:
+            return DEFAULT_WORKERS
+        if not isinstance(self.workers, int):
+            raise ValueError("Number of workers must be an integer.")
+        if self.workers < 1:
+            raise ValueError("Number of workers must be at least 1.")
+        return self.workers
+
+    def get_cov(self) -> str:
+        """
+        Returns a validated covariance estimator from the user input.
+
+        Raises:
+            ValueError: If the covariance estimator is not a string or is not
+                a valid estimator.
+
+        Returns:
+            str: Returns the lowercase covariance estimator if it has been
+                validated.
+        """
+        if self.cov is None:
+            return DEFAULT_COVARIANCE
+        if not isinstance(self.cov, str):
+            raise ValueError("Covariance estimator must be a string.")
+        if self.cov.lower() not in COVARIANCE_ESTIMATORS:
+            raise ValueError(
+                "Covariance estimator must be either sample, ledoit_wolf, "
+                "exp or constant_correlation."
+            )
+        return self.cov.lower()
+
+    def get_time_budget(self) -> Optional[float]:
+        """
+        Returns a validated time budget of each rebalance optimization from
+        the user input.
+
+        Raises:
+            ValueError: If the time budget is not a positive number.
+
+        Returns:
+            Optional[float]: Returns the number of seconds if it has been
+                validated, or None if the optimizations are not limited.
+        """
+        if self.time_budget is None:
+            return None
+        if isinstance(self.time_budget, bool) or \
+                not isinstance(self.time_budget, (int, float)):
+            raise ValueError("Time budget must be a number of seconds.")
+        if self.time_budget <= 0:
+            raise ValueError("Time budget must be positive.")
+        return float(self.time_budget)
+
+    def get_profile(self) -> bool:
+        """
+        Returns a validated profile boolean from the user input. A profile
+        JSON path also enables profiling.
+
+        Raises:
+            ValueError: If the profile is not a boolean.
+
+        Returns:
+            bool: Returns the profile boolean if it has been validated.
+        """
+        if self.profile is None:
+            raise ValueError("Profile must be specified.")
+        if not isinstance(self.profile, bool):
+            raise ValueError("Profile must be a boolean.")
+        return self.profile or self.get_profile_json() is not None
+
+    def get_profile_json(self) -> Optional[str]:
+        """
+        Returns a validated profile JSON path from the user input.
+
+        Raises:
+            ValueError: If the path is not a non-empty string.
+
+        Returns:
+            Optional[str]: Returns the path if it has been validated, or
+                None if the profile is not written to a file.
+        """
+        if self.profile_json is None:
+            return None
+        if not isinstance(self.profile_json, str) or not self.profile_json:
+            raise ValueError("Profile JSON path must be a non-empty string.")
+        return self.profile_json
+
+    def get_cache_dir(self) -> Optional[str]:
+        """
+        Returns a validated price cache directory from the user input.
+
+        Raises:
+            ValueError: If the directory is not a non-empty string.
+
+        Returns:
+            Optional[str]: Returns the directory if it has been validated, or
+                None if the prices are not cached.
+        """
+        if self.cache_dir is None:
+            return None
+        if not isinstance(self.cache_dir, str) or not self.cache_dir:
+            raise ValueError("Cache directory must be a non-empty string.")
+        return self.cache_dir
+
+    def get_weights_cache(self) -> Optional[str]:
+        """
+        Returns a validated weights cache directory from the user input.
+
+        Raises:
+            ValueError: If the directory is not a non-empty string.
+
+        Returns:
+            Optional[str]: Returns the directory if it has been validated, or
+                None if the weights are not cached.
+        """
+        if self.weights_cache is None:
+            return None
+        if not isinstance(self.weights_cache, str) or not self.weights_cache:
+            raise ValueError(
+                "Weights cache directory must be a non-empty string."
+            )
+        return self.weights_cache
+
+    def get_warm_start(self) -> bool:
+        """
+        Returns a validated warm start boolean from the user input.
+
+        Raises:
+            ValueError: If the warm start is not a boolean.
+
+        Returns:
+            bool: Returns the warm start boolean if it has been validated.
+        """
+        if self.warm_start is None:
+            raise ValueError("Warm start must be specified.")
+        if not isinstance(self.warm_start, bool):
+            raise ValueError("Warm start must be a boolean.")
+        return self.warm_start
+
+    def get_hrp_mode(self) -> str:
+        """
+        Returns a validated hrp optimizer from the user input.
+
+        Raises:
+            ValueError: If the hrp mode is not a string or is not a valid
+                mode.
+
+        Returns:
+            str: Returns the lowercase hrp mode if it has been validated.
+        """
+        if self.hrp_mode is None:
+            return DEFAULT_HRP_MODE
+        if not isinstance(self.hrp_mode, str):
+            raise ValueError("HRP mode must be a string.")
+        if self.hrp_mode.lower() not in HRP_MODES:
+            raise ValueError("HRP mode must be either auto, exact or fast.")
+        return self.hrp_mode.lower()
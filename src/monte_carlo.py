@@ -0,0 +1,364 @@
+"""
+This module is responsible for backtesting the optimizers over simulated
+price paths.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pypfopt import risk_models
+from pypfopt.exceptions import OptimizationError
+
+from src.backtest_stats import METRIC_COLUMNS, BacktestStats
+from src.covariance_estimators import sample_covariance
+from src.optimizer_session import OptimizerSession
+from src.rebalance_calendar import (
+    DATE_FORMAT,
+    MONTH_END,
+    RebalanceCalendar,
+    get_rebalance_calendar,
+)
+from src.rolling_moments import FREQUENCY
+from src.run_backtest import AUM, DATETIME, HRP, optimize_weights
+from src.trading_calendar import DEFAULT_LOOKBACK
+
+# Constants
+BOOTSTRAP = "bootstrap"
+GBM = "gbm"
+METHODS = [BOOTSTRAP, GBM]
+PATH = "path"
+DEFAULT_PATHS = 1000
+DEFAULT_BLOCK_SIZE = 5
+PERCENTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def optimize_scenario(
+    optimizer: str,
+    tickers: List[str],
+    window: Optional[np.ndarray],
+    exp_returns: Optional[np.ndarray],
+    covariance: Optional[np.ndarray],
+) -> Optional[np.ndarray]:
+    """
+    Calculates the portfolio weights of a lookback window of a simulated
+    path. This function runs in worker processes.
+
+    Args:
+        optimizer (str): The optimizer to use for asset allocation.
+        tickers (List[str]): The tickers of the universe.
+        window (Optional[np.ndarray]): The (dates x tickers) prices in the
+            lookback window, which are only used by the hrp optimizer.
+        exp_returns (Optional[np.ndarray]): The expected returns of the
+            window.
+        covariance (Optional[np.ndarray]): The covariance matrix of the
+            window.
+
+    Returns:
+        Optional[np.ndarray]: Returns the cleaned weight of each ticker, or
+            None if the window cannot be optimized.
+    """
+    if optimizer == HRP:
+        window = pd.DataFrame(window, columns=tickers)
+    else:
+        exp_returns = pd.Series(exp_returns, index=tickers)
+        covariance = risk_models.fix_nonpositive_semidefinite(
+            pd.DataFrame(covariance, index=tickers, columns=tickers)
+        )
+    try:
+        weights = optimize_weights(optimizer, window, exp_returns, covariance)
+    except (ValueError, OptimizationError):
+        return None
+    return np.array([weights[ticker] for ticker in tickers], dtype=np.float64)
+
+
+class MonteCarloBacktest:
+    """
+    Defines the MonteCarloBacktest class which backtests an optimizer over
+    many price paths simulated from the stock data, either by bootstrapping
+    blocks of historical daily returns or with a correlated geometric
+    Brownian motion fitted to them.
+
+    The paths are held in a (paths x dates x tickers) array and share the
+    trading dates, hence the rebalance dates, of the stock data. The
+    moments of every window are estimated in batched NumPy passes over the
+    paths, the optimizations are spread over a process pool, and the
+    rebalance-and-hold simulation updates the AUM of all paths at once.
+    Paths whose windows cannot be optimized, e.g. without any asset above
+    the risk-free rate for the msr optimizer, have missing statistics.
+    """
+
+    def __init__(
+        self,
+        stocks_data: pd.DataFrame,
+        initial_aum: int,
+        beginning_date: str,
+        optimizer: str,
+        *,
+        n_paths: int = DEFAULT_PATHS,
+        method: str = BOOTSTRAP,
+        lookback: int = DEFAULT_LOOKBACK,
+        rebalance: Union[str, RebalanceCalendar] = MONTH_END,
+        n_workers: int = 1,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        This method initialises the MonteCarloBacktest class.
+
+        Args:
+            stocks_data (pd.DataFrame): The dataframe containing the adjusted
+                close price for all stocks throughout the time frame, which
+                the paths are simulated from.
+            initial_aum (int): The initial asset under management amount.
+            beginning_date (str): The beginning date of the backtest period.
+            optimizer (str): The optimizer to use for asset allocation.
+            n_paths (int): The number of simulated paths. Defaults to 1000.
+            method (str): The simulation method, either "bootstrap" or
+                "gbm". Defaults to "bootstrap".
+            lookback (int): The number of trading days in the rolling window
+                used by the optimizer. Defaults to 250.
+            rebalance (Union[str, RebalanceCalendar]): The rebalance
+                calendar, or its frequency. Defaults to "month_end".
+            n_workers (int): The number of processes which optimize the
+                windows in parallel. Defaults to 1, which optimizes them in
+                this process.
+            block_size (int): The number of consecutive days in each
+                bootstrapped block of returns. Defaults to 5.
+            seed (Optional[int]): The seed of the random generator. Defaults
+                to None.
+
+        Raises:
+            ValueError: If the method is unknown, or if the stocks data does
+                not hold a full lookback window before the first rebalance
+                date.
+        """
+        if method not in METHODS:
+            raise ValueError("Simulation method must be one of "
+                             + ", ".join(METHODS))
+        self.initial_aum: int = initial_aum
+        self.beginning_date: str = beginning_date
+        self.optimizer: str = optimizer
+        self.n_paths: int = n_paths
+        self.method: str = method
+        self.lookback: int = lookback
+        self.n_workers: int = n_workers
+        self.block_size: int = block_size
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+
+        """
+        returns (np.ndarray): The historical daily returns without missing
+            prices, which the paths are simulated from.
+        rebalance_indexes (np.ndarray): The indexes of the rebalance dates
+            in the simulated dates.
+        stocks_data (pd.DataFrame): The prices from the lookback window of
+            the first rebalance date, whose dates and first prices are
+            shared by the paths.
+        """
+        values = stocks_data.to_numpy(dtype="float64")
+        returns = values[1:] / values[:-1] - 1
+        self.returns: np.ndarray = returns[~np.isnan(returns).any(axis=1)]
+        self.rebalance_indexes: np.ndarray = \
+            get_rebalance_calendar(rebalance).get_rebalance_indexes(
+                stocks_data.index, beginning_date
+            )
+        start = 0
+        if len(self.rebalance_indexes) > 0:
+            start = self.rebalance_indexes[0] - self.lookback + 1
+            if start < 0:
+                raise ValueError(
+                    f"Stocks data must contain at least {self.lookback} "
+                    "trading days up to the first rebalance date."
+                )
+        self.stocks_data: pd.DataFrame = stocks_data[start:]
+        self.rebalance_indexes = self.rebalance_indexes - start
+
+    def simulate_returns(self, n_steps: int) -> np.ndarray:
+        """
+        Simulates the daily returns of the paths.
+
+        Args:
+            n_steps (int): The number of daily returns of each path.
+
+        Returns:
+            np.ndarray: Returns the (paths x steps x tickers) daily returns.
+        """
+        if self.method == BOOTSTRAP:
+            block_size = min(self.block_size, len(self.returns))
+            n_blocks = -(-n_steps // block_size)
+            starts = self.rng.integers(
+                0, len(self.returns) - block_size + 1,
+                size=(self.n_paths, n_blocks),
+            )
+            rows = (starts[:, :, None] + np.arange(block_size)) \
+                .reshape(self.n_paths, -1)[:, :n_steps]
+            return self.returns[rows]
+
+        log_returns = np.log1p(self.returns)
+        factor = OptimizerSession.get_factor(np.cov(log_returns, rowvar=False))
+        shocks = self.rng.standard_normal(
+            (self.n_paths, n_steps, len(factor))
+        )
+        return np.expm1(log_returns.mean(axis=0) + shocks @ factor.T)
+
+    def simulate_paths(self) -> np.ndarray:
+        """
+        Simulates the price paths, which start from the first prices of the
+        stock data.
+
+        Returns:
+            np.ndarray: Returns the (paths x dates x tickers) prices.
+        """
+        first_prices = self.stocks_data.iloc[0].to_numpy(dtype="float64")
+        paths = np.empty((self.n_paths, len(self.stocks_data),
+                          len(first_prices)))
+        paths[:, 0] = first_prices
+        paths[:, 1:] = first_prices * np.cumprod(
+            1 + self.simulate_returns(len(self.stocks_data) - 1), axis=1
+        )
+        return paths
+
+    def get_moments(
+        self, paths: np.ndarray, date_index: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the annualised expected returns and covariance matrices of
+        the windows of all paths ending at a date index, like
+        expected_returns.mean_historical_return and risk_models.sample_cov.
+
+        Args:
+            paths (np.ndarray): The (paths x dates x tickers) prices.
+            date_index (int): The index of the last date of the windows.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Returns the (paths x tickers)
+                expected returns and (paths x tickers x tickers) covariance
+                matrices.
+        """
+        window = paths[:, date_index - self.lookback + 1 : date_index + 1]
+        exp_returns = (window[:, -1] / window[:, 0]) ** \
+            (FREQUENCY / (self.lookback - 1)) - 1
+        returns = window[:, 1:] / window[:, :-1] - 1
+        return exp_returns, sample_covariance(returns) * FREQUENCY
+
+    def optimize_paths(self, paths: np.ndarray) -> np.ndarray:
+        """
+        Calculates the portfolio weights of every path at every rebalance
+        date, spreading the optimizations over n_workers processes.
+
+        Args:
+            paths (np.ndarray): The (paths x dates x tickers) prices.
+
+        Returns:
+            np.ndarray: Returns the (paths x rebalances x tickers) weights,
+                which are NaN for the windows that cannot be optimized.
+        """
+        tickers = list(self.stocks_data.columns)
+        tasks = []
+        for date_index in self.rebalance_indexes:
+            if self.optimizer == HRP:
+                windows = paths[:, date_index - self.lookback + 1 :
+                                date_index + 1]
+                tasks += [(window, None, None) for window in windows]
+            else:
+                tasks += [
+                    (None, exp_returns, covariance)
+                    for exp_returns, covariance in
+                    zip(*self.get_moments(paths, date_index))
+                ]
+        arguments = ([self.optimizer] * len(tasks), [tickers] * len(tasks),
+                     *zip(*tasks))
+
+        if self.n_workers <= 1 or len(tasks) <= 1:
+            results = list(map(optimize_scenario, *arguments))
+        else:
+            chunksize = max(1, len(tasks) // (4 * self.n_workers))
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                results = list(executor.map(optimize_scenario, *arguments,
+                                            chunksize=chunksize))
+
+        weights = np.full((len(self.rebalance_indexes), self.n_paths,
+                           len(tickers)), np.nan)
+        for position, result in enumerate(results):
+            if result is not None:
+                weights.reshape(-1, len(tickers))[position] = result
+        return weights.transpose(1, 0, 2)
+
+    def simulate_aum(
+        self, paths: np.ndarray, weights: np.ndarray
+    ) -> np.ndarray:
+        """
+        Simulates the AUM of every path, rebalancing all paths at once at
+        each rebalance date and holding the portfolios until the next one.
+
+        Args:
+            paths (np.ndarray): The (paths x dates x tickers) prices.
+            weights (np.ndarray): The (paths x rebalances x tickers) weights.
+
+        Returns:
+            np.ndarray: Returns the (paths x dates) AUM.
+        """
+        last_index = paths.shape[1] - 1
+        aum = np.full(paths.shape[:2], float(self.initial_aum))
+        for idx, date_index in enumerate(self.rebalance_indexes):
+            shares = weights[:, idx] * aum[:, date_index, None] / \
+                paths[:, date_index]
+            next_index = self.rebalance_indexes[idx + 1] \
+                if idx + 1 < len(self.rebalance_indexes) else last_index
+            aum[:, date_index + 1 : next_index + 1] = np.einsum(
+                "ntk,nk->nt", paths[:, date_index + 1 : next_index + 1], shares
+            )
+        return aum
+
+    def run(self) -> pd.DataFrame:
+        """
+        Simulates the paths and backtests the optimizer over each of them
+        from the beginning date.
+
+        Returns:
+            pd.DataFrame: Returns the statistics of each path, which are NaN
+                for the paths that could not be optimized.
+        """
+        paths = self.simulate_paths()
+        aum = self.simulate_aum(paths, self.optimize_paths(paths))
+
+        dates = self.stocks_data.index
+        if dates.tz is not None:
+            dates = dates.tz_localize(None)
+        b_idx = dates.searchsorted(
+            pd.to_datetime(self.beginning_date, format=DATE_FORMAT)
+        )
+        datetime_indexes = self.stocks_data.index[b_idx:].to_list()
+        rows = []
+        for path, path_aum in enumerate(aum[:, b_idx:]):
+            row = {PATH: path}
+            if np.isnan(path_aum).any():
+                row.update(dict.fromkeys(METRIC_COLUMNS, np.nan))
+            else:
+                portfolio_performance = pd.DataFrame(
+                    {DATETIME: datetime_indexes, AUM: path_aum}
+                )
+                row.update(
+                    BacktestStats(portfolio_performance, ([], [])).get_metrics()
+                )
+            rows.append(row)
+        return pd.DataFrame(rows, columns=[PATH] + METRIC_COLUMNS)
+
+    @staticmethod
+    def get_distribution(
+        results: pd.DataFrame, percentiles: Sequence[float] = PERCENTILES
+    ) -> pd.DataFrame:
+        """
+        Summarises the distribution of the statistics of the paths.
+
+        Args:
+            results (pd.DataFrame): The statistics of each path. See run.
+            percentiles (Sequence[float]): The percentiles to include.
+                Defaults to the 5th, 25th, 50th, 75th and 95th.
+
+        Returns:
+            pd.DataFrame: Returns the count, mean, standard deviation,
+                minimum, percentiles and maximum of each statistic over the
+                paths which could be optimized.
+        """
+        return results[METRIC_COLUMNS].describe(percentiles=percentiles).T
@@ -0,0 +1,198 @@
+"""
+This module is responsible for solving the mean-variance optimization
+problems of the backtest without rebuilding them at every rebalance.
+"""
+from collections import OrderedDict
+from typing import List, Optional
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+
+# Constants
+MSR = "msr"
+MV = "mv"
+RISK_FREE_RATE = 0.02
+WEIGHT_CUTOFF = 1e-4
+WEIGHT_ROUNDING = 5
+
+
+def clean_weights(tickers: List[str], weights: np.ndarray) -> OrderedDict:
+    """
+    Zeroes the weights below the cutoff and rounds the others, like the
+    clean_weights method of PyPortfolioOpt's optimizers.
+
+    Args:
+        tickers (List[str]): The tickers of the universe.
+        weights (np.ndarray): The raw weight of each ticker.
+
+    Returns:
+        OrderedDict: Returns the cleaned weight of each ticker.
+    """
+    weights = weights.copy()
+    weights[np.abs(weights) < WEIGHT_CUTOFF] = 0
+    return OrderedDict(zip(tickers, np.round(weights, WEIGHT_ROUNDING)))
+
+
+class OptimizerSession:
+    """
+    Defines the OptimizerSession class which builds the max Sharpe ratio or
+    min volatility problem of a universe once, with the expected returns and
+    a factor of the covariance matrix as cvxpy parameters. Each rebalance
+    only updates the parameters and re-solves the compiled problem, warm
+    started from the previous solution.
+
+    The problems are the ones solved by PyPortfolioOpt's EfficientFrontier
+    with long-only weights, and the weights are cleaned the same way as
+    EfficientFrontier.clean_weights. The variance is written as
+    sum_squares(L.T @ w) with cov = L @ L.T, which keeps the problem
+    parameterized in a way cvxpy can compile once.
+    """
+
+    def __init__(
+        self,
+        optimizer: str,
+        tickers: List[str],
+        risk_free_rate: float = RISK_FREE_RATE,
+        solver: Optional[str] = None,
+    ) -> None:
+        """
+        This method initialises the OptimizerSession class.
+
+        Args:
+            optimizer (str): The optimizer, either "msr" or "mv".
+            tickers (List[str]): The tickers of the universe.
+            risk_free_rate (float): The risk-free rate used by the max Sharpe
+                ratio optimizer. Defaults to 0.02.
+            solver (Optional[str]): The cvxpy solver to use. Defaults to
+                cvxpy's choice.
+
+        Raises:
+            ValueError: If the optimizer is not "msr" or "mv".
+        """
+        if optimizer not in [MSR, MV]:
+            raise ValueError("Optimizer session supports either msr or mv.")
+        self.optimizer: str = optimizer
+        self.tickers: List[str] = list(tickers)
+        self.risk_free_rate: float = risk_free_rate
+        self.solver: Optional[str] = solver
+
+        """
+        factor (cp.Parameter): The factor L of the covariance matrix.
+        excess_returns (cp.Parameter): The expected returns in excess of
+            the risk-free rate.
+        weights (cp.Variable): The portfolio weights, or the scaled weights
+            of the transformed max Sharpe ratio problem.
+        scale (Optional[cp.Variable]): The scale k of the transformed max
+            Sharpe ratio problem.
+        problem (cp.Problem): The parameterized problem.
+        solves (int): The number of problems solved in this session.
+        """
+        n_assets = len(self.tickers)
+        self.factor: cp.Parameter = cp.Parameter((n_assets, n_assets))
+        self.excess_returns: cp.Parameter = cp.Parameter(n_assets)
+        self.weights: cp.Variable = cp.Variable(n_assets)
+        self.scale: Optional[cp.Variable] = None
+        objective = cp.Minimize(cp.sum_squares(self.factor.T @ self.weights))
+        if optimizer == MSR:
+            # max Sharpe ratio as a convex problem in y = k * w
+            self.scale = cp.Variable()
+            constraints = [
+                self.excess_returns @ self.weights == 1,
+                cp.sum(self.weights) == self.scale,
+                self.scale >= 0,
+                self.weights >= 0,
+                self.weights <= self.scale,
+            ]
+        else:
+            constraints = [
+                cp.sum(self.weights) == 1,
+                self.weights >= 0,
+                self.weights <= 1,
+            ]
+        self.problem: cp.Problem = cp.Problem(objective, constraints)
+        self.solves: int = 0
+
+    def __getstate__(self) -> dict:
+        """
+        dict: Returns the settings of the session for pickling. The compiled
+            problem holds solver objects which cannot be pickled, so it is
+            built again when unpickling and the next solve is not warm
+            started.
+        """
+        return {
+            "optimizer": self.optimizer,
+            "tickers": self.tickers,
+            "risk_free_rate": self.risk_free_rate,
+            "solver": self.solver,
+            "solves": self.solves,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Builds the problem of an unpickled session from its settings.
+
+        Args:
+            state (dict): The settings returned by __getstate__.
+        """
+        self.__init__(state["optimizer"], state["tickers"],
+                      state["risk_free_rate"], state["solver"])
+        self.solves = state["solves"]
+
+    @staticmethod
+    def get_factor(covariance: np.ndarray) -> np.ndarray:
+        """
+        Factorises a covariance matrix as L @ L.T, using the Cholesky
+        decomposition or, for singular matrices, the eigendecomposition.
+
+        Args:
+            covariance (np.ndarray): The covariance matrix.
+
+        Returns:
+            np.ndarray: Returns the factor L.
+        """
+        try:
+            return np.linalg.cholesky(covariance)
+        except np.linalg.LinAlgError:
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+            return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+    def solve(
+        self, exp_returns: pd.Series, covariance: pd.DataFrame
+    ) -> OrderedDict:
+        """
+        Updates the parameters and solves the problem for a window.
+
+        Args:
+            exp_returns (pd.Series): The expected returns of the window.
+            covariance (pd.DataFrame): The covariance matrix of the window.
+
+        Raises:
+            ValueError: If no asset has an expected return above the
+                risk-free rate for the max Sharpe ratio optimizer, or the
+                solver fails.
+
+        Returns:
+            OrderedDict: Returns the cleaned weight of each ticker.
+        """
+        exp_returns = exp_returns.reindex(self.tickers).to_numpy(float)
+        covariance = covariance.reindex(index=self.tickers,
+                                        columns=self.tickers).to_numpy(float)
+        if self.optimizer == MSR and exp_returns.max() <= self.risk_free_rate:
+            raise ValueError(
+                "At least one of the assets must have an expected return "
+                "exceeding the risk-free rate."
+            )
+        self.factor.value = self.get_factor(covariance)
+        self.excess_returns.value = exp_returns - self.risk_free_rate
+        self.problem.solve(solver=self.solver, warm_start=True)
+        if self.problem.status not in ["optimal", "optimal_inaccurate"]:
+            raise ValueError(
+                f"Solver failed with status {self.problem.status}."
+            )
+        self.solves += 1
+
+        weights = self.weights.value
+        if self.scale is not None:
+            weights = weights / self.scale.value
+        return clean_weights(self.tickers, weights.round(16) + 0.0)
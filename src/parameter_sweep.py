@@ -0,0 +1,401 @@
+"""
+This module is responsible for running backtests over a grid of parameters.
+"""
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_stats import METRIC_COLUMNS, BacktestStats
+from src.rebalance_calendar import MONTH_END, get_rebalance_calendar
+from src.rolling_moments import RollingMoments
+from src.run_backtest import OPTIMIZATION_ERRORS, RunBacktest
+from src.shared_prices import SharedPrices
+from src.stocks_fetcher import StocksFetcher
+from src.trading_calendar import DEFAULT_LOOKBACK
+
+# Constants
+TICKERS = "tickers"
+OPTIMIZER = "optimizer"
+LOOKBACK = "lookback"
+REBALANCE = "rebalance"
+KEY_COLUMNS = [TICKERS, OPTIMIZER, LOOKBACK, REBALANCE]
+RESULT_COLUMNS = KEY_COLUMNS + METRIC_COLUMNS + ["error"]
+
+# Prices shared by the backtests of a worker process
+worker_prices: Optional[SharedPrices] = None
+worker_stocks_data: Optional[pd.DataFrame] = None
+
+
+def init_worker(stocks_data: Union[pd.DataFrame, SharedPrices]) -> None:
+    """
+    Stores the prices of the sweep in a worker process once, so they are
+    not sent again with every backtest. Shared prices are read from shared
+    memory without copying them to the worker.
+
+    Args:
+        stocks_data (Union[pd.DataFrame, SharedPrices]): The prices of
+            every ticker in the sweep.
+    """
+    global worker_prices, worker_stocks_data
+    if isinstance(stocks_data, SharedPrices):
+        worker_prices = stocks_data
+        stocks_data = stocks_data.to_frame()
+    worker_stocks_data = stocks_data
+
+
+def get_key(combination: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """
+    Tuple[str, str, str, str]: Returns the key identifying a combination in
+        the results file.
+    """
+    return (
+        ",".join(combination[TICKERS]),
+        str(combination[OPTIMIZER]),
+        str(combination[LOOKBACK]),
+        str(combination[REBALANCE]),
+    )
+
+
+def run_group(
+    initial_aum: int,
+    beginning_date: str,
+    *,
+    tickers: List[str],
+    lookback: int,
+    schedules: Dict[str, List[str]],
+) -> List[Dict[str, Any]]:
+    """
+    Backtests the combinations of a group which share the same universe and
+    lookback. The optimizers of each rebalance schedule are backtested
+    together, and the schedules share one rolling moments of the universe
+    which is moved through the union of their rebalance dates in order, so
+    the moments of each window are computed once for the group. If a
+    schedule fails, its optimizers are backtested one by one so that the
+    error is only recorded for the failing ones. Errors are written on one
+    line, so that a row cut short by a crash can be found when resuming.
+
+    Args:
+        initial_aum (int): The initial asset under management amount.
+        beginning_date (str): The beginning date of the backtest period.
+        tickers (List[str]): The tickers of the universe.
+        lookback (int): The number of trading days in the rolling window.
+        schedules (Dict[str, List[str]]): The optimizers to backtest with
+            each rebalance frequency.
+
+    Returns:
+        List[Dict[str, Any]]: Returns the result row of each combination.
+    """
+    stocks_data = worker_stocks_data[tickers].dropna(how="all")
+    errors: Dict[str, Exception] = {}
+    starts = []
+    for rebalance in schedules:
+        try:
+            rebalance_indexes = np.flatnonzero(
+                get_rebalance_calendar(rebalance).get_rebalance_mask(
+                    stocks_data.index, beginning_date
+                )
+            )
+        except ValueError as error:
+            errors[rebalance] = error
+            continue
+        if len(rebalance_indexes) > 0:
+            starts.append(rebalance_indexes[0] - lookback + 1)
+
+    # the moments start from the earliest lookback window of the schedules
+    stocks_data = stocks_data[max(0, min(starts, default=0)):]
+    moments = RollingMoments(stocks_data, lookback)
+    backtests: Dict[str, RunBacktest] = {}
+    for rebalance, optimizers in schedules.items():
+        if rebalance in errors:
+            continue
+        try:
+            backtests[rebalance] = RunBacktest(
+                stocks_data, initial_aum, beginning_date, optimizers,
+                lookback=lookback, rebalance=rebalance, moments=moments,
+            )
+        except OPTIMIZATION_ERRORS as error:
+            errors[rebalance] = error
+
+    rebalance_weights = {
+        rebalance: {optimizer: [] for optimizer in schedules[rebalance]}
+        for rebalance in backtests
+    }
+    for date_index in sorted(set().union(*(
+        backtest.rebalance_indexes for backtest in backtests.values()
+    ))):
+        for rebalance, backtest in backtests.items():
+            if rebalance in errors or not backtest.rebalance_mask[date_index]:
+                continue
+            try:
+                weights = backtest.optimize_rebalances([date_index])
+            except OPTIMIZATION_ERRORS as error:
+                errors[rebalance] = error
+                continue
+            for optimizer, optimizer_weights in weights.items():
+                rebalance_weights[rebalance][optimizer] += optimizer_weights
+
+    rows = []
+    for rebalance, optimizers in schedules.items():
+        stats = {}
+        if rebalance not in errors:
+            backtest = backtests[rebalance]
+            try:
+                backtest.fill_up_portfolio_performance(
+                    rebalance_weights[rebalance]
+                )
+                stats = BacktestStats(backtest.portfolio_performance,
+                                      backtest.history).get_strategy_stats()
+            except OPTIMIZATION_ERRORS as error:
+                errors[rebalance] = error
+        if rebalance in errors and len(optimizers) > 1:
+            # find which optimizers fail by backtesting them one by one
+            rows += [
+                row for optimizer in optimizers
+                for row in run_group(initial_aum, beginning_date,
+                                     tickers=tickers, lookback=lookback,
+                                     schedules={rebalance: [optimizer]})
+            ]
+            continue
+        message = " ".join(str(errors.get(rebalance, "")).split())
+        for optimizer in optimizers:
+            row = dict(zip(KEY_COLUMNS, [",".join(tickers), optimizer,
+                                         lookback, rebalance]))
+            if optimizer in stats:
+                row.update(stats[optimizer].get_metrics())
+                row["error"] = ""
+            else:
+                row["error"] = message
+            rows.append(row)
+    return rows
+
+
+class ParameterSweep:
+    """
+    Defines the ParameterSweep class which backtests every combination of a
+    grid of universes, optimizers, lookbacks and rebalance frequencies.
+
+    The prices are fetched or given once for the union of the universes and
+    placed in shared memory, which each worker of a long-lived process pool
+    reads without copying. Combinations that only differ by optimizer or
+    rebalance frequency are backtested together, sharing their rolling
+    moments. Each finished combination is appended to a CSV results file
+    with one column per statistic, and the path of the file is returned
+    rather than its contents, so memory does not grow with the grid.
+    Combinations already in the file are skipped when a sweep is resumed. A
+    row left partially written by a crash is dropped first.
+
+    The results are kept in CSV rather than Parquet: a Parquet file is only
+    readable once its footer is written, so it cannot be appended to row by
+    row and survive a crash, and pyarrow is an optional dependency.
+    """
+
+    def __init__(
+        self,
+        stocks_data: pd.DataFrame,
+        initial_aum: int,
+        beginning_date: str,
+        results_path: str,
+        n_workers: int = 1,
+    ) -> None:
+        """
+        This method initialises the ParameterSweep class.
+
+        Args:
+            stocks_data (pd.DataFrame): The dataframe containing the adjusted
+                close price of every ticker in the grid, with enough history
+                for the longest lookback.
+            initial_aum (int): The initial asset under management amount.
+            beginning_date (str): The beginning date of the backtest period.
+            results_path (str): The path of the CSV results file.
+            n_workers (int): The number of processes which run the
+                backtests. Defaults to 1, which runs them in this process.
+        """
+        self.stocks_data: pd.DataFrame = stocks_data
+        self.initial_aum: int = initial_aum
+        self.beginning_date: str = beginning_date
+        self.results_path: str = results_path
+        self.n_workers: int = n_workers
+
+    @staticmethod
+    def fetch_stocks_data(
+        fetcher: StocksFetcher,
+        grid: Dict[str, List[Any]],
+        beginning_date: str,
+        ending_date: str,
+    ) -> pd.DataFrame:
+        """
+        Fetches the prices of a grid once, for the union of its universes
+        and with enough history for its longest lookback.
+
+        Args:
+            fetcher (StocksFetcher): The fetcher of the stocks data.
+            grid (Dict[str, List[Any]]): The parameter grid.
+            beginning_date (str): The beginning date of the backtest period.
+            ending_date (str): The ending date of the backtest period.
+
+        Returns:
+            pd.DataFrame: Returns the prices of every ticker in the grid.
+        """
+        tickers = sorted({
+            ticker for universe in grid[TICKERS] for ticker in universe
+        })
+        lookback = max(grid.get(LOOKBACK, [DEFAULT_LOOKBACK]))
+        return fetcher.fetch_stocks_data(tickers, beginning_date, ending_date,
+                                         lookback=lookback)
+
+    def expand_grid(
+        self, grid: Dict[str, List[Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Expands a parameter grid into its combinations.
+
+        Args:
+            grid (Dict[str, List[Any]]): The lists of universes ("tickers"),
+                optimizers ("optimizer"), lookbacks ("lookback") and
+                rebalance frequencies ("rebalance"). The universe defaults
+                to every ticker in the stocks data, the lookback to 250 and
+                the rebalance frequency to "month_end".
+
+        Raises:
+            ValueError: If the grid has no optimizers or unknown parameters.
+
+        Returns:
+            List[Dict[str, Any]]: Returns the combinations of the grid.
+        """
+        unknown = set(grid) - set(KEY_COLUMNS)
+        if unknown:
+            raise ValueError(
+                "Unknown sweep parameters: " + ", ".join(sorted(unknown))
+            )
+        if not grid.get(OPTIMIZER):
+            raise ValueError("Optimizers must be specified.")
+        values = {
+            TICKERS: [
+                list(universe) for universe in
+                grid.get(TICKERS, [list(self.stocks_data.columns)])
+            ],
+            OPTIMIZER: grid[OPTIMIZER],
+            LOOKBACK: grid.get(LOOKBACK, [DEFAULT_LOOKBACK]),
+            REBALANCE: grid.get(REBALANCE, [MONTH_END]),
+        }
+        return [
+            dict(zip(KEY_COLUMNS, combination))
+            for combination in itertools.product(
+                *(values[key] for key in KEY_COLUMNS)
+            )
+        ]
+
+    def repair_results(self) -> None:
+        """
+        None: Truncates the results file after its last complete line,
+            dropping a row which a crash left partially written.
+        """
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, "rb+") as file:
+            end = file.read().rfind(b"\n") + 1
+            file.truncate(end)
+
+    def get_completed(self) -> Set[Tuple[str, str, str, str]]:
+        """
+        Set[Tuple[str, str, str, str]]: Returns the keys of the combinations
+            already in the results file.
+        """
+        if not os.path.exists(self.results_path):
+            return set()
+        self.repair_results()
+        with open(self.results_path, newline="", encoding="utf-8") as file:
+            return {
+                tuple(row[key] for key in KEY_COLUMNS)
+                for row in csv.DictReader(file)
+            }
+
+    def group_combinations(
+        self, combinations: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Groups the combinations which share the same universe and lookback.
+
+        Args:
+            combinations (List[Dict[str, Any]]): The combinations to run.
+
+        Returns:
+            List[Dict[str, Any]]: Returns the tickers, lookback and the
+                optimizers of each rebalance frequency of each group, keyed
+                by the arguments of run_group.
+        """
+        groups = {}
+        for combination in combinations:
+            key = (tuple(combination[TICKERS]), combination[LOOKBACK])
+            groups.setdefault(key, {}) \
+                .setdefault(combination[REBALANCE], []) \
+                .append(combination[OPTIMIZER])
+        return [
+            {
+                "tickers": list(tickers),
+                "lookback": lookback,
+                "schedules": schedules,
+            }
+            for (tickers, lookback), schedules in groups.items()
+        ]
+
+    def run(self, grid: Dict[str, List[Any]]) -> str:
+        """
+        Backtests every combination of a grid which is not already in the
+        results file, appending each result to the file as soon as its
+        group finishes.
+
+        Args:
+            grid (Dict[str, List[Any]]): The parameter grid. See
+                expand_grid.
+
+        Returns:
+            str: Returns the path of the results file, which can be read in
+                chunks with pd.read_csv(path, chunksize=...).
+        """
+        completed = self.get_completed()
+        combinations = [
+            combination for combination in self.expand_grid(grid)
+            if get_key(combination) not in completed
+        ]
+        groups = self.group_combinations(combinations)
+
+        write_header = not os.path.exists(self.results_path) or \
+            os.path.getsize(self.results_path) == 0
+        with open(self.results_path, "a", newline="",
+                  encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS)
+            if write_header:
+                writer.writeheader()
+                file.flush()
+
+            def write_rows(rows: List[Dict[str, Any]]) -> None:
+                writer.writerows(rows)
+                file.flush()
+
+            if self.n_workers <= 1 or len(groups) <= 1:
+                init_worker(self.stocks_data)
+                for group in groups:
+                    write_rows(run_group(self.initial_aum,
+                                         self.beginning_date, **group))
+            else:
+                with SharedPrices(self.stocks_data) as shared_prices, \
+                        ProcessPoolExecutor(
+                            max_workers=self.n_workers,
+                            initializer=init_worker,
+                            initargs=(shared_prices,),
+                        ) as executor:
+                    futures = [
+                        executor.submit(run_group, self.initial_aum,
+                                        self.beginning_date, **group)
+                        for group in groups
+                    ]
+                    for future in as_completed(futures):
+                        write_rows(future.result())
+
+        return self.results_path
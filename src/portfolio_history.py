@@ -0,0 +1,154 @@
+"""
+This module is responsible for recording the portfolio at each rebalance of
+the backtest.
+"""
+from collections import OrderedDict
+from typing import List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class PortfolioHistory:
+    """
+    Defines the PortfolioHistory class which records the rebalance dates,
+    weights and shares held of a portfolio in arrays over a fixed index of
+    tickers: a datetime64 array of dates and two (rebalances x tickers)
+    float arrays. The arrays grow by doubling, so appending a rebalance is
+    amortised constant time.
+    """
+
+    def __init__(self, tickers: List[str], capacity: int = 0) -> None:
+        """
+        This method initialises the PortfolioHistory class.
+
+        Args:
+            tickers (List[str]): The tickers of the universe.
+            capacity (int): The number of rebalances to allocate space for.
+                Defaults to 0.
+        """
+        self.tickers: pd.Index = pd.Index(tickers)
+
+        """
+        size (int): The number of rebalances recorded.
+        dates (np.ndarray): The allocated datetime64 rebalance dates.
+        weights (np.ndarray): The allocated (rebalances x tickers) weights.
+        shares (np.ndarray): The allocated (rebalances x tickers) amounts of
+            stock held.
+        """
+        self.size: int = 0
+        self.dates: np.ndarray = np.empty(capacity, dtype="datetime64[ns]")
+        self.weights: np.ndarray = np.empty((capacity, len(self.tickers)))
+        self.shares: np.ndarray = np.empty((capacity, len(self.tickers)))
+
+    def __len__(self) -> int:
+        """
+        int: Returns the number of rebalances recorded.
+        """
+        return self.size
+
+    def align(self, weights: Mapping[str, float]) -> np.ndarray:
+        """
+        Converts the weight of each ticker to an array over the tickers of
+        the history.
+
+        Args:
+            weights (Mapping[str, float]): The weight of each ticker. Missing
+                tickers have no weight.
+
+        Returns:
+            np.ndarray: Returns the weights in the order of the tickers.
+        """
+        if list(weights) == list(self.tickers):
+            return np.fromiter(weights.values(), dtype=np.float64,
+                               count=len(self.tickers))
+        return np.array([weights.get(ticker, 0.0) for ticker in self.tickers],
+                        dtype=np.float64)
+
+    def append(
+        self, date: pd.Timestamp, weights: np.ndarray, shares: np.ndarray
+    ) -> None:
+        """
+        Records a rebalance.
+
+        Args:
+            date (pd.Timestamp): The rebalance date. Timezones are dropped,
+                keeping the local date and time.
+            weights (np.ndarray): The weight of each ticker.
+            shares (np.ndarray): The amount of each stock held.
+        """
+        if self.size == len(self.dates):
+            capacity = max(2 * len(self.dates), 1)
+            self.dates = np.resize(self.dates, capacity)
+            self.weights = np.resize(self.weights,
+                                     (capacity, len(self.tickers)))
+            self.shares = np.resize(self.shares,
+                                    (capacity, len(self.tickers)))
+        date = pd.Timestamp(date)
+        if date.tzinfo is not None:
+            date = date.tz_localize(None)
+        self.dates[self.size] = date.to_datetime64()
+        self.weights[self.size] = weights
+        self.shares[self.size] = shares
+        self.size += 1
+
+    def get_dates(self) -> np.ndarray:
+        """
+        np.ndarray: Returns the datetime64 rebalance dates.
+        """
+        return self.dates[: self.size]
+
+    def get_weights(self) -> np.ndarray:
+        """
+        np.ndarray: Returns the (rebalances x tickers) weights.
+        """
+        return self.weights[: self.size]
+
+    def get_shares(self) -> np.ndarray:
+        """
+        np.ndarray: Returns the (rebalances x tickers) amounts of stock held.
+        """
+        return self.shares[: self.size]
+
+    def get_date_strings(self) -> List[str]:
+        """
+        List[str]: Returns the rebalance dates in format YYYY-MM-DD.
+        """
+        return np.datetime_as_string(self.get_dates(), unit="D").tolist()
+
+    def get_weights_frame(self) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns the weights with a row per rebalance, indexed
+            by the rebalance dates in format YYYY-MM-DD, and a column per
+            ticker.
+        """
+        return pd.DataFrame(self.get_weights(), index=self.get_date_strings(),
+                            columns=self.tickers)
+
+    def get_portfolio(self, position: int = -1) -> OrderedDict:
+        """
+        OrderedDict: Returns the amount of each stock held after a
+            rebalance, by default the last one.
+        """
+        return OrderedDict(zip(self.tickers, self.get_shares()[position]))
+
+    def to_weights_record(
+        self,
+    ) -> Tuple[List[str], List[OrderedDict]]:
+        """
+        Tuple[List[str], List[OrderedDict]]: Returns the rebalance dates in
+            format YYYY-MM-DD and the weight of each ticker at each of them.
+        """
+        return (
+            self.get_date_strings(),
+            [OrderedDict(zip(self.tickers, row)) for row in self.get_weights()],
+        )
+
+    def to_portfolio_record(self) -> List[OrderedDict]:
+        """
+        List[OrderedDict]: Returns the amount of each stock held after each
+            rebalance.
+        """
+        return [
+            OrderedDict(zip(self.tickers, row)) for row in self.get_shares()
+        ]
@@ -0,0 +1,281 @@
+"""
+This module is responsible for caching the fetched stocks data on disk.
+"""
+import fcntl
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import List, Tuple
+
+import pandas as pd
+
+# Constants
+CACHE_DATE_FORMAT = "%Y-%m-%d"
+PRICES_SUFFIX = ".pkl"
+COVERAGE_SUFFIX = ".json"
+LOCK_SUFFIX = ".lock"
+
+
+def merge_ranges(
+    ranges: List[Tuple[datetime, datetime]]
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Merges overlapping or adjacent half-open date ranges.
+
+    Args:
+        ranges (List[Tuple[datetime, datetime]]): The list of
+            [start, end) date ranges.
+
+    Returns:
+        List[Tuple[datetime, datetime]]: Returns the sorted list of
+            disjoint date ranges covering the same dates.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_ranges(
+    start: datetime, end: datetime, covered: List[Tuple[datetime, datetime]]
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Computes the parts of the [start, end) range that are not covered.
+
+    Args:
+        start (datetime): The start of the requested range.
+        end (datetime): The exclusive end of the requested range.
+        covered (List[Tuple[datetime, datetime]]): The sorted list of
+            disjoint ranges that are already covered.
+
+    Returns:
+        List[Tuple[datetime, datetime]]: Returns the list of missing
+            [start, end) ranges.
+    """
+    missing = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def slice_dates(data: pd.Series, start: datetime, end: datetime) -> pd.Series:
+    """
+    Slices a price series to the [start, end) date range regardless of
+    whether its index is timezone aware.
+
+    Args:
+        data (pd.Series): The price series indexed by date.
+        start (datetime): The start of the range.
+        end (datetime): The exclusive end of the range.
+
+    Returns:
+        pd.Series: Returns the prices within the date range.
+    """
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return data[(index >= start) & (index < end)]
+
+
+class PriceCache:
+    """
+    Defines the PriceCache class which stores the adjusted close prices
+    of each ticker on disk, together with the date ranges that have
+    already been fetched for it. Stores of a ticker hold an exclusive lock
+    on it, so concurrent processes merging into the same ticker do not
+    lose each other's prices.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        This method initialises the PriceCache class.
+
+        Args:
+            cache_dir (str): The directory in which the cached prices are
+                stored. It is created if it does not exist.
+        """
+        self.cache_dir: str = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_prices_path(self, ticker: str) -> str:
+        """
+        str: Returns the path of the cached prices of a ticker.
+        """
+        return os.path.join(self.cache_dir, ticker + PRICES_SUFFIX)
+
+    def get_coverage_path(self, ticker: str) -> str:
+        """
+        str: Returns the path of the cached date coverage of a ticker.
+        """
+        return os.path.join(self.cache_dir, ticker + COVERAGE_SUFFIX)
+
+    def get_lock_path(self, ticker: str) -> str:
+        """
+        str: Returns the path of the lock file of a ticker.
+        """
+        return os.path.join(self.cache_dir, ticker + LOCK_SUFFIX)
+
+    def get_coverage(self, ticker: str) -> List[Tuple[datetime, datetime]]:
+        """
+        Reads the date ranges that have already been fetched for a ticker.
+
+        Args:
+            ticker (str): The ticker symbol.
+
+        Returns:
+            List[Tuple[datetime, datetime]]: Returns the sorted list of
+                disjoint [start, end) ranges in the cache.
+        """
+        path = self.get_coverage_path(ticker)
+        if not os.path.isfile(path):
+            return []
+        with open(path, "r", encoding="utf-8") as file:
+            ranges = json.load(file)
+        return [
+            (
+                datetime.strptime(start, CACHE_DATE_FORMAT),
+                datetime.strptime(end, CACHE_DATE_FORMAT),
+            )
+            for start, end in ranges
+        ]
+
+    def get_missing_ranges(
+        self, ticker: str, start: datetime, end: datetime
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Finds the date ranges of a request that are not in the cache.
+
+        Args:
+            ticker (str): The ticker symbol.
+            start (datetime): The start of the requested range.
+            end (datetime): The exclusive end of the requested range.
+
+        Returns:
+            List[Tuple[datetime, datetime]]: Returns the list of
+                [start, end) ranges that must still be fetched.
+        """
+        return subtract_ranges(start, end, self.get_coverage(ticker))
+
+    def read_prices(self, ticker: str) -> pd.Series:
+        """
+        pd.Series: Returns all the cached prices of a ticker.
+        """
+        path = self.get_prices_path(ticker)
+        if not os.path.isfile(path):
+            return pd.Series(dtype="float64", name=ticker,
+                             index=pd.DatetimeIndex([]))
+        return pd.read_pickle(path)
+
+    def store(
+        self, ticker: str, prices: pd.Series, start: datetime, end: datetime
+    ) -> None:
+        """
+        Merges newly fetched prices of a ticker into the cache and marks
+        the [start, end) range as fetched.
+
+        Args:
+            ticker (str): The ticker symbol.
+            prices (pd.Series): The prices fetched for the range.
+            start (datetime): The start of the fetched range.
+            end (datetime): The exclusive end of the fetched range.
+        """
+        with open(self.get_lock_path(ticker), "w", encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.merge(ticker, prices, start, end)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def merge(
+        self, ticker: str, prices: pd.Series, start: datetime, end: datetime
+    ) -> None:
+        """
+        Reads the cached prices and coverage of a ticker, merges the new
+        ones into them and writes them back. The caller must hold the lock
+        of the ticker.
+
+        Args:
+            ticker (str): The ticker symbol.
+            prices (pd.Series): The prices fetched for the range.
+            start (datetime): The start of the fetched range.
+            end (datetime): The exclusive end of the fetched range.
+        """
+        prices = prices.dropna().rename(ticker)
+        cached = self.read_prices(ticker)
+        if not cached.empty:
+            prices = pd.concat([cached, prices])
+            prices = prices[~prices.index.duplicated(keep="last")]
+        prices = prices.sort_index()
+        self.write_atomic(self.get_prices_path(ticker), prices.to_pickle)
+
+        coverage = merge_ranges(self.get_coverage(ticker) + [(start, end)])
+        ranges = [
+            [
+                range_start.strftime(CACHE_DATE_FORMAT),
+                range_end.strftime(CACHE_DATE_FORMAT),
+            ]
+            for range_start, range_end in coverage
+        ]
+
+        def write_coverage(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(ranges, file)
+
+        self.write_atomic(self.get_coverage_path(ticker), write_coverage)
+
+    def write_atomic(self, path: str, writer) -> None:
+        """
+        Writes a file through a temporary file in the same directory so that
+        concurrent readers never see a partially written file.
+
+        Args:
+            path (str): The path of the file to write.
+            writer (Callable[[str], None]): The function writing the
+                contents to a given path.
+        """
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        os.close(file_descriptor)
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load(
+        self, tickers: List[str], start: datetime, end: datetime
+    ) -> pd.DataFrame:
+        """
+        Loads the cached prices of multiple tickers within a date range.
+
+        Args:
+            tickers (List[str]): The ticker symbols.
+            start (datetime): The start of the requested range.
+            end (datetime): The exclusive end of the requested range.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe containing the adjusted close
+                price for each ticker at each trading date in the range.
+        """
+        columns = [
+            slice_dates(self.read_prices(ticker), start, end).rename(ticker)
+            for ticker in tickers
+        ]
+        data = pd.concat(columns, axis=1).sort_index()
+        data.index.name = "Date"
+        return data
@@ -0,0 +1,139 @@
+"""
+This module is responsible for storing the stocks data as a memory-mapped
+price matrix which several processes can share.
+"""
+import json
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Constants
+VALUES_FILE = "values.bin"
+DATES_FILE = "dates.npy"
+META_FILE = "meta.json"
+DATE_INDEX_NAME = "Date"
+DTYPES = ["float64", "float32"]
+
+
+class PriceStore:
+    """
+    Defines the PriceStore class which reads a price matrix stored on disk
+    as a date axis, a ticker axis and a row-major binary file of values.
+    The values are opened with numpy.memmap, so windows are zero-copy views
+    and processes opening the same store share the operating system page
+    cache instead of each holding a copy.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        This method initialises the PriceStore class by opening an existing
+        store read-only.
+
+        Args:
+            path (str): The directory of the store.
+        """
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as file:
+            meta = json.load(file)
+        self.path: str = path
+
+        """
+        tickers (List[str]): The ticker symbols along the column axis.
+        tz (Optional[str]): The timezone of the dates, if any.
+        dates (np.ndarray): The datetime64 dates along the row axis.
+        values (np.memmap): The read-only (dates x tickers) price matrix.
+        """
+        self.tickers: List[str] = meta["tickers"]
+        self.tz: Optional[str] = meta["tz"]
+        self.dates: np.ndarray = np.load(os.path.join(path, DATES_FILE))
+        self.values: np.memmap = np.memmap(
+            os.path.join(path, VALUES_FILE),
+            dtype=meta["dtype"],
+            mode="r",
+            shape=(len(self.dates), len(self.tickers)),
+        )
+
+    @staticmethod
+    def write(
+        path: str, stocks_data: pd.DataFrame, dtype: str = "float64"
+    ) -> "PriceStore":
+        """
+        Writes a dataframe of prices to a new store.
+
+        Args:
+            path (str): The directory of the store. It is created if it does
+                not exist.
+            stocks_data (pd.DataFrame): The dataframe containing the adjusted
+                close price for all stocks throughout the time frame.
+            dtype (str): The dtype of the stored values, either "float64" or
+                "float32". Defaults to "float64".
+
+        Raises:
+            ValueError: If the dtype is not supported.
+
+        Returns:
+            PriceStore: Returns the store opened read-only.
+        """
+        if dtype not in DTYPES:
+            raise ValueError("Dtype must be either float64 or float32.")
+        os.makedirs(path, exist_ok=True)
+
+        index = pd.DatetimeIndex(stocks_data.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert(None)
+        np.save(os.path.join(path, DATES_FILE), index.values)
+
+        values = np.memmap(
+            os.path.join(path, VALUES_FILE),
+            dtype=dtype,
+            mode="w+",
+            shape=stocks_data.shape,
+        )
+        values[:] = stocks_data.to_numpy(dtype=dtype)
+        values.flush()
+        del values
+
+        meta = {
+            "dtype": dtype,
+            "tickers": [str(ticker) for ticker in stocks_data.columns],
+            "tz": tz,
+        }
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+        return PriceStore(path)
+
+    def get_index(self) -> pd.DatetimeIndex:
+        """
+        pd.DatetimeIndex: Returns the dates of the store.
+        """
+        index = pd.DatetimeIndex(self.dates, name=DATE_INDEX_NAME)
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def window(self, start: int, stop: int) -> np.ndarray:
+        """
+        Gets a zero-copy view of the prices between two date positions.
+
+        Args:
+            start (int): The position of the first date.
+            stop (int): The exclusive position of the last date.
+
+        Returns:
+            np.ndarray: Returns the read-only (dates x tickers) view.
+        """
+        return self.values[start:stop]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns a dataframe backed by the memory-mapped values
+            without copying them.
+        """
+        return pd.DataFrame(
+            self.values,
+            index=self.get_index(),
+            columns=self.tickers,
+            copy=False,
+        )
@@ -0,0 +1,185 @@
+"""
+This module is responsible for measuring the time and memory spent in each
+stage of a run.
+"""
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+# Constants
+STAGE = "stage"
+CALLS = "calls"
+WALL_TIME = "wall_time"
+CPU_TIME = "cpu_time"
+PEAK_MEMORY = "peak_memory"
+REPORT_COLUMNS = [CALLS, WALL_TIME, CPU_TIME, PEAK_MEMORY]
+
+# Shared context of disabled profilers
+DISABLED_STAGE = nullcontext()
+
+
+class StageProfiler:
+    """
+    Defines the StageProfiler class which records the wall time, CPU time,
+    number of calls and peak traced memory of named stages. A stage entered
+    several times, e.g. once per rebalance, is aggregated under its name,
+    and stages may be nested.
+
+    A disabled profiler returns the same empty context for every stage, so
+    instrumented code costs a method call per stage. Tracing memory with
+    tracemalloc slows the traced code down noticeably, so it is only
+    started by enabled profilers.
+    """
+
+    def __init__(
+        self, enabled: bool = False, trace_memory: bool = True
+    ) -> None:
+        """
+        This method initialises the StageProfiler class.
+
+        Args:
+            enabled (bool): Whether the stages are recorded. Defaults to
+                False.
+            trace_memory (bool): Whether the peak memory of the stages is
+                traced with tracemalloc. Defaults to True.
+        """
+        self.enabled: bool = enabled
+        self.trace_memory: bool = enabled and trace_memory
+
+        """
+        stats (Dict[str, Dict[str, float]]): The calls, wall time and CPU
+            time in seconds, and peak memory in bytes of each stage, in the
+            order the stages were first entered.
+        peaks (List[int]): The highest traced memory seen so far by each
+            stage being run, outermost first.
+        started_tracing (bool): Whether this profiler started tracemalloc,
+            which close stops.
+        """
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.peaks: List[int] = []
+        self.started_tracing: bool = \
+            self.trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+    def close(self) -> None:
+        """
+        Stops tracing memory if this profiler started it, after which no
+        more stages are recorded. The recorded statistics are kept.
+        """
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        self.enabled = False
+        self.trace_memory = False
+
+    def stage(self, name: str):
+        """
+        Records a stage around the body of a with statement.
+
+        Args:
+            name (str): The name of the stage.
+
+        Returns:
+            ContextManager: Returns the context recording the stage, or an
+                empty context if the profiler is disabled.
+        """
+        if not self.enabled:
+            return DISABLED_STAGE
+        return self.record(name)
+
+    @contextmanager
+    def record(self, name: str) -> Iterator[None]:
+        """
+        Records the time and memory spent in the body of a with statement.
+        Each enclosing stage keeps the highest traced memory seen before the
+        peak is reset for this stage.
+
+        Args:
+            name (str): The name of the stage.
+        """
+        start_memory = 0
+        if self.trace_memory:
+            start_memory, peak = tracemalloc.get_traced_memory()
+            if self.peaks:
+                self.peaks[-1] = max(self.peaks[-1], peak)
+            tracemalloc.reset_peak()
+            self.peaks.append(start_memory)
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_wall
+            cpu_time = time.process_time() - start_cpu
+            peak_memory = 0
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], self.peaks.pop())
+                if self.peaks:
+                    self.peaks[-1] = max(self.peaks[-1], peak)
+                peak_memory = peak - start_memory
+            stats = self.stats.setdefault(
+                name, {CALLS: 0, WALL_TIME: 0.0, CPU_TIME: 0.0,
+                       PEAK_MEMORY: 0}
+            )
+            stats[CALLS] += 1
+            stats[WALL_TIME] += wall_time
+            stats[CPU_TIME] += cpu_time
+            stats[PEAK_MEMORY] = max(stats[PEAK_MEMORY], peak_memory)
+
+    def get_report(self) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns the calls, wall time and CPU time in seconds,
+            and peak memory in bytes above the memory at entry of each stage,
+            slowest stage first.
+        """
+        report = pd.DataFrame.from_dict(self.stats, orient="index",
+                                        columns=REPORT_COLUMNS)
+        report.index.name = STAGE
+        return report.sort_values(WALL_TIME, ascending=False, kind="stable")
+
+    def print_report(self) -> None:
+        """
+        None: Prints the formatted breakdown of the stages.
+        """
+        report = self.get_report()
+        for column in [WALL_TIME, CPU_TIME]:
+            report[column] = \
+                report[column].map(lambda seconds: f"{seconds:.4f}s")
+        report[PEAK_MEMORY] = (report[PEAK_MEMORY] / 2**20).map(
+            lambda mebibytes: f"{mebibytes:.2f}MiB"
+        )
+        print(f"""
+    Profile
+
+{report.to_string()}
+    """)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Dict[str, Dict[str, Any]]: Returns the statistics of each stage,
+            slowest stage first.
+        """
+        return {stage: dict(self.stats[stage])
+                for stage in self.get_report().index}
+
+    def dump_json(self, path: Optional[str] = None) -> str:
+        """
+        Serializes the statistics of each stage to JSON.
+
+        Args:
+            path (Optional[str]): The path of the JSON file to write.
+                Defaults to None, which only returns the JSON.
+
+        Returns:
+            str: Returns the JSON.
+        """
+        contents = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(contents)
+        return contents
@@ -0,0 +1,137 @@
+"""
+This module is responsible for computing the rebalance dates of the
+backtest.
+"""
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Constants
+DATE_FORMAT = "%Y%m%d"
+MONTH_END = "month_end"
+WEEK_END = "week_end"
+QUARTER_END = "quarter_end"
+EVERY_N_DAYS = "every_n_days"
+CUSTOM = "custom"
+PERIOD_FREQUENCIES = {MONTH_END: "M", WEEK_END: "W", QUARTER_END: "Q"}
+FREQUENCIES = [MONTH_END, WEEK_END, QUARTER_END, EVERY_N_DAYS, CUSTOM]
+
+
+class RebalanceCalendar:
+    """
+    Defines the RebalanceCalendar class which finds the rebalance dates in
+    the trading dates of the backtest in one vectorized pass. The rebalance
+    dates are the last trading day of each week, month or quarter, every
+    N-th trading day, or the last trading day on or before each of a list
+    of custom dates. Only dates after the beginning date are used, and the
+    last trading date is never a rebalance date as no holding period
+    follows it.
+    """
+
+    def __init__(
+        self,
+        frequency: str = MONTH_END,
+        n_days: Optional[int] = None,
+        dates: Optional[List[str]] = None,
+    ) -> None:
+        """
+        This method initialises the RebalanceCalendar class.
+
+        Args:
+            frequency (str): The rebalance frequency, either "month_end",
+                "week_end", "quarter_end", "every_n_days" or "custom".
+                Defaults to "month_end".
+            n_days (Optional[int]): The number of trading days between
+                rebalances for the "every_n_days" frequency.
+            dates (Optional[List[str]]): The rebalance dates in format
+                YYYYMMDD for the "custom" frequency.
+
+        Raises:
+            ValueError: If the frequency is unknown or its parameter is
+                missing.
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError(
+                "Rebalance frequency must be one of " + ", ".join(FREQUENCIES)
+            )
+        if frequency == EVERY_N_DAYS and (n_days is None or n_days < 1):
+            raise ValueError("Number of days must be a positive integer.")
+        if frequency == CUSTOM and not dates:
+            raise ValueError("Custom rebalance dates must be specified.")
+        self.frequency: str = frequency
+        self.n_days: Optional[int] = n_days
+        self.dates: Optional[List[str]] = dates
+
+    @staticmethod
+    def from_string(rebalance: str) -> "RebalanceCalendar":
+        """
+        Creates a calendar from its command line form, either the name of a
+        period frequency or a number of trading days.
+
+        Args:
+            rebalance (str): The rebalance frequency, e.g. "month_end" or "5".
+
+        Returns:
+            RebalanceCalendar: Returns the rebalance calendar.
+        """
+        if rebalance.isdigit():
+            return RebalanceCalendar(EVERY_N_DAYS, n_days=int(rebalance))
+        return RebalanceCalendar(rebalance)
+
+    def get_rebalance_mask(
+        self, index: pd.DatetimeIndex, beginning_date: str
+    ) -> np.ndarray:
+        """
+        Finds the rebalance dates within the trading dates.
+
+        Args:
+            index (pd.DatetimeIndex): The trading dates of the backtest.
+            beginning_date (str): The beginning date in format YYYYMMDD.
+
+        Returns:
+            np.ndarray: Returns a boolean mask which is True at each
+                rebalance date.
+        """
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        after_b = index > pd.to_datetime(beginning_date, format=DATE_FORMAT)
+        mask = np.zeros(len(index), dtype=bool)
+        if len(index) < 2:
+            return mask
+
+        if self.frequency in PERIOD_FREQUENCIES:
+            periods = index.to_period(PERIOD_FREQUENCIES[self.frequency])
+            mask[:-1] = periods[:-1] != periods[1:]
+        elif self.frequency == EVERY_N_DAYS:
+            mask[np.flatnonzero(after_b)[:: self.n_days]] = True
+        else:
+            custom = pd.to_datetime(self.dates, format=DATE_FORMAT)
+            positions = index.searchsorted(custom, side="right") - 1
+            mask[positions[positions >= 0]] = True
+
+        mask &= after_b
+        mask[-1] = False
+        return mask
+
+    def get_rebalance_indexes(
+        self, index: pd.DatetimeIndex, beginning_date: str
+    ) -> np.ndarray:
+        """
+        np.ndarray: Returns the positions of the rebalance dates within the
+            trading dates. See get_rebalance_mask.
+        """
+        return np.flatnonzero(self.get_rebalance_mask(index, beginning_date))
+
+
+def get_rebalance_calendar(
+    rebalance: Union[str, RebalanceCalendar]
+) -> RebalanceCalendar:
+    """
+    RebalanceCalendar: Returns the given calendar, or the calendar described
+        by its command line form.
+    """
+    if isinstance(rebalance, RebalanceCalendar):
+        return rebalance
+    return RebalanceCalendar.from_string(rebalance)
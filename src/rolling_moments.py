@@ -0,0 +1,283 @@
+"""
+This module is responsible for computing the expected returns and the
+covariance matrix of rolling windows of prices incrementally.
+"""
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from pypfopt import expected_returns, risk_models
+
+# Constants
+FREQUENCY = 252
+DEFAULT_REFRESH_EVERY = 50
+CHUNK_ROWS = 1024
+
+
+def reserve(buffer: np.ndarray, length: int, extra: int) -> np.ndarray:
+    """
+    Makes room for more rows after the first rows of a buffer, doubling its
+    capacity when it is full so that appending rows one day at a time
+    copies each row a constant number of times on average.
+
+    Args:
+        buffer (np.ndarray): The buffer whose first rows are in use.
+        length (int): The number of rows in use.
+        extra (int): The number of rows to make room for.
+
+    Returns:
+        np.ndarray: Returns the buffer, or a larger copy of its rows in use.
+    """
+    if length + extra <= len(buffer):
+        return buffer
+    grown = np.empty((max(2 * len(buffer), length + extra),)
+                     + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:length] = buffer[:length]
+    return grown
+
+
+class RollingMoments:
+    """
+    Defines the RollingMoments class which keeps the sums and cross-products
+    of the daily returns in a rolling window of prices. Moving the window
+    forward by a step adds the returns entering it and removes the returns
+    leaving it, which costs O(step x n^2) instead of O(window x n^2) for a
+    fresh sample covariance. The returns are centred on a reference mean
+    to limit cancellation, and the sums are recomputed from scratch
+    periodically to keep rounding errors from building up.
+
+    The expected returns and covariance matrix match
+    expected_returns.mean_historical_return and risk_models.sample_cov of
+    the window. Windows with missing prices fall back to those functions.
+
+    The prices are read in place when they are already float64, e.g. from a
+    PriceStore or SharedPrices, and the returns of each window are computed
+    when it is needed rather than stored for every date.
+    """
+
+    def __init__(
+        self,
+        prices: pd.DataFrame,
+        lookback: int,
+        refresh_every: int = DEFAULT_REFRESH_EVERY,
+    ) -> None:
+        """
+        This method initialises the RollingMoments class.
+
+        Args:
+            prices (pd.DataFrame): The dataframe containing the adjusted close
+                price for all stocks throughout the time frame.
+            lookback (int): The number of prices in each window.
+            refresh_every (int): The number of incremental updates after
+                which the sums are recomputed from scratch. Defaults to 50.
+        """
+        self.lookback: int = lookback
+        self.refresh_every: int = refresh_every
+        self.tickers: pd.Index = prices.columns
+        self.dates: pd.Index = prices.index
+
+        """
+        value_buffer (np.ndarray): The (dates x tickers) prices, followed by
+            room for appended dates. It is the price matrix of the dataframe
+            itself until the first append.
+        values (np.ndarray): The (dates x tickers) prices in the buffer.
+        count_buffer (np.ndarray): The nan counts, followed by room for
+            appended dates.
+        nan_counts (np.ndarray): The cumulative number of missing returns
+            up to each date.
+        end (int): The index of the last date of the current window, or -1
+            if there is no current window.
+        updates (int): The number of incremental updates since the last
+            full recomputation.
+        shift (np.ndarray): The reference mean subtracted from the returns.
+        sums (np.ndarray): The sum of the shifted returns in the window.
+        cross (np.ndarray): The sum of the outer products of the shifted
+            returns in the window.
+        """
+        # a view of the prices when they are a single float64 block
+        self.value_buffer: np.ndarray = prices.to_numpy(dtype="float64")
+        self.values: np.ndarray = self.value_buffer
+        self.count_buffer: np.ndarray = np.cumsum(
+            self.get_missing_returns(1, len(self.values))
+        )
+        self.nan_counts: np.ndarray = self.count_buffer
+        self.end: int = -1
+        self.updates: int = 0
+        self.shift: np.ndarray = np.zeros(len(self.tickers))
+        self.sums: np.ndarray = np.zeros(len(self.tickers))
+        self.cross: np.ndarray = np.zeros((len(self.tickers),) * 2)
+
+    def get_values(self, start: int, stop: int) -> np.ndarray:
+        """
+        np.ndarray: Returns the prices of the dates from a start index to an
+            exclusive stop index.
+        """
+        return self.values[start:stop]
+
+    def get_returns(self, start: int, stop: int) -> np.ndarray:
+        """
+        np.ndarray: Returns the daily returns of the dates from a start
+            index, which is at least 1, to an exclusive stop index.
+        """
+        values = self.get_values(start - 1, stop)
+        return values[1:] / values[:-1] - 1
+
+    def get_missing_returns(self, start: int, stop: int) -> np.ndarray:
+        """
+        np.ndarray: Returns whether the daily returns of each date from a
+            start index to an exclusive stop index have missing values,
+            computed a chunk of dates at a time.
+        """
+        missing = np.zeros(max(stop - start, 0), dtype=bool)
+        for chunk_start in range(start, stop, CHUNK_ROWS):
+            chunk_stop = min(chunk_start + CHUNK_ROWS, stop)
+            missing[chunk_start - start : chunk_stop - start] = np.isnan(
+                self.get_returns(chunk_start, chunk_stop)
+            ).any(axis=1)
+        return missing
+
+    def get_prices(self) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns the prices of all the dates, including the
+            appended ones, without copying them.
+        """
+        return pd.DataFrame(self.get_values(0, len(self.dates)),
+                            index=self.dates, columns=self.tickers,
+                            copy=False)
+
+    def get_window(self, date_index: int) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns the window of lookback prices ending at a date
+            index.
+        """
+        start = date_index - self.lookback + 1
+        return pd.DataFrame(self.get_values(start, date_index + 1),
+                            index=self.dates[start : date_index + 1],
+                            columns=self.tickers)
+
+    def append(self, prices: pd.DataFrame) -> None:
+        """
+        Appends the prices of later dates, so that windows ending at them
+        can be computed. The current window and its sums are kept. The
+        buffers grow geometrically, so appending one day at a time does not
+        copy all the previous prices each day.
+
+        Args:
+            prices (pd.DataFrame): The prices of the new dates, with the
+                same tickers.
+        """
+        length = len(self.values)
+        new_values = prices[self.tickers].to_numpy(dtype="float64")
+        self.value_buffer = reserve(self.value_buffer, length,
+                                    len(new_values))
+        self.value_buffer[length : length + len(new_values)] = new_values
+        self.values = self.value_buffer[: length + len(new_values)]
+        self.dates = self.dates.append(prices.index)
+
+        before = self.nan_counts[-1] if len(self.nan_counts) else 0
+        new_counts = before + np.cumsum(
+            self.get_missing_returns(max(length, 1), len(self.values))
+        )
+        counts = len(self.nan_counts)
+        self.count_buffer = reserve(self.count_buffer, counts,
+                                    len(new_counts))
+        self.count_buffer[counts : counts + len(new_counts)] = new_counts
+        self.nan_counts = self.count_buffer[: counts + len(new_counts)]
+
+    def has_missing_prices(self, date_index: int) -> bool:
+        """
+        bool: Returns whether the window ending at a date index has missing
+            prices.
+        """
+        first = date_index - self.lookback + 2
+        before = self.nan_counts[first - 2] if first >= 2 else 0
+        return self.nan_counts[date_index - 1] - before > 0
+
+    def recompute(self, date_index: int) -> None:
+        """
+        Recomputes the sums of the window ending at a date index from
+        scratch.
+
+        Args:
+            date_index (int): The index of the last date of the window.
+        """
+        window = self.get_returns(date_index - self.lookback + 2,
+                                  date_index + 1)
+        self.shift = window.mean(axis=0)
+        centred = window - self.shift
+        self.sums = centred.sum(axis=0)
+        self.cross = centred.T @ centred
+        self.end = date_index
+        self.updates = 0
+
+    def advance(self, date_index: int) -> None:
+        """
+        Moves the window forward to end at a date index, updating the sums
+        with the returns entering and leaving the window.
+
+        Args:
+            date_index (int): The index of the last date of the window.
+        """
+        step = date_index - self.end
+        size = self.lookback - 1
+        if (
+            self.end < 0
+            or step < 0
+            or step >= size
+            or self.updates >= self.refresh_every
+        ):
+            self.recompute(date_index)
+            return
+        if step == 0:
+            return
+        entering = self.get_returns(self.end + 1, date_index + 1) - self.shift
+        leaving = self.get_returns(self.end - size + 1,
+                                   date_index - size + 1) - self.shift
+        self.sums += entering.sum(axis=0) - leaving.sum(axis=0)
+        self.cross += entering.T @ entering - leaving.T @ leaving
+        self.end = date_index
+        self.updates += 1
+
+    def get_mean_returns(self, date_index: int) -> pd.Series:
+        """
+        pd.Series: Returns the annualised mean historical return of each
+            stock in the window ending at a date index, which has no missing
+            prices.
+        """
+        first, last = self.get_values(date_index - self.lookback + 1,
+                                      date_index + 1)[[0, -1]]
+        total_return = last / first
+        return pd.Series(total_return ** (FREQUENCY / (self.lookback - 1)) - 1,
+                         index=self.tickers)
+
+    def get_moments(self, date_index: int) -> Tuple[pd.Series, pd.DataFrame]:
+        """
+        Computes the annualised expected returns and covariance matrix of the
+        window of lookback prices ending at a date index.
+
+        Args:
+            date_index (int): The index of the last date of the window.
+
+        Returns:
+            Tuple[pd.Series, pd.DataFrame]: Returns the expected returns of
+                each stock and the covariance matrix of the stocks.
+        """
+        if self.has_missing_prices(date_index):
+            window = self.get_window(date_index)
+            return (
+                expected_returns.mean_historical_return(window),
+                risk_models.sample_cov(window),
+            )
+
+        self.advance(date_index)
+        count = self.lookback - 1
+        covariance = (
+            self.cross - np.outer(self.sums, self.sums) / count
+        ) / (count - 1) * FREQUENCY
+        return (
+            self.get_mean_returns(date_index),
+            risk_models.fix_nonpositive_semidefinite(
+                pd.DataFrame(covariance, index=self.tickers,
+                             columns=self.tickers)
+            ),
+        )
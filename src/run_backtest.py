@@ -1,14 +1,38 @@
 """
 This module is responsible for running the backtest simulation.
 """
+import os
+import pickle
+import tempfile
 from collections import OrderedDict
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Type, Union
 
+import cvxpy as cp
+import numpy as np
 import pandas as pd
-from pypfopt import expected_returns, risk_models
+import pypfopt
 from pypfopt.efficient_frontier import EfficientFrontier
+from pypfopt.exceptions import OptimizationError
 from pypfopt.hierarchical_portfolio import HRPOpt
 
+from src.budgeted_runner import BudgetedRunner
+from src.covariance_estimators import SAMPLE, BatchedMoments
+from src.fast_hrp import FastHRP
+from src.optimizer_session import RISK_FREE_RATE, OptimizerSession
+from src.portfolio_history import PortfolioHistory
+from src.price_store import PriceStore
+from src.profiler import StageProfiler
+from src.rebalance_calendar import (
+    MONTH_END,
+    RebalanceCalendar,
+    get_rebalance_calendar,
+)
+from src.rolling_moments import RollingMoments
+from src.shared_prices import SharedPrices
+from src.trading_calendar import DEFAULT_LOOKBACK
+from src.weights_cache import WeightsCache
+
 # Constants
 DATE_FORMAT = "%Y%m%d"
 AUM = "aum"
@@ -19,6 +43,105 @@ MSR = "msr"
 MV = "mv"
 HRP = "hrp"
 
+# HRP Mode Constants
+HRP_AUTO = "auto"
+HRP_EXACT = "exact"
+HRP_FAST = "fast"
+HRP_MODES = [HRP_AUTO, HRP_EXACT, HRP_FAST]
+FAST_HRP_MIN_ASSETS = 500
+
+# Fallback Constants
+PREVIOUS = "previous"
+FALLBACKS = [PREVIOUS, MV, HRP]
+DEFAULT_FALLBACKS = [PREVIOUS, MV, HRP]
+# Errors of an optimization which fall back, other errors are raised
+OPTIMIZATION_ERRORS: Tuple[Type[Exception], ...] = (
+    ValueError, OptimizationError, cp.SolverError
+)
+
+# Settings which change the weights of a window, part of the cache keys
+SOLVER_SETTINGS = {
+    "pypfopt": pypfopt.__version__,
+    "cvxpy": cp.__version__,
+    "risk_free_rate": RISK_FREE_RATE,
+}
+
+# Prices shared with the optimizer processes
+worker_prices: Optional[SharedPrices] = None
+worker_stocks_data: Optional[pd.DataFrame] = None
+
+
+def init_worker(shared_prices: SharedPrices) -> None:
+    """
+    Attaches an optimizer process to the shared prices of the backtest once,
+    so the hrp windows are read from shared memory instead of being sent
+    with every optimization.
+
+    Args:
+        shared_prices (SharedPrices): The shared prices of the backtest.
+    """
+    global worker_prices, worker_stocks_data
+    worker_prices = shared_prices
+    worker_stocks_data = shared_prices.to_frame()
+
+
+def optimize_weights(
+    optimizer: str,
+    window: Optional[pd.DataFrame],
+    exp_returns: pd.Series,
+    covariance: pd.DataFrame,
+) -> OrderedDict:
+    """
+    Calculates the portfolio weights of a lookback window. The weights only
+    depend on the window, so this function runs in worker processes.
+
+    Args:
+        optimizer (str): The optimizer to use for asset allocation.
+        window (Optional[pd.DataFrame]): The prices in the lookback window,
+            which are only used by the hrp optimizer.
+        exp_returns (pd.Series): The expected returns of the window.
+        covariance (pd.DataFrame): The covariance matrix of the window.
+
+    Returns:
+        OrderedDict: Returns the cleaned weight of each ticker.
+    """
+    if optimizer == HRP:
+        hrp = HRPOpt(window, covariance)
+        hrp.optimize()
+        return hrp.clean_weights()
+    ef = EfficientFrontier(exp_returns, covariance)
+    if optimizer == MSR:
+        ef.max_sharpe()
+    else:
+        ef.min_volatility()
+    return ef.clean_weights()
+
+
+def optimize_shared_weights(
+    optimizer: str,
+    bounds: Optional[Tuple[int, int]],
+    exp_returns: pd.Series,
+    covariance: pd.DataFrame,
+) -> OrderedDict:
+    """
+    Calculates the portfolio weights of a lookback window of the shared
+    prices of an optimizer process. See optimize_weights.
+
+    Args:
+        optimizer (str): The optimizer to use for asset allocation.
+        bounds (Optional[Tuple[int, int]]): The positions of the first date
+            and after the last date of the window, which is only used by the
+            hrp optimizer.
+        exp_returns (pd.Series): The expected returns of the window.
+        covariance (pd.DataFrame): The covariance matrix of the window.
+
+    Returns:
+        OrderedDict: Returns the cleaned weight of each ticker.
+    """
+    window = None if bounds is None else \
+        worker_stocks_data[bounds[0] : bounds[1]]
+    return optimize_weights(optimizer, window, exp_returns, covariance)
+
 
 class RunBacktest:
     """
@@ -29,48 +152,259 @@ class RunBacktest:
 
     def __init__(
         self,
-        stocks_data: pd.DataFrame,
+        stocks_data: Union[pd.DataFrame, PriceStore, SharedPrices],
         initial_aum: int,
         beginning_date: str,
-        optimizer: str,
+        optimizer: Union[str, List[str]],
+        *,
+        lookback: int = DEFAULT_LOOKBACK,
+        rebalance: Union[str, RebalanceCalendar] = MONTH_END,
+        n_workers: int = 1,
+        warm_start: bool = False,
+        weights_cache: Optional[WeightsCache] = None,
+        cov: str = SAMPLE,
+        hrp_mode: str = HRP_AUTO,
+        profiler: Optional[StageProfiler] = None,
+        time_budget: Optional[float] = None,
+        fallbacks: Optional[List[str]] = None,
+        moments: Optional[RollingMoments] = None,
     ):
         """
         This method initialises the RunBacktest class.
 
         Args:
-            stocks_data (pd.DataFrame): The dataframe containing the adjusted
-              close price for all stocks throughout the time frame.
+            stocks_data (Union[pd.DataFrame, PriceStore, SharedPrices]): The
+              dataframe containing the adjusted close price for all stocks
+              throughout the time frame, or a price store or shared prices
+              which are read without copying.
             initial_aum (int): The initial asset under management amount.
             beginning_date (str): The beginning date of the backtest period.
-            optimizer (str): The optimizer to use for asset allocation.
+            optimizer (Union[str, List[str]]): The optimizer to use for
+                asset allocation, or a list of optimizers which are
+                backtested side by side in a single pass over the windows.
+            lookback (int): The number of trading days in the rolling window
+                used by the optimizer. Defaults to 250.
+            rebalance (Union[str, RebalanceCalendar]): The rebalance
+                calendar, or its frequency ("month_end", "week_end",
+                "quarter_end" or a number of trading days). Defaults to
+                "month_end".
+            n_workers (int): The number of processes which optimize the
+                rebalance dates in parallel. Defaults to 1, which optimizes
+                them in this process.
+            warm_start (bool): Whether the msr and mv problems are built
+                once and re-solved at each rebalance, warm started from the
+                previous weights. The rebalance dates are then optimized in
+                order in this process. Defaults to False.
+            weights_cache (Optional[WeightsCache]): The on-disk cache of the
+                weights of each window, which are only optimized if they are
+                not in the cache. Defaults to None, which does not cache.
+            cov (str): The covariance estimator of the msr and mv
+                optimizers, either "sample", "ledoit_wolf", "exp" or
+                "constant_correlation". The estimators other than "sample"
+                are computed for all rebalance windows at once. Defaults to
+                "sample".
+            hrp_mode (str): The hrp optimizer to use, either "exact" for
+                PyPortfolioOpt's HRPOpt, "fast" for the large universe
+                optimizer which reuses the previous ordering of the assets
+                when the correlations barely change, or "auto" for the
+                large universe optimizer from 500 stocks. Defaults to
+                "auto".
+            profiler (Optional[StageProfiler]): The profiler recording the
+                time spent in the moments, optimizations, weights cache,
+                rebalances and AUM simulation. Defaults to None, which does
+                not profile.
+            time_budget (Optional[float]): The number of seconds each
+                optimization may run for before it is stopped and the
+                rebalance falls back. The optimizations then run in child
+                processes, except for warm started sessions and the large
+                universe hrp optimizer, whose errors fall back but which are
+                not stopped. Defaults to None, which does not limit them.
+            fallbacks (Optional[List[str]]): The strategies tried in order
+                when an optimization fails or runs out of time: "previous"
+                for the previous weights of the optimizer, "mv" or "hrp".
+                Only ValueError, OptimizationError and SolverError fall
+                back, other errors are raised. Defaults to None. With a time
+                budget, None tries the previous weights, then mv, then hrp.
+                Without a time budget, None means no fallbacks, so failed
+                optimizations raise. An empty list with a time budget makes
+                an optimization which runs out of time raise.
+            moments (Optional[RollingMoments]): The rolling moments of the
+                stocks data from the lookback window of the first rebalance
+                date or earlier, e.g. derived from those of a larger universe
+                or shared by several rebalance schedules, which replace the
+                ones of the covariance estimator. Defaults to None, which
+                computes them.
+
+        Raises:
+            ValueError: If the list of optimizers is empty or has
+                duplicates, if the hrp mode is unknown, if the time budget
+                is not positive, if a fallback is unknown, if the stocks
+                data does not hold a full lookback window before the first
+                rebalance date, or if the moments do not cover its dates.
         """
-        self.stocks_data: Dict[str, pd.DataFrame] = stocks_data
+        if isinstance(stocks_data, (PriceStore, SharedPrices)):
+            stocks_data = stocks_data.to_frame()
+        self.stocks_data: pd.DataFrame = stocks_data
         self.initial_aum: int = initial_aum
         self.beginning_date: str = beginning_date
-        self.optimizer: str = optimizer
+        self.optimizer: Union[str, List[str]] = optimizer
+        self.optimizers: List[str] = \
+            [optimizer] if isinstance(optimizer, str) else list(optimizer)
+        if not self.optimizers or \
+                len(set(self.optimizers)) != len(self.optimizers):
+            raise ValueError("Optimizers must be a non-empty list of "
+                             "distinct optimizers.")
+        self.lookback: int = lookback
+        self.n_workers: int = n_workers
+        self.weights_cache: Optional[WeightsCache] = weights_cache
+        self.cov: str = cov
+        if hrp_mode not in HRP_MODES:
+            raise ValueError("HRP mode must be one of " + ", ".join(HRP_MODES))
+        self.hrp_mode: str = hrp_mode
+        self.profiler: StageProfiler = profiler or StageProfiler()
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("Time budget must be a positive number of "
+                             "seconds.")
+        self.time_budget: Optional[float] = time_budget
+        if fallbacks is None:
+            fallbacks = DEFAULT_FALLBACKS if time_budget is not None else []
+        if any(fallback not in FALLBACKS for fallback in fallbacks):
+            raise ValueError("Fallbacks must be among " + ", ".join(FALLBACKS))
+        self.fallbacks: List[str] = list(fallbacks)
+        self.rebalance_calendar: RebalanceCalendar = \
+            get_rebalance_calendar(rebalance)
 
         """
         portfolio_performance (pd.DataFrame): The dataframe to store the
-            portfolio performance information (AUM).
-        portfolio (OrderedDict[str, float]): The ordered dictionary
-            containing the current portfolio. Each ticker is matched to the 
-            amount of stock held.
-        portfolio_record (List[OrderedDict[str, float]]): The list containing
-            a record of previous portfolios. Each element is a portfolio.
-        weights_record (Tuple[List[str], List[OrderedDict[str, float]]]): 
-            A tuple containing a list of portfolio rebalance dates and a list
-            of ordered dictionaries containing the portfolio weights. Each
-            ticker is matched to the weight held in the portfolio.
-        month_end_indexes (List[int]): The list of month end indexes in the 
-            time frame
+            portfolio performance information (AUM). With several optimizers
+            there is one AUM column named after each optimizer.
+        histories (Dict[str, PortfolioHistory]): The rebalance dates,
+            weights and amounts of stock held at each rebalance of each
+            optimizer.
+        history (Union[PortfolioHistory, Dict[str, PortfolioHistory]]): The
+            history of the optimizer, or the dictionary of histories keyed
+            by optimizer with several optimizers.
+        current_history (Optional[PortfolioHistory]): The history of the
+            portfolio which was rebalanced last.
+        holdings (Dict[str, Tuple[np.ndarray, np.ndarray]]): The column
+            positions and amounts of the stocks held in the portfolio of
+            each optimizer.
+        performance_start (int): The date index of the first row of the
+            portfolio performance.
+        simulated_until (int): The index of the last date whose AUM is
+            simulated, or -1 before the backtest is simulated.
+        holdings_columns (np.ndarray): The column positions of the stocks
+            held in the current portfolio, in portfolio order.
+        holdings_amounts (np.ndarray): The amount of each stock held in the
+            current portfolio, aligned with holdings_columns.
+        rebalance_mask (np.ndarray): The boolean mask which is True at the
+            rebalance dates in the time frame.
+        rebalance_indexes (np.ndarray): The indexes of the rebalance dates
+            in the time frame.
+        moments (RollingMoments): The rolling expected returns and
+            covariance matrix of the lookback window, or their batched
+            estimates for the other covariance estimators.
+        sessions (Dict[str, OptimizerSession]): The compiled msr and mv
+            optimizers which are re-solved at each rebalance, if warm_start
+            is set.
+        fast_hrp (Optional[FastHRP]): The large universe hrp optimizer,
+            which runs in order in this process, if it is used.
+        fallback_record (List[Dict[str, str]]): The rebalances which fell
+            back, with their date, optimizer, fallback strategy and the
+            reason the optimization failed.
         """
+        self.rebalance_mask: np.ndarray = \
+            self.rebalance_calendar.get_rebalance_mask(
+                self.stocks_data.index, self.beginning_date
+            )
+        self.rebalance_indexes: np.ndarray = np.flatnonzero(self.rebalance_mask)
+        self.drop_unused_history(moments)
+        if moments is not None and \
+                not moments.dates.equals(self.stocks_data.index):
+            raise ValueError("Moments must cover the stocks data from the "
+                             "lookback window of the first rebalance date.")
+        if moments is None:
+            moments = RollingMoments(self.stocks_data, self.lookback) \
+                if self.cov == SAMPLE else \
+                BatchedMoments(self.stocks_data, self.lookback,
+                               self.rebalance_indexes, self.cov)
+        self.moments: RollingMoments = moments
+        self.sessions: Dict[str, OptimizerSession] = {
+            optimizer: OptimizerSession(optimizer, self.stocks_data.columns)
+            for optimizer in self.optimizers
+            if warm_start and optimizer != HRP
+        }
+        use_fast_hrp = self.hrp_mode == HRP_FAST or (
+            self.hrp_mode == HRP_AUTO
+            and len(self.stocks_data.columns) >= FAST_HRP_MIN_ASSETS
+        )
+        self.fast_hrp: Optional[FastHRP] = \
+            FastHRP(self.stocks_data.columns) \
+            if HRP in self.optimizers and use_fast_hrp else None
         self.portfolio_performance: pd.DataFrame = \
             self.init_portfolio_performance()
-        self.portfolio: OrderedDict[str, float] = OrderedDict()
-        self.portfolio_record: List[OrderedDict[str, float]] = []
-        self.weights_record: Tuple[List[str], List[OrderedDict[str, float]]] =\
-            ([], [])
-        self.month_end_indexes: List[int] = self.get_month_end_indexes_from_b()
+        self.histories: Dict[str, PortfolioHistory] = {
+            optimizer: PortfolioHistory(self.stocks_data.columns,
+                                        len(self.rebalance_indexes))
+            for optimizer in self.optimizers
+        }
+        self.history: Union[
+            PortfolioHistory, Dict[str, PortfolioHistory]
+        ] = self.histories[optimizer] if isinstance(optimizer, str) \
+            else self.histories
+        self.current_history: Optional[PortfolioHistory] = None
+        self.holdings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.performance_start: int = 0
+        self.simulated_until: int = -1
+        self.holdings_columns: np.ndarray = np.array([], dtype=int)
+        self.holdings_amounts: np.ndarray = np.array([], dtype=float)
+        self.fallback_record: List[Dict[str, str]] = []
+
+    @property
+    def portfolio(self) -> OrderedDict:
+        """
+        OrderedDict[str, float]: Returns the current portfolio. Each ticker
+            is matched to the amount of stock held.
+        """
+        if self.current_history is None or not self.current_history:
+            return OrderedDict()
+        return self.current_history.get_portfolio()
+
+    @property
+    def portfolio_record(
+        self,
+    ) -> Union[List[OrderedDict], Dict[str, List[OrderedDict]]]:
+        """
+        Union[List[OrderedDict[str, float]], Dict[str,
+            List[OrderedDict[str, float]]]]: Returns the list of previous
+            portfolios, or a dictionary of such lists keyed by optimizer with
+            several optimizers. Built from the history on each access.
+        """
+        if isinstance(self.history, PortfolioHistory):
+            return self.history.to_portfolio_record()
+        return {
+            optimizer: history.to_portfolio_record()
+            for optimizer, history in self.history.items()
+        }
+
+    @property
+    def weights_record(
+        self,
+    ) -> Union[Tuple[List[str], List[OrderedDict]],
+               Dict[str, Tuple[List[str], List[OrderedDict]]]]:
+        """
+        Union[Tuple[List[str], List[OrderedDict[str, float]]], Dict[str,
+            Tuple[List[str], List[OrderedDict[str, float]]]]]: Returns the
+            tuple of the rebalance dates and the portfolio weights at each of
+            them, or a dictionary of such tuples keyed by optimizer with
+            several optimizers. Built from the history on each access.
+        """
+        if isinstance(self.history, PortfolioHistory):
+            return self.history.to_weights_record()
+        return {
+            optimizer: history.to_weights_record()
+            for optimizer, history in self.history.items()
+        }
 
     def init_portfolio_performance(self) -> None:
         """
@@ -81,28 +415,73 @@ class RunBacktest:
         datetime_indexes = self.stocks_data.index.to_list()
         portfolio_performance = pd.DataFrame()
         portfolio_performance[DATETIME] = datetime_indexes
-        portfolio_performance[AUM] = [
-            self.initial_aum for _ in range(len(datetime_indexes))
-        ]
+        for optimizer in self.optimizers:
+            portfolio_performance[self.get_aum_column(optimizer)] = np.full(
+                len(datetime_indexes), self.initial_aum, dtype="float64"
+            )
         return portfolio_performance
 
-    def get_month_end_indexes_from_b(self) -> List[int]:
+    def get_aum_column(self, optimizer: str) -> str:
         """
-        List[int]: Returns the indexes of the month end dates starting
-            from the beginning date.
+        str: Returns the portfolio performance column holding the AUM of an
+            optimizer, which is "aum" for a single optimizer.
         """
-        datetime_indexes = self.stocks_data.index.to_list()
-        b_timestamp = pd.to_datetime(self.beginning_date, format=DATE_FORMAT)
-        month_end_indexes = []
+        return AUM if isinstance(self.optimizer, str) else optimizer
 
-        for idx, datetime in enumerate(datetime_indexes[:-1]):
-            if (
-                datetime.month != datetime_indexes[idx + 1].month
-                and datetime_indexes[idx].tz_localize(None) > b_timestamp
-            ):
-                month_end_indexes.append(idx)
+    def drop_unused_history(
+        self, moments: Optional[RollingMoments] = None
+    ) -> None:
+        """
+        Drops the prices before the lookback window of the first rebalance
+        date, as they are never used, and shifts the rebalance dates
+        accordingly. Given moments which start earlier, e.g. shared with the
+        backtests of other rebalance schedules, only the prices before their
+        first date are dropped.
+
+        Args:
+            moments (Optional[RollingMoments]): The rolling moments given to
+                the backtest. Defaults to None.
+
+        Raises:
+            ValueError: If there are fewer than lookback trading days up to
+                the first rebalance date.
+        """
+        if len(self.rebalance_indexes) == 0:
+            return
+        start = self.rebalance_indexes[0] - self.lookback + 1
+        if start < 0:
+            raise ValueError(
+                f"Stocks data must contain at least {self.lookback} trading"
+                " days up to the first rebalance date."
+            )
+        if moments is not None and len(moments.dates) > 0:
+            first = self.stocks_data.index.get_indexer(moments.dates[:1])[0]
+            if 0 <= first < start:
+                start = first
+        self.stocks_data = self.stocks_data[start:]
+        self.rebalance_mask = self.rebalance_mask[start:]
+        self.rebalance_indexes = self.rebalance_indexes - start
+
+    def calc_aum_segment(self, start: int, stop: int) -> np.ndarray:
+        """
+        Calculates the assets under management amount for a range of date
+        indexes with the current portfolio, as the product of the block of
+        prices and the amounts held. The products are accumulated stock by
+        stock in portfolio order, so each day is summed exactly like a
+        day-by-day loop over the portfolio would.
 
-        return month_end_indexes
+        Args:
+            start (int): The index of the first date of the range.
+            stop (int): The exclusive index of the last date of the range.
+
+        Returns:
+            np.ndarray: Returns the AUM amount at each date of the range.
+        """
+        prices = self.stocks_data.iloc[start:stop].to_numpy(dtype="float64")
+        total_aum = np.zeros(stop - start)
+        for column, amount in zip(self.holdings_columns, self.holdings_amounts):
+            total_aum += amount * prices[:, column]
+        return total_aum
 
     def calc_aum(self, date_index: int) -> float:
         """
@@ -115,67 +494,396 @@ class RunBacktest:
         Returns:
             float: Returns the AUM amount.
         """
-        total_aum = 0
-        for stock, amount in self.portfolio.items():
-            if amount != 0.0:
-                end_close = self.stocks_data[stock].iloc[date_index]
-                total_aum += amount * end_close
-        return total_aum
+        return float(self.calc_aum_segment(date_index, date_index + 1)[0])
+
+    def get_window(self, date_index: int) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns the lookback window of prices ending at a date
+            index.
+        """
+        return self.stocks_data[date_index - self.lookback + 1 : date_index + 1]
+
+    def uses_fast_hrp(self, date_index: int) -> bool:
+        """
+        bool: Returns whether the hrp weights of the window ending at a date
+            index are calculated by the large universe optimizer, which
+            needs a window without missing prices.
+        """
+        return self.fast_hrp is not None and \
+            not self.moments.has_missing_prices(date_index)
+
+    def get_cache_keys(self, date_index: int) -> Dict[str, str]:
+        """
+        Dict[str, str]: Returns the weights cache key of each optimizer for
+            the window ending at a date index. The large universe hrp
+            optimizer has no key when it reuses the ordering of the previous
+            rebalance, as its weights then depend on earlier windows, so
+            they are not cached.
+        """
+        window_digest = self.weights_cache.get_window_digest(
+            self.get_window(date_index)
+        )
+        return {
+            optimizer: self.weights_cache.get_key(
+                window_digest, optimizer,
+                {**SOLVER_SETTINGS, "cov": self.cov,
+                 "warm_start": optimizer in self.sessions,
+                 "fast_hrp": optimizer == HRP
+                 and self.uses_fast_hrp(date_index)},
+            )
+            for optimizer in self.optimizers
+            if not (optimizer == HRP and self.uses_fast_hrp(date_index)
+                    and self.fast_hrp.reuse_tolerance > 0)
+        }
+
+    def optimize_rebalances(
+        self, date_indexes: Optional[List[int]] = None
+    ) -> Dict[str, List[OrderedDict]]:
+        """
+        Calculates the portfolio weights of every optimizer at every
+        rebalance date. Weights found in the weights cache are not optimized
+        again. The rolling moments of each remaining window are computed
+        once in this process, in date order, and shared by all optimizers.
+        The optimizations are spread over n_workers processes, except for
+        warm started sessions which solve them in order. With fallbacks, the
+        optimizations which fail or run out of time are replaced by the
+        fallback weights, which are not cached. The weights are returned in
+        the order of the rebalance dates.
+
+        Args:
+            date_indexes (Optional[List[int]]): The indexes of the dates to
+                optimize. Defaults to the rebalance dates.
+
+        Returns:
+            Dict[str, List[OrderedDict]]: Returns the weights at each
+                rebalance date for each optimizer.
+
+        Raises:
+            ValueError: If an optimization fails and none of the fallbacks
+                succeed.
+        """
+        if date_indexes is None:
+            date_indexes = self.rebalance_indexes
+        rebalance_weights = {
+            optimizer: [None] * len(date_indexes)
+            for optimizer in self.optimizers
+        }
+        cache_keys = {}
+        computed = []
+        failures = {}
+        tasks = []
+        task_positions = []
+        task_dates = []
+        for position, date_index in enumerate(date_indexes):
+            missing = self.optimizers
+            if self.weights_cache is not None:
+                with self.profiler.stage("weights_cache"):
+                    cache_keys[position] = self.get_cache_keys(date_index)
+                    missing = []
+                    for optimizer in self.optimizers:
+                        key = cache_keys[position].get(optimizer)
+                        weights = None if key is None else \
+                            self.weights_cache.get(key)
+                        if weights is None:
+                            missing.append(optimizer)
+                        else:
+                            rebalance_weights[optimizer][position] = weights
+                if not missing:
+                    continue
+
+            # hrp only uses the window prices
+            window_moments = (None, None)
+            if any(optimizer != HRP for optimizer in missing):
+                with self.profiler.stage("moments"):
+                    window_moments = self.moments.get_moments(date_index)
+            for optimizer in missing:
+                computed.append((optimizer, position))
+                if optimizer in self.sessions:
+                    with self.profiler.stage("optimize"):
+                        rebalance_weights[optimizer][position] = \
+                            self.optimize_inline(
+                                self.sessions[optimizer].solve,
+                                window_moments, (optimizer, position),
+                                failures,
+                            )
+                elif optimizer == HRP and self.uses_fast_hrp(date_index):
+                    with self.profiler.stage("optimize"):
+                        rebalance_weights[optimizer][position] = \
+                            self.optimize_inline(
+                                self.fast_hrp.optimize,
+                                (self.get_window(date_index),),
+                                (optimizer, position), failures,
+                            )
+                else:
+                    window = self.get_window(date_index) \
+                        if optimizer == HRP else None
+                    tasks.append((optimizer, window, *window_moments))
+                    task_positions.append((optimizer, position))
+                    task_dates.append(date_index)
+
+        if self.time_budget is not None and tasks:
+            # the optimizations run in child processes which can be stopped
+            with self.profiler.stage("optimize"):
+                outcomes = BudgetedRunner(self.time_budget, self.n_workers,
+                                          OPTIMIZATION_ERRORS) \
+                    .run(optimize_weights, tasks)
+            results = []
+            for key, (weights, reason) in zip(task_positions, outcomes):
+                if weights is None:
+                    failures[key] = reason
+                results.append(weights)
+        elif self.n_workers <= 1 or len(tasks) <= 1:
+            results = []
+            for task, key in zip(tasks, task_positions):
+                with self.profiler.stage("optimize"):
+                    results.append(self.optimize_inline(
+                        optimize_weights, task, key, failures
+                    ))
+        else:
+            # the workers read the hrp windows from the shared prices
+            shared_tasks = [
+                (optimizer, None if window is None else
+                 (date_index - self.lookback + 1, date_index + 1), *moments)
+                for (optimizer, window, *moments), date_index
+                in zip(tasks, task_dates)
+            ]
+            with self.profiler.stage("optimize_pool"), \
+                    SharedPrices(self.stocks_data) as shared_prices, \
+                    ProcessPoolExecutor(
+                        max_workers=self.n_workers, initializer=init_worker,
+                        initargs=(shared_prices,),
+                    ) as executor:
+                futures = [
+                    executor.submit(optimize_shared_weights, *task)
+                    for task in shared_tasks
+                ]
+                # the errors of the workers are raised again by result
+                results = [
+                    self.optimize_inline(future.result, (), key, failures)
+                    for future, key in zip(futures, task_positions)
+                ]
+        for (optimizer, position), weights in zip(task_positions, results):
+            rebalance_weights[optimizer][position] = weights
+
+        # earlier rebalances fall back first, as later ones may reuse them
+        for optimizer, position in sorted(failures, key=lambda key: key[1]):
+            previous = rebalance_weights[optimizer][position - 1] \
+                if position > 0 else self.get_last_weights(optimizer)
+            rebalance_weights[optimizer][position] = self.fall_back(
+                optimizer, date_indexes[position], previous,
+                failures[(optimizer, position)],
+            )
+
+        if self.weights_cache is not None:
+            with self.profiler.stage("weights_cache"):
+                for optimizer, position in computed:
+                    if (optimizer, position) in failures or \
+                            optimizer not in cache_keys[position]:
+                        continue
+                    self.weights_cache.put(
+                        cache_keys[position][optimizer],
+                        rebalance_weights[optimizer][position],
+                    )
+        return rebalance_weights
+
+    def optimize_inline(
+        self,
+        optimize: Callable[..., OrderedDict],
+        arguments: tuple,
+        key: Tuple[str, int],
+        failures: Dict[Tuple[str, int], str],
+    ) -> Optional[OrderedDict]:
+        """
+        Runs an optimization in this process. With fallbacks, its errors are
+        recorded as failures instead of being raised.
+
+        Args:
+            optimize (Callable[..., OrderedDict]): The optimization.
+            arguments (tuple): The arguments of the optimization.
+            key (Tuple[str, int]): The optimizer and the position of the
+                rebalance date.
+            failures (Dict[Tuple[str, int], str]): The reason each failed
+                optimization failed, keyed by optimizer and position.
+
+        Returns:
+            Optional[OrderedDict]: Returns the weights, or None if the
+                optimization failed.
+        """
+        try:
+            return optimize(*arguments)
+        except OPTIMIZATION_ERRORS as error:
+            if not self.fallbacks:
+                raise
+            failures[key] = f"{type(error).__name__}: {error}"
+            return None
+
+    def get_last_weights(self, optimizer: str) -> Optional[OrderedDict]:
+        """
+        Optional[OrderedDict]: Returns the weights of the last rebalance of
+            an optimizer, or None before its first rebalance.
+        """
+        history = self.histories[optimizer]
+        if not history:
+            return None
+        return OrderedDict(zip(history.tickers, history.get_weights()[-1]))
+
+    def fall_back(
+        self,
+        optimizer: str,
+        date_index: int,
+        previous: Optional[OrderedDict],
+        reason: str,
+    ) -> OrderedDict:
+        """
+        Tries the fallbacks in order for a failed optimization and records
+        the one which succeeds. The previous weights are skipped at the first
+        rebalance, and the fallback optimizations get the same time budget,
+        or run in this process without one.
+
+        Args:
+            optimizer (str): The optimizer which failed.
+            date_index (int): The index of the rebalance date.
+            previous (Optional[OrderedDict]): The previous weights of the
+                optimizer, if any.
+            reason (str): The reason the optimization failed.
+
+        Returns:
+            OrderedDict: Returns the fallback weights.
+
+        Raises:
+            ValueError: If none of the fallbacks succeed.
+        """
+        reasons = [reason]
+        for fallback in self.fallbacks:
+            if fallback == optimizer:
+                continue
+            if fallback == PREVIOUS:
+                weights = previous
+            else:
+                window = self.get_window(date_index) \
+                    if fallback == HRP else None
+                window_moments = (None, None) if fallback == HRP else \
+                    self.moments.get_moments(date_index)
+                task = (fallback, window, *window_moments)
+                if self.time_budget is None:
+                    failures = {}
+                    weights = self.optimize_inline(optimize_weights, task,
+                                                   (fallback, 0), failures)
+                    error = failures.get((fallback, 0))
+                else:
+                    [(weights, error)] = BudgetedRunner(
+                        self.time_budget, errors=OPTIMIZATION_ERRORS
+                    ).run(optimize_weights, [task])
+                if weights is None:
+                    reasons.append(f"{fallback}: {error}")
+            if weights is not None:
+                self.fallback_record.append({
+                    DATETIME: self.stocks_data.index[date_index]
+                    .strftime(DATE_FORMAT),
+                    "optimizer": optimizer,
+                    "fallback": fallback,
+                    "reason": reason,
+                })
+                return weights
+        date = self.stocks_data.index[date_index].strftime(DATE_FORMAT)
+        raise ValueError(f"Optimization of {optimizer} on {date} failed and "
+                         "no fallback succeeded: " + "; ".join(reasons))
 
     def update_portfolio(self, date_index: int) -> None:
         """
         Updates the portfolio at a given date index. Creates an optimizer
         object based on the optimizer and calculated the portfolio weights.
-        Updates the weights record, portfolio and the portfolio record.
+        Records the weights and holdings in the history of each optimizer.
 
         Args:
             date_index (int): The index of the date at which the
                 portfolio is calculated and updated.
         """
-        df = self.stocks_data[date_index - 249 : date_index + 1]
-        sample_covariance = risk_models.sample_cov(df)
-        if self.optimizer == HRP:
-            hrp = HRPOpt(df, sample_covariance)
-            hrp.optimize()
-            weights = hrp.clean_weights()
-        else:
-            exp_returns = expected_returns.mean_historical_return(df)
-            ef = EfficientFrontier(exp_returns, sample_covariance)
-            if self.optimizer == MSR:
-                ef.max_sharpe()
-            else:
-                ef.min_volatility()
-            weights = ef.clean_weights()
+        rebalance_weights = self.optimize_rebalances([date_index])
+        for optimizer in self.optimizers:
+            self.rebalance_portfolio(date_index,
+                                     rebalance_weights[optimizer][0],
+                                     optimizer)
 
-        date = str(self.stocks_data.index[date_index])[:10]
-        self.weights_record[0].append(date)
-        self.weights_record[1].append(weights)
+    def rebalance_portfolio(
+        self,
+        date_index: int,
+        weights: OrderedDict,
+        optimizer: Optional[str] = None,
+    ) -> None:
+        """
+        Rebalances the portfolio of an optimizer to the given weights at a
+        date index. Records the weights and the amount of each stock held in
+        the history of the optimizer.
 
-        portfolio = weights.copy()
-        aum = self.portfolio_performance.at[date_index, AUM]
-        for stock, weight in portfolio.items():
-            stock_price = self.stocks_data[stock].iloc[date_index]
-            portfolio[stock] = weight * aum / stock_price
+        Args:
+            date_index (int): The index of the date at which the portfolio
+                is rebalanced.
+            weights (OrderedDict): The weight of each ticker.
+            optimizer (Optional[str]): The optimizer which the weights come
+                from. Defaults to the first optimizer.
+        """
+        optimizer = optimizer or self.optimizers[0]
+        history = self.histories[optimizer]
+        aum = self.portfolio_performance.at[date_index - self.performance_start,
+                                            self.get_aum_column(optimizer)]
+        # hold the stocks in the order of the weights
+        columns = self.stocks_data.columns.get_indexer(list(weights))
+        weights_row = np.fromiter(weights.values(), dtype=np.float64,
+                                  count=len(columns))
+        prices = self.stocks_data.iloc[date_index].to_numpy(dtype="float64")
+        amounts = weights_row * aum / prices[columns]
+        shares = np.zeros(len(prices))
+        shares[columns] = amounts
+        history.append(self.stocks_data.index[date_index],
+                       history.align(weights), shares)
+        self.current_history = history
 
-        self.portfolio = portfolio
-        self.portfolio_record.append(self.portfolio)
+        held = amounts != 0.0
+        self.holdings[optimizer] = (columns[held], amounts[held])
+        self.holdings_columns, self.holdings_amounts = self.holdings[optimizer]
 
-    def fill_up_portfolio_performance(self) -> None:
+    def fill_up_portfolio_performance(
+        self,
+        rebalance_weights: Optional[Dict[str, List[OrderedDict]]] = None,
+    ) -> None:
         """
-        None: Simulates backtesting based on the user-defined optimizer and
-            fills up the dataframe of portfolio performance with the calculated
-            AUM for each day in the specified time period.
+        Simulates backtesting based on the user-defined optimizer and fills
+        up the dataframe of portfolio performance with the calculated AUM
+        for each day in the specified time period. The weights of all
+        rebalance dates are calculated first, then the AUM of each optimizer
+        is simulated with them.
+
+        Args:
+            rebalance_weights (Optional[Dict[str, List[OrderedDict]]]): The
+                weights at each rebalance date for each optimizer, if they
+                were already calculated. See optimize_rebalances. Defaults
+                to None, which calculates them.
         """
-        for date_index in range(self.month_end_indexes[0],
-                                len(self.stocks_data.index)):
-            if date_index != self.month_end_indexes[0]:
-                self.portfolio_performance.at[date_index, AUM] = self.calc_aum(
-                    date_index
-                )
+        last_index = len(self.stocks_data.index) - 1
+        if rebalance_weights is None:
+            rebalance_weights = self.optimize_rebalances()
+        for optimizer in self.optimizers:
+            aum_column = self.portfolio_performance.columns.get_loc(
+                self.get_aum_column(optimizer)
+            )
+            for idx, date_index in enumerate(self.rebalance_indexes):
+                # rebalance and store new portfolio
+                with self.profiler.stage("rebalance"):
+                    self.rebalance_portfolio(
+                        date_index, rebalance_weights[optimizer][idx],
+                        optimizer
+                    )
 
-            # rebalance and store new portfolio
-            if date_index in self.month_end_indexes:
-                self.update_portfolio(date_index)
+                # hold the portfolio until the next rebalance date
+                next_index = self.rebalance_indexes[idx + 1] \
+                    if idx + 1 < len(self.rebalance_indexes) else last_index
+                if next_index > date_index:
+                    with self.profiler.stage("calc_aum"):
+                        self.portfolio_performance.iloc[
+                            date_index + 1 : next_index + 1, aum_column
+                        ] = self.calc_aum_segment(date_index + 1,
+                                                  next_index + 1)
 
         # cut portfolio performance to only start from beginning date
         datetime_indexes = self.portfolio_performance[DATETIME].to_list()
@@ -188,3 +896,113 @@ class RunBacktest:
                 break
         self.portfolio_performance = \
             self.portfolio_performance[b_idx:].reset_index(drop=True)
+        self.performance_start = b_idx
+        self.simulated_until = last_index
+
+    def advance(self, new_bars: pd.DataFrame) -> None:
+        """
+        Appends the prices of new trading days to a simulated backtest and
+        extends the portfolio performance to them, without simulating the
+        earlier days again. The last day before the new ones becomes a
+        rebalance date if a new rebalance period has started, like in a
+        backtest over all the days, and only the new rebalance dates are
+        optimized.
+
+        Args:
+            new_bars (pd.DataFrame): The adjusted close prices of the new
+                trading days, with the same tickers as the stocks data.
+
+        Raises:
+            ValueError: If the backtest has not been simulated, if tickers
+                are missing or if the new days do not follow the last one.
+        """
+        if self.simulated_until < 0:
+            raise ValueError("Backtest must be simulated before advancing.")
+        if len(new_bars) == 0:
+            return
+        missing = self.stocks_data.columns.difference(new_bars.columns)
+        if len(missing) > 0:
+            raise ValueError("New bars are missing tickers: "
+                             + ", ".join(map(str, missing)))
+        if not new_bars.index.is_monotonic_increasing or \
+                new_bars.index.has_duplicates or \
+                new_bars.index[0] <= self.stocks_data.index[-1]:
+            raise ValueError("New bars must follow the last trading day.")
+
+        new_bars = new_bars[self.stocks_data.columns]
+        previous_last = self.simulated_until
+        # the moments grow their prices in place, so the stocks data is a
+        # view of them rather than a concatenated copy
+        self.moments.append(new_bars)
+        self.stocks_data = self.moments.get_prices()
+        last_index = len(self.stocks_data.index) - 1
+        self.rebalance_mask = self.rebalance_calendar.get_rebalance_mask(
+            self.stocks_data.index, self.beginning_date
+        )
+        self.rebalance_indexes = np.flatnonzero(self.rebalance_mask)
+        new_rebalances = \
+            self.rebalance_indexes[self.rebalance_indexes >= previous_last]
+
+        new_performance = pd.DataFrame({DATETIME: new_bars.index.to_list()})
+        for optimizer in self.optimizers:
+            new_performance[self.get_aum_column(optimizer)] = np.nan
+        self.portfolio_performance = pd.concat(
+            [self.portfolio_performance, new_performance], ignore_index=True
+        )
+
+        rebalance_weights = self.optimize_rebalances(new_rebalances)
+        for optimizer in self.optimizers:
+            aum_column = self.portfolio_performance.columns.get_loc(
+                self.get_aum_column(optimizer)
+            )
+            self.holdings_columns, self.holdings_amounts = \
+                self.holdings.get(optimizer, (np.array([], dtype=int),
+                                              np.array([], dtype=float)))
+            start = previous_last
+            for idx, date_index in enumerate(list(new_rebalances) + [None]):
+                stop = last_index if date_index is None else date_index
+                if stop > start:
+                    self.portfolio_performance.iloc[
+                        start + 1 - self.performance_start :
+                        stop + 1 - self.performance_start, aum_column
+                    ] = self.calc_aum_segment(start + 1, stop + 1)
+                if date_index is not None:
+                    self.rebalance_portfolio(
+                        date_index, rebalance_weights[optimizer][idx],
+                        optimizer
+                    )
+                start = stop
+        self.simulated_until = last_index
+
+    def save_state(self, path: str) -> None:
+        """
+        Saves the backtest, including its holdings, histories, rolling
+        moments and portfolio performance, to a file which load_state reads
+        back. The file is written atomically.
+
+        Args:
+            path (str): The path of the state file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def load_state(path: str) -> "RunBacktest":
+        """
+        Loads a backtest saved by save_state, which can then be advanced.
+
+        Args:
+            path (str): The path of the state file.
+
+        Returns:
+            RunBacktest: Returns the backtest.
+        """
+        with open(path, "rb") as file:
+            return pickle.load(file)
@@ -0,0 +1,249 @@
+"""
+This module is responsible for sharing the price matrix with worker
+processes through shared memory.
+"""
+import sys
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Constants
+DATE_INDEX_NAME = "Date"
+VALUES_DTYPE = "float64"
+DATES_DTYPE = "int64"
+
+
+def attach_block(name: str) -> SharedMemory:
+    """
+    Attaches to an existing shared memory block without leaving it
+    registered with a resource tracker of its own. Processes started by
+    multiprocessing share the tracker of the process which created the
+    block, which already tracks it, so unregistering it from a worker would
+    drop the registration which unlinks the block if its creator crashes.
+    Any other process starts its own tracker when attaching, which would
+    unlink the block when the process exits, so the block is unregistered
+    from it.
+
+    Args:
+        name (str): The name of the block.
+
+    Returns:
+        SharedMemory: Returns the attached block.
+    """
+    if sys.version_info >= (3, 13):
+        # the track keyword was added in Python 3.13
+        # pylint: disable-next=unexpected-keyword-arg
+        return SharedMemory(name=name, track=False)
+    # the tracker of the module has no public way to tell if it is running
+    # pylint: disable-next=protected-access
+    has_tracker = resource_tracker._resource_tracker._fd is not None
+    block = SharedMemory(name=name)
+    if not has_tracker:
+        # pylint: disable-next=protected-access
+        resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+def release_block(block: SharedMemory, unlink: bool) -> None:
+    """
+    Releases a shared memory block, unlinking it first if this process
+    created it. Closing waits until the views of the block are released, so
+    a block with live views stays mapped until the process exits.
+
+    Args:
+        block (SharedMemory): The block.
+        unlink (bool): Whether the block is unlinked.
+    """
+    if unlink:
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+    try:
+        block.close()
+    except BufferError:
+        pass
+
+
+class SharedPrices:
+    """
+    Defines the SharedPrices class which places the price matrix, its dates
+    and its tickers in a single shared memory block. Pickling a
+    SharedPrices only sends the name and shape of the block, and unpickling
+    it in a worker process attaches to the block, so workers read the
+    prices through read-only NumPy views instead of each receiving a copy.
+
+    The process which creates the block owns it and unlinks it when the
+    shared prices are closed, used as a context manager, garbage collected
+    or when the process exits. If the owner is killed, the resource tracker
+    of the multiprocessing module unlinks the block.
+    """
+
+    def __init__(self, stocks_data: pd.DataFrame) -> None:
+        """
+        This method initialises the SharedPrices class by copying a
+        dataframe of prices to a new shared memory block.
+
+        Args:
+            stocks_data (pd.DataFrame): The dataframe containing the
+                adjusted close price for all stocks throughout the time
+                frame.
+        """
+        index = pd.DatetimeIndex(stocks_data.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert(None)
+        tickers = np.array([str(ticker) for ticker in stocks_data.columns])
+        self.shape: Tuple[int, int] = stocks_data.shape
+        self.ticker_dtype: str = tickers.dtype.str
+        self.tz: Optional[str] = tz
+        offsets = self.get_offsets()
+        self.block: SharedMemory = SharedMemory(create=True,
+                                                size=max(1, offsets[-1]))
+        self.is_owner: bool = True
+
+        """
+        values (np.ndarray): The read-only (dates x tickers) price matrix.
+        dates (np.ndarray): The read-only datetime64 dates of the rows.
+        tickers (np.ndarray): The read-only tickers of the columns.
+        finalizer (weakref.finalize): The finalizer which releases the
+            block when the shared prices are closed, garbage collected or
+            when the process exits.
+        """
+        self.values, self.dates, self.tickers = self.get_views(offsets)
+        for view, data in [
+            (self.values, stocks_data.to_numpy(dtype=VALUES_DTYPE)),
+            (self.dates, index.values.astype(DATES_DTYPE)),
+            (self.tickers, tickers),
+        ]:
+            view.flags.writeable = True
+            view[:] = data
+            view.flags.writeable = False
+        self.finalizer: weakref.finalize = weakref.finalize(
+            self, release_block, self.block, True
+        )
+
+    def get_offsets(self) -> Tuple[int, int, int, int]:
+        """
+        Tuple[int, int, int, int]: Returns the byte offsets of the values,
+            dates and tickers in the block, and the size of the block.
+        """
+        n_dates, n_tickers = self.shape
+        dates_offset = n_dates * n_tickers * np.dtype(VALUES_DTYPE).itemsize
+        tickers_offset = dates_offset + n_dates * np.dtype(DATES_DTYPE).itemsize
+        size = tickers_offset + n_tickers * np.dtype(self.ticker_dtype).itemsize
+        return 0, dates_offset, tickers_offset, size
+
+    def get_views(
+        self, offsets: Tuple[int, int, int, int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Builds read-only views of the values, dates and tickers in the block.
+
+        Args:
+            offsets (Tuple[int, int, int, int]): The byte offsets. See
+                get_offsets.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: Returns the values,
+                dates and tickers.
+        """
+        n_dates, n_tickers = self.shape
+        views = (
+            np.ndarray(self.shape, dtype=VALUES_DTYPE, buffer=self.block.buf,
+                       offset=offsets[0]),
+            np.ndarray(n_dates, dtype=DATES_DTYPE, buffer=self.block.buf,
+                       offset=offsets[1]),
+            np.ndarray(n_tickers, dtype=self.ticker_dtype,
+                       buffer=self.block.buf, offset=offsets[2]),
+        )
+        for view in views:
+            view.flags.writeable = False
+        return views
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Dict[str, Any]: Returns the name and layout of the block, which is
+            all a worker process needs to attach to it.
+        """
+        return {
+            "name": self.block.name,
+            "shape": self.shape,
+            "ticker_dtype": self.ticker_dtype,
+            "tz": self.tz,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Attaches to the block of the shared prices which were pickled.
+
+        Args:
+            state (Dict[str, Any]): The name and layout of the block.
+        """
+        self.shape = tuple(state["shape"])
+        self.ticker_dtype = state["ticker_dtype"]
+        self.tz = state["tz"]
+        self.block = attach_block(state["name"])
+        self.is_owner = False
+        self.values, self.dates, self.tickers = \
+            self.get_views(self.get_offsets())
+        self.finalizer = weakref.finalize(self, release_block, self.block,
+                                          False)
+
+    def __enter__(self) -> "SharedPrices":
+        """
+        SharedPrices: Returns the shared prices.
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        None: Closes the shared prices.
+        """
+        self.close()
+
+    def close(self) -> None:
+        """
+        None: Releases the block, unlinking it if this process created it.
+            The views of the block must not be used afterwards.
+        """
+        self.finalizer()
+
+    def get_index(self) -> pd.DatetimeIndex:
+        """
+        pd.DatetimeIndex: Returns the dates of the prices.
+        """
+        index = pd.DatetimeIndex(self.dates.view("datetime64[ns]"),
+                                 name=DATE_INDEX_NAME)
+        if self.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return index
+
+    def window(self, start: int, stop: int) -> np.ndarray:
+        """
+        Gets a zero-copy view of the prices between two date positions.
+
+        Args:
+            start (int): The position of the first date.
+            stop (int): The exclusive position of the last date.
+
+        Returns:
+            np.ndarray: Returns the read-only (dates x tickers) view.
+        """
+        return self.values[start:stop]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        pd.DataFrame: Returns a dataframe backed by the shared values without
+            copying them.
+        """
+        return pd.DataFrame(
+            self.values,
+            index=self.get_index(),
+            columns=self.tickers.tolist(),
+            copy=False,
+        )
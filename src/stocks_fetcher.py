@@ -2,58 +2,227 @@
 This module is responsible for fetching the stocks data.
 """
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
-import yfinance as yf
+
+from src.data_providers import DataProvider, YahooFinanceProvider
+from src.fetch_scheduler import FetchScheduler
+from src.price_cache import PriceCache, merge_ranges
+from src.price_store import PriceStore
+from src.trading_calendar import DEFAULT_LOOKBACK, get_lookback_start
 
 # Constants
 DATE_FORMAT = "%Y%m%d"
-YF_DATE_FORMAT = "%Y-%m-%d"
-YF_ADJUSTED_CLOSE = "Adj Close"
 
 
 class StocksFetcher:
     """
-    Defines the StocksFether class which fetches stocks data from yFinance.
+    Defines the StocksFether class which fetches stocks data from a market
+    data provider (yFinance by default).
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        provider: Optional[DataProvider] = None,
+        cache_dir: Optional[str] = None,
+        scheduler: Optional[FetchScheduler] = None,
+    ) -> None:
         """
         This method initialises the StockFetcher class.
+
+        Args:
+            provider (Optional[DataProvider]): The market data provider to
+                fetch from. Defaults to None (Yahoo Finance).
+            cache_dir (Optional[str]): The directory of the on-disk price
+                cache. If given, only the date ranges missing from the
+                cache are downloaded. Defaults to None (no caching).
+            scheduler (Optional[FetchScheduler]): The scheduler used to
+                download large universes in concurrent chunks. Defaults to
+                None (one request for all tickers).
+        """
+        self.provider: DataProvider = \
+            provider if provider is not None else YahooFinanceProvider()
+        self.cache: Optional[PriceCache] = \
+            PriceCache(cache_dir) if cache_dir is not None else None
+        self.scheduler: Optional[FetchScheduler] = scheduler
+
+    def download(
+        self, tickers: List[str], dt_start: datetime, dt_end: datetime
+    ) -> pd.DataFrame:
+        """
+        Downloads the adjusted closing prices for multiple tickers from
+        the market data provider.
+
+        Args:
+            tickers (List[str]): The ticker symbols of each stock.
+            dt_start (datetime): The first date to download.
+            dt_end (datetime): The exclusive last date to download.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe containing the adjusted
+                close price for each stock at each trading date.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.fetch(
+                self.provider, tickers, dt_start, dt_end
+            )
+        return self.provider.fetch(tickers, dt_start, dt_end)
+
+    def fetch_cached(
+        self, tickers: List[str], dt_start: datetime, dt_end: datetime
+    ) -> pd.DataFrame:
+        """
+        Fetches the adjusted closing prices through the on-disk cache,
+        downloading only the date ranges that are missing for each ticker.
+        Tickers missing the same ranges are downloaded together. A range is
+        only marked as fetched for the tickers the download returned prices
+        for.
+
+        Args:
+            tickers (List[str]): The ticker symbols of each stock.
+            dt_start (datetime): The first date to fetch.
+            dt_end (datetime): The exclusive last date to fetch.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe containing the adjusted
+                close price for each stock at each trading date.
+        """
+        # the current day may still change, so it is never marked as cached
+        dt_today = datetime.combine(datetime.today(), datetime.min.time())
+        missing: Dict[Tuple[Tuple[datetime, datetime], ...], List[str]] = {}
+        for ticker in tickers:
+            ranges = self.cache.get_missing_ranges(
+                ticker, dt_start, min(dt_end, dt_today)
+            )
+            if dt_end > dt_today:
+                ranges.append((max(dt_start, dt_today), dt_end))
+            ranges = tuple(merge_ranges(ranges))
+            if ranges:
+                missing.setdefault(ranges, []).append(ticker)
+
+        for ranges, group in missing.items():
+            for range_start, range_end in ranges:
+                data = self.download(group, range_start, range_end)
+                # tickers missing from the download, or returned as an all
+                # NaN column when they failed, stay uncovered, so that they
+                # are fetched again by the next request
+                for ticker in group:
+                    if ticker not in data.columns or \
+                            data[ticker].isna().all():
+                        continue
+                    self.cache.store(ticker, data[ticker], range_start,
+                                     min(range_end, dt_today))
+
+        if len(tickers) > 1:
+            tickers = sorted(tickers)
+        return self.cache.load(tickers, dt_start, dt_end)
+
+    def get_fetch_window(
+        self,
+        beginning_date: str,
+        ending_date: str,
+        lookback: int = DEFAULT_LOOKBACK,
+    ) -> Tuple[datetime, datetime]:
+        """
+        Computes the date range to fetch so that the lookback window of the
+        first rebalance date is fully covered.
+
+        Args:
+            beginning_date (str): The beginning date given by the user.
+            ending_date (str): The ending date given by the user.
+            lookback (int): The number of trading days in the rolling window
+                of the backtest. Defaults to 250.
+
+        Returns:
+            Tuple[datetime, datetime]: Returns the first date and the
+                exclusive last date to fetch.
+        """
+        dt_start = get_lookback_start(
+            datetime.strptime(beginning_date, DATE_FORMAT), lookback
+        )
+        dt_end = \
+            datetime.strptime(ending_date, DATE_FORMAT) + timedelta(days=1)
+        return dt_start, dt_end
+
+    def fetch_range(
+        self, tickers: List[str], dt_start: datetime, dt_end: datetime
+    ) -> pd.DataFrame:
         """
+        Fetches the adjusted closing prices for multiple tickers within a
+        date range, through the on-disk cache if there is one.
+
+        Args:
+            tickers (List[str]): The ticker symbols of each stock.
+            dt_start (datetime): The first date to fetch.
+            dt_end (datetime): The exclusive last date to fetch.
+
+        Returns:
+            pd.DataFrame: Returns a dataframe containing the adjusted
+                close price for each stock at each trading date.
+        """
+        if self.cache is not None:
+            return self.fetch_cached(tickers, dt_start, dt_end)
+        return self.download(tickers, dt_start, dt_end)
 
     def fetch_stocks_data(
-        self, tickers: List[str], beginning_date: str, ending_date: str
+        self,
+        tickers: List[str],
+        beginning_date: str,
+        ending_date: str,
+        lookback: int = DEFAULT_LOOKBACK,
     ) -> pd.DataFrame:
         """
-        Fetches the adjusted closing prices for multiple tickers from Yahoo
-        Finance with an additional 430 days from the given beginning date
-        to the given ending date.
+        Fetches the adjusted closing prices for multiple tickers from the
+        market data provider from enough trading days before the given
+        beginning date to fill the lookback window, to the given ending date.
 
         Args:
             ticker_symbol (List[str]): The ticker symbols of each stock in
                 the universe.
             beginning_date (str): The beginning date given by the user.
             ending_date (str): The ending date given by the user.
+            lookback (int): The number of trading days in the rolling window
+                of the backtest. Defaults to 250.
 
         Returns:
             pd.DataFrame: Returns a dataframe containing the adjusted
                 close price for each stock in the universe at each
                 trading date in the time frame.
         """
-        dt_start = \
-            datetime.strptime(beginning_date, DATE_FORMAT) - timedelta(days=430)
-        dt_end = \
-            datetime.strptime(ending_date, DATE_FORMAT) + timedelta(days=1)
-        data = yf.download(
-            tickers,
-            dt_start.strftime(YF_DATE_FORMAT),
-            dt_end.strftime(YF_DATE_FORMAT),
-            progress=False,
-        )[YF_ADJUSTED_CLOSE]
-        if len(tickers) == 1:
-            res = data.to_frame()
-            res.rename(columns={YF_ADJUSTED_CLOSE: tickers[0]}, inplace=True)
-            return res
-        return data
+        dt_start, dt_end = self.get_fetch_window(
+            beginning_date, ending_date, lookback
+        )
+        return self.fetch_range(tickers, dt_start, dt_end)
+
+    def fetch_to_store(
+        self,
+        tickers: List[str],
+        beginning_date: str,
+        ending_date: str,
+        path: str,
+        *,
+        dtype: str = "float64",
+        lookback: int = DEFAULT_LOOKBACK,
+    ) -> PriceStore:
+        """
+        Fetches the adjusted closing prices like fetch_stocks_data and writes
+        them to a memory-mapped price store.
+
+        Args:
+            tickers (List[str]): The ticker symbols of each stock in the
+                universe.
+            beginning_date (str): The beginning date given by the user.
+            ending_date (str): The ending date given by the user.
+            path (str): The directory of the price store.
+            dtype (str): The dtype of the stored prices, either "float64" or
+                "float32". Defaults to "float64".
+            lookback (int): The number of trading days in the rolling window
+                of the backtest. Defaults to 250.
+
+        Returns:
+            PriceStore: Returns the price store opened read-only.
+        """
+        stocks_data = self.fetch_stocks_data(tickers, beginning_date,
+                                             ending_date, lookback)
+        return PriceStore.write(path, stocks_data, dtype)
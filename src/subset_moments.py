@@ -0,0 +1,108 @@
+"""
+This module is responsible for deriving the rolling moments of a subset of
+stocks from the rolling moments of a larger universe.
+"""
+import numpy as np
+import pandas as pd
+
+from src.rolling_moments import RollingMoments
+
+
+class SubsetMoments(RollingMoments):
+    """
+    Defines the SubsetMoments class which computes the expected returns and
+    covariance matrix of a subset of the stocks of a universe by slicing
+    the rows and columns of the subset out of the sums and cross-products
+    of the universe, instead of keeping its own. Moving the window of the
+    universe costs O(step x n^2) once per date however many subsets share
+    it, so the subsets should be moved through the dates together. The
+    prices of the subset are read from the columns of the universe, so a
+    subset only stores its own sums and its count of missing returns.
+
+    Windows in which the subset has missing prices fall back to
+    expected_returns.mean_historical_return and risk_models.sample_cov of
+    the subset, and windows in which only other stocks of the universe have
+    missing prices are computed from the returns of the subset.
+    """
+
+    # the parent would store the price matrix which is read from the
+    # universe instead
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, prices: pd.DataFrame, universe: RollingMoments) -> None:
+        """
+        This method initialises the SubsetMoments class.
+
+        Args:
+            prices (pd.DataFrame): The dataframe containing the adjusted close
+                price of the stocks of the subset, on the dates of the
+                universe. Only its dates and tickers are used.
+            universe (RollingMoments): The rolling moments of the universe.
+
+        Raises:
+            ValueError: If the subset has stocks or dates which are not in
+                the universe.
+        """
+        if not prices.index.equals(universe.dates):
+            raise ValueError("Subset must have the dates of the universe.")
+        columns = universe.tickers.get_indexer(prices.columns)
+        if (columns < 0).any():
+            raise ValueError("Subset has stocks which are not in the "
+                             "universe.")
+        self.lookback: int = universe.lookback
+        self.refresh_every: int = universe.refresh_every
+        self.tickers: pd.Index = prices.columns
+        self.dates: pd.Index = universe.dates
+
+        """
+        universe (RollingMoments): The rolling moments of the universe.
+        columns (np.ndarray): The positions of the stocks of the subset in
+            the universe.
+        nan_counts (np.ndarray): The cumulative number of missing returns
+            of the subset up to each date.
+        end, updates, shift, sums, cross: See RollingMoments.
+        """
+        self.universe: RollingMoments = universe
+        self.columns: np.ndarray = columns
+        self.nan_counts: np.ndarray = np.cumsum(
+            self.get_missing_returns(1, len(self.dates))
+        )
+        self.end: int = -1
+        self.updates: int = 0
+        self.shift: np.ndarray = np.zeros(len(self.tickers))
+        self.sums: np.ndarray = np.zeros(len(self.tickers))
+        self.cross: np.ndarray = np.zeros((len(self.tickers),) * 2)
+
+    def get_values(self, start: int, stop: int) -> np.ndarray:
+        """
+        np.ndarray: Returns the prices of the subset from a start index to
+            an exclusive stop index, sliced out of the prices of the
+            universe.
+        """
+        return self.universe.get_values(start, stop)[:, self.columns]
+
+    def append(self, prices: pd.DataFrame) -> None:
+        """
+        None: Subset moments follow the dates of the universe, so they cannot
+            be appended to.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError("Subset moments cannot be appended to.")
+
+    def advance(self, date_index: int) -> None:
+        """
+        Moves the window of the universe forward to end at a date index, and
+        slices the sums of the subset out of it.
+
+        Args:
+            date_index (int): The index of the last date of the window.
+        """
+        if self.universe.has_missing_prices(date_index):
+            self.recompute(date_index)
+            return
+        self.universe.advance(date_index)
+        self.shift = self.universe.shift[self.columns]
+        self.sums = self.universe.sums[self.columns]
+        self.cross = self.universe.cross[self.columns][:, self.columns]
+        self.end = date_index
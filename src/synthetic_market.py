@@ -0,0 +1,127 @@
+"""
+This module is responsible for generating deterministic synthetic prices
+for benchmarks.
+"""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from src.trading_calendar import TRADING_DAY
+
+# Constants
+TRADING_DAYS_PER_YEAR = 252
+DEFAULT_START_DATE = "2000-01-03"
+DEFAULT_FACTORS = 3
+DEFAULT_DRIFT = 0.08
+DEFAULT_VOLATILITY = 0.25
+DEFAULT_FACTOR_SHARE = 0.4
+TICKER_PREFIX = "S"
+
+
+class SyntheticMarket:
+    """
+    Defines the SyntheticMarket class which generates the adjusted close
+    prices of a universe of stocks on the trading days of the exchange
+    calendar. The daily log returns follow a factor model: each stock loads
+    on a few market factors, which explain a share of its variance, plus
+    an idiosyncratic shock, so the stocks are correlated. The same seed
+    always gives the same prices.
+    """
+
+    def __init__(
+        self,
+        n_tickers: int,
+        n_years: float,
+        *,
+        lookback: int = 0,
+        seed: int = 0,
+        n_factors: int = DEFAULT_FACTORS,
+        start_date: str = DEFAULT_START_DATE,
+    ) -> None:
+        """
+        This method initialises the SyntheticMarket class.
+
+        Args:
+            n_tickers (int): The number of stocks.
+            n_years (float): The number of years of 252 trading days to
+                generate after the lookback window.
+            lookback (int): The number of trading days generated before the
+                first year, for the rolling window of the first rebalance.
+                Defaults to 0.
+            seed (int): The seed of the random generator. Defaults to 0.
+            n_factors (int): The number of market factors. Defaults to 3.
+            start_date (str): The first date of the prices. Defaults to
+                "2000-01-03".
+
+        Raises:
+            ValueError: If there are no stocks or fewer than two prices.
+        """
+        if n_tickers < 1:
+            raise ValueError("Number of tickers must be at least 1.")
+        self.n_tickers: int = n_tickers
+        self.n_days: int = int(round(n_years * TRADING_DAYS_PER_YEAR)) + \
+            lookback
+        if self.n_days < 2:
+            raise ValueError("Synthetic market must have at least 2 days.")
+        self.seed: int = seed
+        self.n_factors: int = n_factors
+        self.start_date: str = start_date
+
+    def get_tickers(self) -> List[str]:
+        """
+        List[str]: Returns the tickers of the stocks, e.g. "S0042".
+        """
+        return [f"{TICKER_PREFIX}{idx:04d}" for idx in range(self.n_tickers)]
+
+    def get_dates(self) -> pd.DatetimeIndex:
+        """
+        pd.DatetimeIndex: Returns the trading days of the prices.
+        """
+        return pd.date_range(self.start_date, periods=self.n_days,
+                             freq=TRADING_DAY, name="Date")
+
+    def generate_returns(self, rng: np.random.Generator) -> np.ndarray:
+        """
+        Generates the daily log returns of the stocks.
+
+        Args:
+            rng (np.random.Generator): The random generator.
+
+        Returns:
+            np.ndarray: Returns the (days - 1) x tickers daily log returns.
+        """
+        daily_volatility = rng.uniform(0.5, 1.5, self.n_tickers) * \
+            DEFAULT_VOLATILITY / np.sqrt(TRADING_DAYS_PER_YEAR)
+        drift = rng.normal(DEFAULT_DRIFT, DEFAULT_DRIFT, self.n_tickers) / \
+            TRADING_DAYS_PER_YEAR
+
+        # split the variance of each stock between the factors and its own
+        loadings = np.abs(rng.normal(1.0, 0.5,
+                                     (self.n_tickers, self.n_factors)))
+        loadings *= np.sqrt(DEFAULT_FACTOR_SHARE) * daily_volatility[:, None] \
+            / np.linalg.norm(loadings, axis=1, keepdims=True)
+        idiosyncratic = np.sqrt(1 - DEFAULT_FACTOR_SHARE) * daily_volatility
+
+        factors = rng.standard_normal((self.n_days - 1, self.n_factors))
+        shocks = rng.standard_normal((self.n_days - 1, self.n_tickers))
+        return drift - daily_volatility**2 / 2 + factors @ loadings.T + \
+            shocks * idiosyncratic
+
+    def generate_prices(self) -> pd.DataFrame:
+        """
+        Generates the adjusted close prices of the stocks.
+
+        Returns:
+            pd.DataFrame: Returns the dataframe of prices with a row per
+                trading day and a column per ticker.
+        """
+        rng = np.random.default_rng(self.seed)
+        first_prices = rng.uniform(10, 500, self.n_tickers)
+        prices = np.empty((self.n_days, self.n_tickers))
+        prices[0] = first_prices
+        prices[1:] = first_prices * np.exp(
+            np.cumsum(self.generate_returns(rng), axis=0)
+        )
+        return pd.DataFrame(prices, index=self.get_dates(),
+                            columns=self.get_tickers())
@@ -0,0 +1,88 @@
+"""
+This module is responsible for the exchange trading calendar used to size
+the fetched price history.
+"""
+from datetime import datetime
+
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+    sunday_to_monday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+# Constants
+DEFAULT_LOOKBACK = 250
+LOOKBACK_BUFFER_DAYS = 5
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """
+    Defines the NYSEHolidayCalendar class which lists the regular full-day
+    holidays of the New York Stock Exchange.
+    """
+
+    rules = [
+        Holiday("New Year's Day", month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday(
+            "Juneteenth",
+            month=6,
+            day=19,
+            start_date="2022-01-01",
+            observance=nearest_workday,
+        ),
+        Holiday("Independence Day", month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday("Christmas Day", month=12, day=25, observance=nearest_workday),
+    ]
+
+
+TRADING_DAY = CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+
+def get_lookback_start(beginning_date: datetime, lookback: int) -> datetime:
+    """
+    Finds the earliest date to fetch so that a rolling window of the given
+    number of trading days ending on or after the beginning date is fully
+    covered. A few extra trading days are kept as a buffer for unscheduled
+    market closures.
+
+    Args:
+        beginning_date (datetime): The beginning date of the backtest.
+        lookback (int): The number of trading days in the rolling window.
+
+    Returns:
+        datetime: Returns the first date of the history to fetch.
+    """
+    start = pd.Timestamp(beginning_date) - \
+        (lookback + LOOKBACK_BUFFER_DAYS) * TRADING_DAY
+    return start.to_pydatetime()
+
+
+def count_trading_days(dt_start: datetime, dt_end: datetime) -> int:
+    """
+    Counts the trading days in a date range.
+
+    Args:
+        dt_start (datetime): The first date of the range.
+        dt_end (datetime): The exclusive last date of the range.
+
+    Returns:
+        int: Returns the number of trading days in the range.
+    """
+    return len(
+        pd.date_range(dt_start, dt_end, freq=TRADING_DAY, inclusive="left")
+    )
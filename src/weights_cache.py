@@ -0,0 +1,203 @@
+"""
+This module is responsible for caching the optimized portfolio weights of
+each rebalance on disk.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Constants
+WEIGHTS_SUFFIX = ".json"
+LOCK_FILE = ".lock"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class WeightsCache:
+    """
+    Defines the WeightsCache class which stores the cleaned weights of an
+    optimization in a directory, under the SHA-256 hash of the price window,
+    the optimizer and the solver settings. A later backtest over the same
+    windows reads the weights back instead of optimizing again.
+
+    Entries are written atomically so concurrent processes never read a
+    partial file. Reading an entry refreshes its modification time, and
+    when the directory grows beyond max_bytes the least recently used
+    entries are removed while holding an exclusive lock on the directory.
+    Each process tracks the size of the directory as of its last eviction
+    plus its own writes, so entries written by other processes in between
+    are only counted at its next eviction.
+    """
+
+    def __init__(
+        self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """
+        This method initialises the WeightsCache class.
+
+        Args:
+            cache_dir (str): The directory where the weights are stored. It
+                is created if it does not exist.
+            max_bytes (int): The maximum total size of the entries. Defaults
+                to 64 MiB.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir: str = cache_dir
+        self.max_bytes: int = max_bytes
+
+        """
+        size (int): The estimated total size of the entries, including the
+            ones written by this process since the last eviction.
+        hits (int): The number of weights read from the cache.
+        misses (int): The number of weights not found in the cache.
+        """
+        self.size: int = self.get_size()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def get_window_digest(window: pd.DataFrame) -> bytes:
+        """
+        Hashes the dates, tickers and prices of a window.
+
+        Args:
+            window (pd.DataFrame): The prices in the lookback window.
+
+        Returns:
+            bytes: Returns the SHA-256 digest of the window.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([str(ticker) for ticker in window.columns])
+                      .encode())
+        digest.update(window.index.asi8.tobytes())
+        digest.update(np.ascontiguousarray(window.to_numpy(dtype="float64"))
+                      .tobytes())
+        return digest.digest()
+
+    @staticmethod
+    def get_key(
+        window_digest: bytes, optimizer: str, settings: Dict[str, Any]
+    ) -> str:
+        """
+        Computes the key of the weights of an optimizer for a window.
+
+        Args:
+            window_digest (bytes): The digest of the window. See
+                get_window_digest.
+            optimizer (str): The optimizer.
+            settings (Dict[str, Any]): The solver settings, which must be
+                serializable to JSON.
+
+        Returns:
+            str: Returns the hexadecimal key.
+        """
+        digest = hashlib.sha256(window_digest)
+        digest.update(json.dumps([optimizer, settings], sort_keys=True)
+                      .encode())
+        return digest.hexdigest()
+
+    def get_path(self, key: str) -> str:
+        """
+        str: Returns the path of the entry of a key.
+        """
+        return os.path.join(self.cache_dir, key + WEIGHTS_SUFFIX)
+
+    def get_entries(self) -> List[Tuple[int, int, str]]:
+        """
+        List[Tuple[int, int, str]]: Returns the modification time in
+            nanoseconds, size and path of each entry, least recently used
+            first.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith(WEIGHTS_SUFFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # evicted by another process
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def get_size(self) -> int:
+        """
+        int: Returns the total size of the entries in the directory.
+        """
+        return sum(size for _, size, _ in self.get_entries())
+
+    def get(self, key: str) -> Optional[OrderedDict]:
+        """
+        Reads the weights of a key and marks the entry as recently used.
+
+        Args:
+            key (str): The key of the weights.
+
+        Returns:
+            Optional[OrderedDict]: Returns the weight of each ticker, or
+                None if the key is not in the cache.
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                entry = json.load(file)
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return OrderedDict(zip(entry["tickers"], entry["weights"]))
+
+    def put(self, key: str, weights: OrderedDict) -> None:
+        """
+        Writes the weights of a key, then evicts the least recently used
+        entries if the cache has grown beyond its maximum size.
+
+        Args:
+            key (str): The key of the weights.
+            weights (OrderedDict): The weight of each ticker.
+        """
+        contents = json.dumps({
+            "tickers": [str(ticker) for ticker in weights],
+            "weights": [float(weight) for weight in weights.values()],
+        })
+        file_descriptor, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                file.write(contents)
+            os.replace(tmp_path, self.get_path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.size += len(contents)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache holds at
+        most max_bytes, while holding an exclusive lock so that concurrent
+        processes do not evict at the same time.
+        """
+        with open(os.path.join(self.cache_dir, LOCK_FILE), "w",
+                  encoding="utf-8") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self.get_entries()
+                self.size = sum(size for _, size, _ in entries)
+                for _, size, path in entries:
+                    if self.size <= self.max_bytes:
+                        break
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    self.size -= size
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
@@ -11,7 +11,7 @@ import pandas as pd
 import pytest
 
 from src.backtest_stats import BacktestStats
-from src.run_backtest import MSR
+from src.run_backtest import MSR, MV
 
 sys.path.append("/.../src")
 
@@ -106,8 +106,8 @@ class TestBacktestStats(unittest.TestCase):
         backtest_stats = self.init_backtest_stats(MSR)
         daily_returns = backtest_stats.get_daily_returns()
         self.assertIsInstance(daily_returns, list)
-        daily_returns = [
-            -0.14573694540287038,
+        expected = [
+            0.0,
             0.0,
             0.0,
             0.0,
@@ -119,79 +119,80 @@ class TestBacktestStats(unittest.TestCase):
             0.0,
             0.0,
             0.03481832327091306,
-            0.05130854393913742,
-            0.006929621538552025,
-            -0.016005462098776374,
-            0.0036022626649987884,
-            0.025975316455011006,
-            0.01757611937741039,
-            -0.03065927541816946,
-            -0.01240701858838909,
-            -0.020154991263109597,
-            -0.02130749838608972,
-            0.10895969375730562,
-            0.10734686103117246,
-            0.02894584594974327,
-            0.0332985265030473,
-            0.029526956294118254,
-            0.012186271366384817,
-            0.01114858009498555,
-            0.025600362635148765,
-            0.04823150738750517,
-            0.03125460190286738,
-            0.0015774779242429258,
-            -0.009482942403023359,
-            -0.001667964424818854,
-            -0.0008090366982534751,
-            0.007858642964813778,
-            0.0258475861260621,
-            -0.007060614203302044,
-            -0.006779793512445937,
-            -0.04394242404942352,
-            -0.05854060651059418,
-            0.007308211412118826,
-            0.009090056067473252,
-            0.011813821047666546,
-            0.02269221946677242,
-            0.017281137466977466,
-            0.005620570895451491,
-            0.0002703069284735159,
-            0.008258583432862737,
-            0.004448356744182193,
-            0.0013238447565757433,
-            0.010358983882585939,
-            0.005519088553211,
-            0.02250152531497666,
-            0.014057538789495805,
-            -0.02460458588551084,
-            -0.01926391233529495,
-            0.002758677930510106,
-            0.004565252774600558,
-            0.0018370893157625577,
-            -0.006644117775047999,
-            -0.0024189184586771895,
-            -0.003140006752400823,
-            -0.00728234341349974,
-            0.005931649147175071,
-            0.009050329616448754,
-            0.01222445901647702,
-            -0.013951886460723581,
-            -0.008951387419472356,
-            0.012788777666430391,
-            -0.00037949716093836866,
-            0.0029912788458587264,
-            0.00672357518494679,
-            -0.019564480431645832,
-            -0.02053483983432188,
-            -0.0009632920704258156,
-            -0.006841596696523714,
-            -0.037898020331356155,
-            -0.02313832384659289,
-            0.008736603429808297,
-            -0.0011897532945902467,
-            -0.028444958734563305,
+            0.015935377541539,
+            -0.008864572988953677,
+            -0.007204832968298692,
+            0.010885678951036782,
+            0.014927223874317386,
+            0.0026097843321441004,
+            -0.03318246068431764,
+            0.021488559622541963,
+            -0.040767515693997995,
+            0.02028699143056878,
+            0.08690949087616473,
+            0.018803273365145604,
+            0.009955451143649242,
+            0.02311297526337911,
+            0.006269083850772193,
+            0.005880323275926195,
+            0.005237391713115293,
+            0.02025681091376255,
+            0.02741933815228074,
+            0.003732975556384017,
+            -0.002147481137546833,
+            -0.007351311562939156,
+            0.005725436606448306,
+            -0.00649720989078596,
+            0.014449671667774694,
+            0.011235564243960139,
+            -0.01809276993379124,
+            0.011521494712343537,
+            -0.054832230400644756,
+            -0.003923573685002921,
+            0.011276094301540113,
+            -0.002161596982692281,
+            0.014005625632950075,
+            0.008566611575174313,
+            0.008640506032806994,
+            -0.0029941295143490177,
+            0.003274239941267744,
+            0.004968076816052588,
+            -0.0005171508268371831,
+            0.0018419481484208734,
+            0.008501376639205452,
+            -0.0029571482549015657,
+            0.025534181931417054,
+            -0.011190892847966283,
+            -0.013565503129495492,
+            -0.005776774052284106,
+            0.008585045852915002,
+            -0.003985576719427845,
+            0.005845965579506661,
+            -0.01241749112883168,
+            0.010124290963377948,
+            -0.013131352086512359,
+            0.005926836043863624,
+            4.784744912836771e-06,
+            0.009045501591118195,
+            0.0031504599350041344,
+            -0.017048635353101273,
+            0.008237689294563942,
+            0.004513904231303554,
+            -0.004871412303632133,
+            0.007901181060120355,
+            -0.001168374337983161,
+            -0.018417624773815,
+            -0.002156940786573327,
+            0.001196228911076036,
+            -0.008028222016319291,
+            -0.030111540446998892,
+            0.007189709839026024,
+            0.0015358512658250906,
+            -0.0027214248566044736,
+            -0.02579372957476814,
         ]
-        for exp, act in zip(backtest_stats.get_daily_returns(), daily_returns):
+        self.assertEqual(len(expected), len(daily_returns))
+        for exp, act in zip(expected, daily_returns):
             self.assertAlmostEqual(exp, act, 5)
 
     def test_get_average_daily_return(self):
@@ -201,7 +202,7 @@ class TestBacktestStats(unittest.TestCase):
         backtest_stats = self.init_backtest_stats(MSR)
         average_daily_return = backtest_stats.get_average_daily_return()
         self.assertIsInstance(average_daily_return, float)
-        self.assertAlmostEqual(average_daily_return, 0.0026551631928844574)
+        self.assertAlmostEqual(average_daily_return, 0.0020415403826053455)
 
     def test_get_daily_standard_deviation(self):
         """
@@ -210,7 +211,7 @@ class TestBacktestStats(unittest.TestCase):
         backtest_stats = self.init_backtest_stats(MSR)
         daily_standard_deviation = backtest_stats.get_daily_standard_deviation()
         self.assertIsInstance(daily_standard_deviation, float)
-        self.assertAlmostEqual(daily_standard_deviation, 0.029477810451124346)
+        self.assertAlmostEqual(daily_standard_deviation, 0.016931011681065495)
 
     def test_get_annualized_volatility(self):
         """
@@ -219,7 +220,7 @@ class TestBacktestStats(unittest.TestCase):
         backtest_stats = self.init_backtest_stats(MSR)
         daily_standard_deviation = backtest_stats.get_annualized_volatility()
         self.assertIsInstance(daily_standard_deviation, float)
-        self.assertAlmostEqual(daily_standard_deviation, 0.4660851834598849)
+        self.assertAlmostEqual(daily_standard_deviation, 0.26770280001541646)
 
     def test_get_daily_sharpe_ratio(self):
         """
@@ -228,7 +229,7 @@ class TestBacktestStats(unittest.TestCase):
         backtest_stats = self.init_backtest_stats(MSR)
         daily_sharpe_ratio = backtest_stats.get_daily_sharpe_ratio()
         self.assertIsInstance(daily_sharpe_ratio, float)
-        self.assertAlmostEqual(daily_sharpe_ratio, 0.08668090179632043)
+        self.assertAlmostEqual(daily_sharpe_ratio, 0.11467361898855895)
 
     def test_get_annualized_sharpe_ratio(self):
         """
@@ -237,7 +238,36 @@ class TestBacktestStats(unittest.TestCase):
         backtest_stats = self.init_backtest_stats(MSR)
         daily_standard_deviation = backtest_stats.get_annualized_sharpe_ratio()
         self.assertIsInstance(daily_standard_deviation, float)
-        self.assertAlmostEqual(daily_standard_deviation, 1.3705452496776156)
+        self.assertAlmostEqual(daily_standard_deviation, 1.813149117690902)
+
+    def test_memoized_stats(self):
+        """
+        Tests that the daily returns are computed once, and again when the
+        memo is invalidated after an in-place change or rows are added.
+        """
+        backtest_stats = self.init_backtest_stats(MSR)
+        stats = backtest_stats.get_stats()
+        backtest_stats.get_annualized_sharpe_ratio()
+        self.assertIs(backtest_stats.get_stats(), stats)
+        self.assertEqual(len(stats["daily_returns"]),
+                         len(backtest_stats.portfolio_performance) - 1)
+
+        performance = backtest_stats.portfolio_performance
+        performance.loc[len(performance) - 1, "aum"] *= 2
+        self.assertIs(backtest_stats.get_stats(), stats)
+        backtest_stats.invalidate()
+        self.assertAlmostEqual(backtest_stats.get_final_aum(),
+                               2 * 11705.99611698764)
+        self.assertIsNot(backtest_stats.get_stats(), stats)
+
+        last_row = performance.iloc[[-1]].assign(
+            datetime=performance["datetime"].iloc[-1] + pd.Timedelta(days=3)
+        )
+        backtest_stats.portfolio_performance = pd.concat(
+            [performance, last_row], ignore_index=True
+        )
+        self.assertEqual(backtest_stats.get_daily_returns()[-1], 0.0)
+        self.assertEqual(backtest_stats.get_number_of_days(), 123)
 
     # Allows us to capture printing to standard output
     @pytest.fixture(autouse=True)
@@ -252,8 +282,8 @@ class TestBacktestStats(unittest.TestCase):
     Backtest Stats
 
     Annual Return: 61.464%
-    Annual Volatility: 46.609%
-    Annual Sharpe Ratio: 1.37055
+    Annual Volatility: 26.770%
+    Annual Sharpe Ratio: 1.81315
     Total Stock Return: 17.060%
     Profit and Loss: 1705.99612
     
@@ -263,6 +293,37 @@ class TestBacktestStats(unittest.TestCase):
         captured = self.capsys.readouterr()
         assert len(captured.out) == len(out_str)
 
+    def test_multiple_strategies(self):
+        """
+        Tests the statistics and side-by-side summary of a backtest of
+        several optimizers.
+        """
+        msr_stats = self.init_backtest_stats(MSR)
+        mv_stats = self.init_backtest_stats(MV)
+        portfolio_performance = pd.DataFrame({
+            "datetime": msr_stats.portfolio_performance["datetime"],
+            MSR: msr_stats.portfolio_performance["aum"],
+            MV: mv_stats.portfolio_performance["aum"],
+        })
+        weights_records = {MSR: msr_stats.weights_record,
+                           MV: mv_stats.weights_record}
+        bts = BacktestStats(portfolio_performance, weights_records)
+        self.assertEqual(bts.aum_column, MSR)
+        self.assertEqual(bts.get_final_aum(), msr_stats.get_final_aum())
+        strategy_stats = bts.get_strategy_stats()
+        self.assertListEqual(list(strategy_stats), [MSR, MV])
+        self.assertEqual(strategy_stats[MV].get_annualized_sharpe_ratio(),
+                         mv_stats.get_annualized_sharpe_ratio())
+        self.assertIs(strategy_stats[MV].weights_record,
+                      mv_stats.weights_record)
+
+        bts.print_summary()
+        captured = self.capsys.readouterr()
+        lines = captured.out.splitlines()
+        self.assertListEqual(lines[3].split(), ["MSR", "MV"])
+        self.assertIn(msr_stats.get_summary()["Annual Return"], lines[4])
+        self.assertIn(mv_stats.get_summary()["Profit and Loss"], lines[8])
+
     def test_plot_portfolio_weights(self):
         """
         Tests the plot_portfolio_weights method with all plot types.
@@ -0,0 +1,105 @@
+"""
+This module is responsible for testing the batch backtests of subsets of a
+universe.
+"""
+import sys
+import unittest
+from unittest import mock
+
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+
+from src.backtest_stats import METRIC_COLUMNS
+from src.batch_backtest import RESULT_COLUMNS, BatchBacktest
+from src.run_backtest import HRP, MSR, MV, RunBacktest
+
+sys.path.append("/.../src")
+
+
+class TestBatchBacktest(unittest.TestCase):
+    """
+    Defines the TestBatchBacktest class which tests the BatchBacktest class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    subsets = [["MSFT", "WMT", "LMT"], ["SPY", "GM", "PG", "MSFT"]]
+
+    def test_matches_separate_backtests(self):
+        """
+        Tests that each subset gives the weights and AUM of a backtest of the
+        subset alone, and that the union is stored once.
+        """
+        batch = BatchBacktest(self.stocks_data, 10000, "20220915", [MV, HRP],
+                              self.subsets, rebalance="week_end")
+        results = batch.run()
+        self.assertListEqual(list(results.columns), RESULT_COLUMNS)
+        self.assertEqual(len(results), 4)
+        self.assertListEqual(list(batch.stocks_data.columns),
+                             ["MSFT", "WMT", "LMT", "SPY", "GM", "PG"])
+        for position, tickers in enumerate(self.subsets):
+            rbt = RunBacktest(self.stocks_data[tickers], 10000, "20220915",
+                              [MV, HRP], rebalance="week_end")
+            rbt.fill_up_portfolio_performance()
+            backtest = batch.backtests[position]
+            for optimizer in [MV, HRP]:
+                self.assertEqual(backtest.weights_record[optimizer],
+                                 rbt.weights_record[optimizer])
+                np.testing.assert_allclose(
+                    backtest.portfolio_performance[optimizer],
+                    rbt.portfolio_performance[optimizer], rtol=1e-9,
+                )
+                row = results[(results["subset"] == position)
+                              & (results["optimizer"] == optimizer)]
+                self.assertAlmostEqual(
+                    row["final_aum"].iloc[0],
+                    rbt.portfolio_performance[optimizer].iloc[-1], places=6,
+                )
+            for ticker in tickers:
+                self.assertTrue(np.shares_memory(
+                    backtest.stocks_data[ticker].to_numpy(),
+                    batch.stocks_data[ticker].to_numpy(),
+                ))
+        self.assertFalse(results[METRIC_COLUMNS].isna().any().any())
+
+    def test_failed_subset(self):
+        """
+        Tests that a subset whose optimization fails records its error
+        without stopping the other subsets.
+        """
+        # no stock beats the risk-free rate in the second subset
+        stocks_data = self.stocks_data.copy()
+        decay = np.exp(-np.arange(len(stocks_data)) / 252)
+        for ticker in ["SPY", "GM", "PG"]:
+            stocks_data[ticker] *= decay
+        batch = BatchBacktest(stocks_data, 10000, "20220915", MSR,
+                              [self.subsets[0], ["SPY", "GM", "PG"]])
+        results = batch.run().set_index("subset")
+        self.assertEqual(results.at[0, "error"], "")
+        self.assertIn("risk-free rate", results.at[1, "error"])
+        self.assertTrue(np.isnan(results.at[1, "final_aum"]))
+        self.assertGreater(results.at[0, "final_aum"], 0)
+
+    def test_solver_error(self):
+        """
+        Tests that a solver error is recorded like other optimization
+        errors.
+        """
+        batch = BatchBacktest(self.stocks_data, 10000, "20220915", MV,
+                              self.subsets)
+        with mock.patch.object(batch.backtests[1], "optimize_rebalances",
+                               side_effect=cp.SolverError("Solver failed.")):
+            results = batch.run().set_index("subset")
+        self.assertEqual(results.at[0, "error"], "")
+        self.assertEqual(results.at[1, "error"], "Solver failed.")
+
+    def test_invalid_subsets(self):
+        """
+        Tests that empty subsets and unknown tickers are rejected.
+        """
+        for subsets in [[], [[]], [["MSFT", "AAPL"]]]:
+            with self.assertRaises(ValueError):
+                BatchBacktest(self.stocks_data, 10000, "20220915", MV,
+                              subsets)
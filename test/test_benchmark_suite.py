@@ -0,0 +1,71 @@
+"""
+This module is responsible for testing the benchmark suite.
+"""
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import cvxpy as cp
+
+from src.benchmark_suite import BenchmarkSuite
+from src.run_backtest import HRP, MV, RunBacktest
+
+sys.path.append("/.../src")
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """
+    Defines the TestBenchmarkSuite class which tests the BenchmarkSuite
+    class.
+    """
+
+    def test_run(self):
+        """
+        Tests that every case of a small grid is profiled and written to
+        JSON.
+        """
+        suite = BenchmarkSuite(tickers_grid=[4, 6], years_grid=[0.5],
+                               optimizers=[MV, HRP], lookback=60)
+        finished = []
+        results = suite.run(callback=finished.append)
+        cases = results["cases"]
+        self.assertEqual(len(cases), 4)
+        self.assertListEqual(finished, cases)
+        self.assertListEqual(
+            [(case["n_tickers"], case["optimizer"]) for case in cases],
+            [(4, MV), (4, HRP), (6, MV), (6, HRP)],
+        )
+        for case in cases:
+            self.assertIsNone(case["error"])
+            self.assertEqual(case["n_rebalances"], 6)
+            self.assertGreater(case["rebalances_per_second"], 0)
+            self.assertGreater(case["peak_memory"], 0)
+            for stage in ["total", "backtest", "optimize", "rebalance",
+                          "calc_aum", "backtest_stats"]:
+                self.assertIn(stage, case["stages"])
+        self.assertEqual(results["settings"]["lookback"], 60)
+        self.assertIn("numpy", results["environment"])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "benchmarks.json")
+            BenchmarkSuite.dump_json(results, path)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(json.load(file), results)
+
+    def test_solver_error(self):
+        """
+        Tests that a case whose solver fails records the error instead of
+        stopping the suite.
+        """
+        suite = BenchmarkSuite(tickers_grid=[4], years_grid=[0.5],
+                               optimizers=[MV], lookback=60)
+        with mock.patch.object(RunBacktest, "fill_up_portfolio_performance",
+                               side_effect=cp.SolverError("solver failed")):
+            cases = suite.run()["cases"]
+        self.assertEqual(len(cases), 1)
+        case = cases[0]
+        self.assertEqual(case["error"], "solver failed")
+        self.assertEqual(case["n_rebalances"], 0)
@@ -0,0 +1,82 @@
+"""
+This module is responsible for testing the budgeted runner.
+"""
+import os
+import sys
+import time
+import unittest
+
+from src.budgeted_runner import BudgetedRunner
+
+sys.path.append("/.../src")
+
+
+def sleep_and_square(seconds: float, value: int) -> int:
+    """
+    int: Returns the square of a value after sleeping.
+    """
+    time.sleep(seconds)
+    return value**2
+
+
+def fail(message: str) -> None:
+    """
+    None: Raises a ValueError with a message.
+    """
+    raise ValueError(message)
+
+
+def exit_process(code: int) -> None:
+    """
+    None: Exits the process without running the cleanup handlers.
+    """
+    os._exit(code)  # pylint: disable=protected-access
+
+
+class TestBudgetedRunner(unittest.TestCase):
+    """
+    Defines the TestBudgetedRunner class which tests the BudgetedRunner
+    class.
+    """
+
+    def test_results(self):
+        """
+        Tests that the results are returned in the order of the tasks.
+        """
+        for n_workers in [1, 3]:
+            runner = BudgetedRunner(time_budget=30, n_workers=n_workers)
+            outcomes = runner.run(sleep_and_square,
+                                  [(0.05 * (4 - value), value)
+                                   for value in range(4)])
+            self.assertListEqual(outcomes,
+                                 [(value**2, None) for value in range(4)])
+
+    def test_failures(self):
+        """
+        Tests that errors, exits and timeouts are reported without stopping
+        the other tasks, and that the timed out task is stopped early.
+        """
+        start = time.monotonic()
+        outcomes = BudgetedRunner(time_budget=0.5, n_workers=2).run(
+            sleep_and_square, [(60, 1), (0, 2)]
+        )
+        self.assertLess(time.monotonic() - start, 30)
+        self.assertListEqual(outcomes, [(None, "Timed out after 0.5 seconds"),
+                                        (4, None)])
+
+        runner = BudgetedRunner()
+        self.assertListEqual(runner.run(fail, [("singular",)]),
+                             [(None, "ValueError: singular")])
+        self.assertListEqual(runner.run(exit_process, [(3,)]),
+                             [(None, "Process exited with code 3")])
+
+    def test_unexpected_errors(self):
+        """
+        Tests that errors which are not among the expected errors are raised
+        in the parent process, and that the expected ones are reported.
+        """
+        runner = BudgetedRunner(n_workers=2, errors=(ValueError,))
+        self.assertListEqual(runner.run(fail, [("singular",)]),
+                             [(None, "ValueError: singular")])
+        with self.assertRaises(TypeError):
+            runner.run(sleep_and_square, [(0, "square"), (60, 1)])
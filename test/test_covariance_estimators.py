@@ -0,0 +1,106 @@
+"""
+This module is responsible for testing the batched covariance estimators.
+"""
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from pypfopt import expected_returns, risk_models
+
+from src.covariance_estimators import (
+    CONSTANT_CORRELATION,
+    EXP,
+    LEDOIT_WOLF,
+    SAMPLE,
+    BatchedMoments,
+)
+
+sys.path.append("/.../src")
+
+
+class TestCovarianceEstimators(unittest.TestCase):
+    """
+    Defines the TestCovarianceEstimators class which tests the batched
+    covariance estimators against PyPortfolioOpt.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    lookback = 250
+    date_indexes = [260, 281, 300, 322, 345, 381]
+
+    def helper_matches_risk_model(self, estimator: str, risk_model):
+        """
+        Auxiliary function that compares the batched estimates of every
+        window with a PyPortfolioOpt risk model.
+        """
+        moments = BatchedMoments(self.stocks_data, self.lookback,
+                                 self.date_indexes, estimator, chunk_size=4)
+        self.assertEqual(moments.covariances.shape, (6, 6, 6))
+        for date_index in self.date_indexes + [299]:
+            window = self.stocks_data[
+                date_index - self.lookback + 1 : date_index + 1
+            ]
+            mean_returns, covariance = moments.get_moments(date_index)
+            np.testing.assert_allclose(
+                mean_returns, expected_returns.mean_historical_return(window),
+                rtol=1e-10,
+            )
+            np.testing.assert_allclose(covariance, risk_model(window),
+                                       rtol=1e-10, atol=1e-15)
+
+    def test_sample(self):
+        """
+        Tests the sample covariance estimator.
+        """
+        self.helper_matches_risk_model(SAMPLE, risk_models.sample_cov)
+
+    def test_ledoit_wolf(self):
+        """
+        Tests the Ledoit-Wolf constant variance shrinkage estimator.
+        """
+        self.helper_matches_risk_model(
+            LEDOIT_WOLF,
+            lambda window: risk_models.CovarianceShrinkage(window)
+            .ledoit_wolf(),
+        )
+
+    def test_exp(self):
+        """
+        Tests the exponentially weighted covariance estimator.
+        """
+        self.helper_matches_risk_model(EXP, risk_models.exp_cov)
+
+    def test_constant_correlation(self):
+        """
+        Tests the Ledoit-Wolf constant correlation shrinkage estimator.
+        """
+        self.helper_matches_risk_model(
+            CONSTANT_CORRELATION,
+            lambda window: risk_models.CovarianceShrinkage(window)
+            .ledoit_wolf(shrinkage_target="constant_correlation"),
+        )
+
+    def test_missing_prices(self):
+        """
+        Tests that windows with missing prices fall back to PyPortfolioOpt.
+        """
+        prices = self.stocks_data.copy()
+        prices.iloc[100:120, 2] = np.nan
+        moments = BatchedMoments(prices, self.lookback, [300, 370],
+                                 LEDOIT_WOLF)
+        self.assertListEqual(list(moments.positions), [370])
+        window = prices[300 - self.lookback + 1 : 301]
+        np.testing.assert_allclose(
+            moments.get_moments(300)[1],
+            risk_models.CovarianceShrinkage(window).ledoit_wolf(),
+        )
+
+    def test_unknown_estimator(self):
+        """
+        Tests that unknown estimators are rejected.
+        """
+        with self.assertRaises(ValueError):
+            BatchedMoments(self.stocks_data, self.lookback, [300], "shrunk")
@@ -0,0 +1,87 @@
+"""
+This module is responsible for testing the market data providers.
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from src.data_providers import LocalFileProvider
+
+sys.path.append("/.../src")
+
+
+class TestLocalFileProvider(unittest.TestCase):
+    """
+    Defines the TestLocalFileProvider class which tests the
+    LocalFileProvider class.
+    """
+
+    data_path = "./test/data/"
+    stocks_data = pd.read_csv(data_path + "stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+
+    dt_start = datetime(2022, 3, 1)
+    dt_end = datetime(2022, 6, 1)
+
+    def expected(self, tickers):
+        """
+        Auxiliary function that slices the test data like the provider.
+        """
+        data = self.stocks_data[tickers]
+        return data[(data.index >= self.dt_start) & (data.index < self.dt_end)]
+
+    def test_index_directory(self):
+        """
+        Tests that only the files with a date column are indexed.
+        """
+        provider = LocalFileProvider(self.data_path)
+        self.assertListEqual(sorted(provider.ticker_locations),
+                             ["GM", "LMT", "MSFT", "PG", "SPY", "WMT"])
+
+    def test_fetch_wide_file(self):
+        """
+        Tests the fetch method with column projection and a date range.
+        """
+        provider = LocalFileProvider(self.data_path)
+        res = provider.fetch(["WMT", "MSFT"], self.dt_start, self.dt_end)
+        pd.testing.assert_frame_equal(res, self.expected(["MSFT", "WMT"]))
+
+    def test_fetch_unknown_ticker(self):
+        """
+        Tests that the fetch method fails for tickers without local data.
+        """
+        provider = LocalFileProvider(self.data_path)
+        with self.assertRaises(ValueError):
+            provider.fetch(["MSFT", "AAPL"], self.dt_start, self.dt_end)
+
+    def test_fetch_single_ticker_files(self):
+        """
+        Tests the fetch method with one file per ticker.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for ticker in ["GM", "PG"]:
+                self.stocks_data[[ticker]].rename(
+                    columns={ticker: "Adj Close"}
+                ).to_csv(os.path.join(tmp_dir, ticker + ".csv"))
+            provider = LocalFileProvider(tmp_dir)
+            res = provider.fetch(["PG", "GM"], self.dt_start, self.dt_end)
+        pd.testing.assert_frame_equal(res, self.expected(["GM", "PG"]))
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"),
+                         "pyarrow is required for Parquet files")
+    def test_fetch_parquet(self):
+        """
+        Tests the fetch method with a Parquet file.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.stocks_data.to_parquet(os.path.join(tmp_dir, "prices.parquet"))
+            provider = LocalFileProvider(tmp_dir)
+            res = provider.fetch(["SPY", "LMT"], self.dt_start, self.dt_end)
+        pd.testing.assert_frame_equal(res, self.expected(["LMT", "SPY"]),
+                                      check_freq=False)
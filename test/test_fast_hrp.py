@@ -0,0 +1,87 @@
+"""
+This module is responsible for testing the large universe hierarchical risk
+parity optimizer.
+"""
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+import scipy.cluster.hierarchy as sch
+from pypfopt.hierarchical_portfolio import HRPOpt
+
+from src.fast_hrp import FastHRP, get_quasi_diag, single_linkage
+
+sys.path.append("/.../src")
+
+
+class TestFastHRP(unittest.TestCase):
+    """
+    Defines the TestFastHRP class which tests the FastHRP class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    lookback = 250
+
+    def test_single_linkage(self):
+        """
+        Tests that the linkage and ordering match scipy, including ties.
+        """
+        rng = np.random.default_rng(0)
+        for n_assets in [2, 7, 40]:
+            size = n_assets * (n_assets - 1) // 2
+            for distances in [rng.random(size),
+                              rng.integers(1, 4, size).astype(float)]:
+                expected = sch.linkage(distances, "single")
+                links = single_linkage(distances, n_assets)
+                np.testing.assert_array_equal(links, expected)
+                self.assertListEqual(
+                    get_quasi_diag(links),
+                    sch.to_tree(expected, rd=False).pre_order(),
+                )
+
+    def test_distances(self):
+        """
+        Tests the float32 condensed correlation distances.
+        """
+        window = self.stocks_data[:self.lookback]
+        prices = window.to_numpy()
+        distances = FastHRP(window.columns, block_size=4).get_distances(
+            prices - prices.mean(axis=0)
+        )
+        self.assertEqual(distances.dtype, np.float32)
+        corr = window.corr().to_numpy()
+        expected = np.sqrt(np.clip((1 - corr) / 2, 0, 1))
+        np.testing.assert_allclose(
+            distances, expected[np.triu_indices(6, k=1)], rtol=1e-6
+        )
+
+    def test_matches_hrpopt(self):
+        """
+        Tests that the weights of each window match HRPOpt.
+        """
+        fast_hrp = FastHRP(self.stocks_data.columns, reuse_tolerance=0)
+        for date_index in range(self.lookback - 1, len(self.stocks_data), 11):
+            window = self.stocks_data[
+                date_index - self.lookback + 1 : date_index + 1
+            ]
+            hrp = HRPOpt(window)
+            hrp.optimize()
+            self.assertEqual(fast_hrp.optimize(window), hrp.clean_weights())
+        self.assertEqual(fast_hrp.reuses, 0)
+
+    def test_reuse_ordering(self):
+        """
+        Tests that the ordering is reused when the distances barely change.
+        """
+        fast_hrp = FastHRP(self.stocks_data.columns, reuse_tolerance=0.05)
+        fast_hrp.optimize(self.stocks_data[100:350])
+        order = fast_hrp.order
+        fast_hrp.optimize(self.stocks_data[101:351])
+        self.assertEqual(fast_hrp.reuses, 1)
+        self.assertIs(fast_hrp.order, order)
+        fast_hrp.reuse_tolerance = 1e-9
+        fast_hrp.optimize(self.stocks_data[102:352])
+        self.assertEqual(fast_hrp.reuses, 1)
@@ -0,0 +1,184 @@
+"""
+This module is responsible for testing the coalescing of concurrent stock
+data requests.
+"""
+import sys
+import threading
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.data_providers import LocalFileProvider
+from src.fetch_coalescer import FetchCoalescer
+from src.stocks_fetcher import StocksFetcher
+
+sys.path.append("/.../src")
+
+
+class CountingProvider(LocalFileProvider):
+    """
+    Defines the CountingProvider class which records the requests made to
+    the local test data.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        This method initialises the CountingProvider class.
+        """
+        super().__init__(directory)
+        self.calls = []
+
+    def fetch(self, tickers, dt_start, dt_end):
+        """
+        Records the request and reads the local test data.
+        """
+        self.calls.append((list(tickers), dt_start, dt_end))
+        return super().fetch(tickers, dt_start, dt_end)
+
+
+class PartialProvider(CountingProvider):
+    """
+    Defines the PartialProvider class which leaves a ticker out of its
+    results, like a chunk which failed to download.
+    """
+
+    dropped = "GM"
+
+    def fetch(self, tickers, dt_start, dt_end):
+        """
+        Records the request and reads the local test data without the
+        dropped ticker.
+        """
+        data = super().fetch(tickers, dt_start, dt_end)
+        return data.drop(columns=self.dropped, errors="ignore")
+
+
+class TestFetchCoalescer(unittest.TestCase):
+    """
+    Defines the TestFetchCoalescer class which tests the FetchCoalescer
+    class.
+    """
+
+    data_path = "./test/data/"
+    requests = [
+        (["MSFT", "WMT"], "20220901", "20221130"),
+        (["GM", "MSFT", "PG"], "20221001", "20221231"),
+        (["PG"], "20220915", "20230110"),
+    ]
+
+    def setUp(self):
+        """
+        Sets up a coalescer over a counting local provider.
+        """
+        self.provider = CountingProvider(self.data_path)
+        self.coalescer = FetchCoalescer(StocksFetcher(provider=self.provider),
+                                        batch_window=0.2)
+        self.direct = StocksFetcher(provider=LocalFileProvider(self.data_path))
+
+    def run_concurrently(self):
+        """
+        Auxiliary function that sends the requests from separate threads.
+        """
+        results = [None] * len(self.requests)
+
+        def run(idx, request):
+            results[idx] = self.coalescer.fetch_stocks_data(*request)
+
+        threads = [
+            threading.Thread(target=run, args=(idx, request))
+            for idx, request in enumerate(self.requests)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_single_superset_fetch(self):
+        """
+        Tests that concurrent requests share one fetch and each get the same
+        data as a direct fetch.
+        """
+        results = self.run_concurrently()
+        self.assertEqual(len(self.provider.calls), 1)
+        tickers, dt_start, dt_end = self.provider.calls[0]
+        self.assertListEqual(tickers, ["GM", "MSFT", "PG", "WMT"])
+        self.assertEqual(
+            (dt_start, dt_end),
+            (
+                self.coalescer.fetcher.get_fetch_window("20220901",
+                                                        "20230110")
+            ),
+        )
+        for request, res in zip(self.requests, results):
+            pd.testing.assert_frame_equal(
+                res, self.direct.fetch_stocks_data(*request)
+            )
+
+    def test_covered_request_is_a_view(self):
+        """
+        Tests that later requests covered by the shared frame are served
+        from it without fetching or copying.
+        """
+        self.run_concurrently()
+        res = self.coalescer.fetch_stocks_data(["MSFT", "PG"], "20221001",
+                                               "20221201")
+        self.assertEqual(len(self.provider.calls), 1)
+        shared = self.coalescer.shared.data
+        self.assertTrue(np.shares_memory(res.values, shared.values))
+        pd.testing.assert_frame_equal(
+            res,
+            self.direct.fetch_stocks_data(["MSFT", "PG"], "20221001",
+                                          "20221201"),
+        )
+
+    def test_errors_reach_every_caller(self):
+        """
+        Tests that a failed superset fetch raises in every request.
+        """
+        self.requests = [(["MSFT"], "20220901", "20221130"),
+                         (["AAPL"], "20220901", "20221130")]
+        errors = []
+
+        def run(request):
+            try:
+                self.coalescer.fetch_stocks_data(*request)
+            except ValueError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=run, args=(request,))
+                   for request in self.requests]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 2)
+
+    def test_missing_tickers(self):
+        """
+        Tests that tickers missing from the superset frame are reported to
+        the requests which asked for them, and fetched again later.
+        """
+        self.provider = PartialProvider(self.data_path)
+        self.coalescer = FetchCoalescer(StocksFetcher(provider=self.provider),
+                                        batch_window=0.2)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            results = self.run_concurrently()
+        self.assertEqual(len(self.provider.calls), 1)
+        self.assertListEqual([str(warning.message) for warning in caught],
+                             ["Failed to fetch tickers: GM"])
+        for request, res in zip(self.requests, results):
+            expected = self.direct.fetch_stocks_data(*request)
+            self.assertListEqual(list(res.columns), list(expected.columns))
+            fetched = [ticker for ticker in request[0] if ticker != "GM"]
+            pd.testing.assert_frame_equal(res[fetched], expected[fetched],
+                                          check_freq=False)
+            if "GM" in request[0]:
+                self.assertTrue(res["GM"].isna().all())
+
+        with self.assertRaises(ValueError):
+            self.coalescer.fetch_stocks_data(["GM"], "20221001", "20221201")
+        self.assertEqual(len(self.provider.calls), 2)
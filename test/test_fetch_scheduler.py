@@ -0,0 +1,243 @@
+"""
+This module is responsible for testing the concurrent, chunked downloads of
+stock data against a local stand-in server.
+"""
+import io
+import sys
+import threading
+import unittest
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from src.data_providers import DataProvider, LocalFileProvider
+from src.fetch_scheduler import FetchScheduler, TokenBucket
+from src.stocks_fetcher import StocksFetcher
+
+sys.path.append("/.../src")
+
+STOCKS_DATA = pd.read_csv("./test/data/stocks_data.csv",
+                          parse_dates=["Date"],
+                          index_col="Date")
+FAILING_TICKER = "GM"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Defines the StandInHandler class which serves the test data as CSV. The
+    first request for each chunk fails and requests containing the failing
+    ticker always fail.
+    """
+
+    requests_seen = {}
+    lock = threading.Lock()
+
+    # the name of the handler is set by BaseHTTPRequestHandler
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Serves one chunk of prices.
+        """
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+        tickers = query["tickers"][0].split(",")
+        with self.lock:
+            attempt = self.requests_seen.get(self.path, 0)
+            self.requests_seen[self.path] = attempt + 1
+        if attempt == 0 or FAILING_TICKER in tickers:
+            self.send_response(503)
+            self.end_headers()
+            return
+        data = STOCKS_DATA[tickers]
+        data = data[(data.index >= query["start"][0])
+                    & (data.index < query["end"][0])]
+        body = data.to_csv().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """
+        Silences the request logs.
+        """
+
+
+class HttpCsvProvider(DataProvider):
+    """
+    Defines the HttpCsvProvider class which fetches prices from the
+    stand-in server.
+    """
+
+    def __init__(self, base_url: str) -> None:
+        """
+        This method initialises the HttpCsvProvider class.
+        """
+        self.base_url = base_url
+
+    def fetch(self, tickers, dt_start, dt_end):
+        """
+        Fetches one chunk of prices from the stand-in server.
+        """
+        query = urllib.parse.urlencode({
+            "tickers": ",".join(tickers),
+            "start": dt_start.strftime("%Y-%m-%d"),
+            "end": dt_end.strftime("%Y-%m-%d"),
+        })
+        with urllib.request.urlopen(f"{self.base_url}/prices?{query}") as res:
+            return pd.read_csv(io.BytesIO(res.read()),
+                               parse_dates=["Date"],
+                               index_col="Date")
+
+
+class TestFetchScheduler(unittest.TestCase):
+    """
+    Defines the TestFetchScheduler class which tests the FetchScheduler and
+    TokenBucket classes.
+    """
+
+    dt_start = datetime(2022, 1, 1)
+    dt_end = datetime(2022, 7, 1)
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Starts the stand-in server.
+        """
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever,
+                                      daemon=True)
+        cls.thread.start()
+        cls.provider = HttpCsvProvider(
+            f"http://127.0.0.1:{cls.server.server_address[1]}"
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stops the stand-in server.
+        """
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """
+        Resets the requests seen by the stand-in server.
+        """
+        StandInHandler.requests_seen.clear()
+
+    def expected(self, tickers):
+        """
+        Auxiliary function that slices the test data like the server.
+        """
+        data = STOCKS_DATA[tickers]
+        return data[(data.index >= self.dt_start) & (data.index < self.dt_end)]
+
+    def test_token_bucket(self):
+        """
+        Tests that the token bucket allows a burst and then waits for the
+        refill.
+        """
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0],
+                             sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+        self.assertListEqual(waits, [0.5, 0.5])
+
+    def test_fetch_with_retries(self):
+        """
+        Tests that failed chunks are retried and merged into one frame.
+        """
+        tickers = ["WMT", "LMT", "SPY", "MSFT", "PG"]
+        scheduler = FetchScheduler(chunk_size=2, max_workers=3, rate=100.0,
+                                   burst=10, backoff=0.0)
+        res = scheduler.fetch(self.provider, tickers, self.dt_start,
+                              self.dt_end)
+        pd.testing.assert_frame_equal(res, self.expected(sorted(tickers)))
+        self.assertListEqual(scheduler.failed_tickers, [])
+        self.assertEqual(sum(StandInHandler.requests_seen.values()), 6)
+
+    def test_fetch_partial_results(self):
+        """
+        Tests that chunks failing after all retries are left out.
+        """
+        tickers = ["MSFT", "GM", "PG", "WMT"]
+        scheduler = FetchScheduler(chunk_size=2, max_workers=2, rate=100.0,
+                                   burst=10, max_retries=2, backoff=0.0)
+        with self.assertWarns(UserWarning):
+            res = scheduler.fetch(self.provider, tickers, self.dt_start,
+                                  self.dt_end)
+        self.assertListEqual(scheduler.failed_tickers, ["MSFT", "GM"])
+        pd.testing.assert_frame_equal(res, self.expected(["PG", "WMT"]))
+
+    def test_fetch_all_failed(self):
+        """
+        Tests that an error is raised when every chunk fails.
+        """
+        scheduler = FetchScheduler(chunk_size=2, rate=100.0, burst=10,
+                                   max_retries=1, backoff=0.0)
+        with self.assertRaises(urllib.error.HTTPError):
+            scheduler.fetch(self.provider, [FAILING_TICKER], self.dt_start,
+                            self.dt_end)
+
+    def test_programming_errors_not_retried(self):
+        """
+        Tests that errors other than download and HTTP errors are raised at
+        once instead of being retried or recorded as failed chunks.
+        """
+        calls = []
+
+        class BrokenProvider(DataProvider):
+            """
+            Defines a provider with a bug.
+            """
+
+            def fetch(self, tickers, dt_start, dt_end):
+                """
+                Fails with a programming error.
+                """
+                calls.append(tickers)
+                raise TypeError("bug")
+
+        scheduler = FetchScheduler(chunk_size=2, rate=100.0, burst=10,
+                                   backoff=0.0)
+        with self.assertRaises(TypeError):
+            scheduler.fetch(BrokenProvider(), ["MSFT", "PG", "WMT"],
+                            self.dt_start, self.dt_end)
+        self.assertEqual(len(calls), 2)
+
+    def test_data_errors_not_retried(self):
+        """
+        Tests that a provider error about the data itself, such as a ticker
+        missing from the local files, is raised without retries.
+        """
+        waits = []
+        scheduler = FetchScheduler(chunk_size=2, rate=100.0, burst=10,
+                                   sleep=waits.append)
+        with self.assertRaisesRegex(ValueError, "AAPL"):
+            scheduler.fetch(LocalFileProvider("./test/data/"),
+                            ["MSFT", "AAPL"], self.dt_start, self.dt_end)
+        self.assertListEqual(waits, [])
+
+    def test_stocks_fetcher_with_scheduler(self):
+        """
+        Tests that the fetcher gives the same data with the scheduler.
+        """
+        tickers = ["WMT", "GM", "MSFT"]
+        provider = LocalFileProvider("./test/data/")
+        direct = StocksFetcher(provider=provider)
+        chunked = StocksFetcher(provider=provider,
+                                scheduler=FetchScheduler(chunk_size=1))
+        pd.testing.assert_frame_equal(
+            chunked.fetch_stocks_data(tickers, "20220601", "20221201"),
+            direct.fetch_stocks_data(tickers, "20220601", "20221201"),
+        )
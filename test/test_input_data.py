@@ -91,6 +91,16 @@ class TestInputData(unittest.TestCase):
         )
         self.assertIsNone(args.e)
         self.assertEqual(args.plot_weights, False)
+        self.assertEqual(args.lookback, 250)
+        self.assertEqual(args.rebalance, "month_end")
+        self.assertEqual(args.workers, 1)
+        self.assertEqual(args.cov, "sample")
+        self.assertEqual(args.profile, False)
+        self.assertIsNone(args.profile_json)
+        self.assertIsNone(args.cache_dir)
+        self.assertIsNone(args.weights_cache)
+        self.assertEqual(args.warm_start, False)
+        self.assertEqual(args.hrp_mode, "auto")
 
     def setUp(self):
         """
@@ -103,6 +113,17 @@ class TestInputData(unittest.TestCase):
             "initial_aum": 10000,
             "optimizer": "msr",
             "plot_weights": "True",
+            "lookback": 250,
+            "rebalance": "month_end",
+            "workers": 1,
+            "cov": "sample",
+            "time_budget": None,
+            "profile": False,
+            "profile_json": None,
+            "cache_dir": None,
+            "weights_cache": None,
+            "warm_start": False,
+            "hrp_mode": "auto",
         }
 
     def test_get_tickers_valid(self):
@@ -227,6 +248,30 @@ class TestInputData(unittest.TestCase):
                 )
                 input_data.get_optimizer()
 
+    def test_get_optimizers_valid(self):
+        """
+        Tests the get_optimizers method with valid input.
+        """
+        input_data = InputData(**{**self.default_args, "optimizer": "MSR"})
+        self.assertListEqual(input_data.get_optimizers(), ["msr"])
+        input_data2 = InputData(
+            **{**self.default_args, "optimizer": "msr, MV,hrp"}
+        )
+        self.assertListEqual(input_data2.get_optimizers(),
+                             ["msr", "mv", "hrp"])
+
+    def test_get_optimizers_invalid(self):
+        """
+        Tests the get_optimizers method with invalid input.
+        """
+        for invalid_optimizers in ["msr,ms", "msr,MSR", "msr,", 173129129,
+                                   None]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "optimizer": invalid_optimizers}
+                )
+                input_data.get_optimizers()
+
     def test_plot_weights_valid(self):
         """
         Tests the get_plot_weights method with valid input.
@@ -247,3 +292,207 @@ class TestInputData(unittest.TestCase):
                        "plot_weights": invalid_plot_weights}
                 )
                 input_data.get_plot_weights()
+
+    def test_get_lookback_valid(self):
+        """
+        Tests the get_lookback method with valid input.
+        """
+        input_data = InputData(**self.default_args)
+        self.assertEqual(input_data.get_lookback(), 250)
+        input_data2 = InputData(**{**self.default_args, "lookback": None})
+        self.assertEqual(input_data2.get_lookback(), 250)
+
+    def test_get_lookback_invalid(self):
+        """
+        Tests the get_lookback method with invalid input.
+        """
+        for invalid_lookback in ["250", 2, -250]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "lookback": invalid_lookback}
+                )
+                input_data.get_lookback()
+
+    def test_get_rebalance_valid(self):
+        """
+        Tests the get_rebalance method with valid input.
+        """
+        for valid_rebalance in ["month_end", "WEEK_END", "quarter_end", "5"]:
+            input_data = InputData(
+                **{**self.default_args, "rebalance": valid_rebalance}
+            )
+            self.assertEqual(input_data.get_rebalance(),
+                             valid_rebalance.lower())
+
+    def test_get_rebalance_invalid(self):
+        """
+        Tests the get_rebalance method with invalid input.
+        """
+        for invalid_rebalance in ["year_end", "0", "-5", 5]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "rebalance": invalid_rebalance}
+                )
+                input_data.get_rebalance()
+
+    def test_get_workers_valid(self):
+        """
+        Tests the get_workers method with valid input.
+        """
+        input_data = InputData(**{**self.default_args, "workers": 8})
+        self.assertEqual(input_data.get_workers(), 8)
+        input_data2 = InputData(**{**self.default_args, "workers": None})
+        self.assertEqual(input_data2.get_workers(), 1)
+
+    def test_get_workers_invalid(self):
+        """
+        Tests the get_workers method with invalid input.
+        """
+        for invalid_workers in ["8", 0, -2]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "workers": invalid_workers}
+                )
+                input_data.get_workers()
+
+    def test_get_cov_valid(self):
+        """
+        Tests the get_cov method with valid input.
+        """
+        for valid_cov in ["sample", "Ledoit_Wolf", "exp",
+                          "constant_correlation"]:
+            input_data = InputData(**{**self.default_args, "cov": valid_cov})
+            self.assertEqual(input_data.get_cov(), valid_cov.lower())
+        input_data2 = InputData(**{**self.default_args, "cov": None})
+        self.assertEqual(input_data2.get_cov(), "sample")
+
+    def test_get_cov_invalid(self):
+        """
+        Tests the get_cov method with invalid input.
+        """
+        for invalid_cov in ["shrinkage", 1, ""]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(**{**self.default_args,
+                                          "cov": invalid_cov})
+                input_data.get_cov()
+
+    def test_get_time_budget_valid(self):
+        """
+        Tests the get_time_budget method with valid input.
+        """
+        input_data = InputData(**self.default_args)
+        self.assertIsNone(input_data.get_time_budget())
+        for valid_budget in [5, 0.5]:
+            input_data2 = InputData(
+                **{**self.default_args, "time_budget": valid_budget}
+            )
+            self.assertEqual(input_data2.get_time_budget(), valid_budget)
+
+    def test_get_time_budget_invalid(self):
+        """
+        Tests the get_time_budget method with invalid input.
+        """
+        for invalid_budget in ["5", True, 0, -1.5]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "time_budget": invalid_budget}
+                )
+                input_data.get_time_budget()
+
+    def test_get_profile_valid(self):
+        """
+        Tests the get_profile and get_profile_json methods with valid input.
+        """
+        input_data = InputData(**self.default_args)
+        self.assertFalse(input_data.get_profile())
+        self.assertIsNone(input_data.get_profile_json())
+        input_data2 = InputData(**{**self.default_args, "profile": True})
+        self.assertTrue(input_data2.get_profile())
+        input_data3 = InputData(
+            **{**self.default_args, "profile_json": "profile.json"}
+        )
+        self.assertTrue(input_data3.get_profile())
+        self.assertEqual(input_data3.get_profile_json(), "profile.json")
+
+    def test_get_profile_invalid(self):
+        """
+        Tests the get_profile and get_profile_json methods with invalid
+        input.
+        """
+        for invalid_profile in [None, "True"]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "profile": invalid_profile}
+                )
+                input_data.get_profile()
+        for invalid_path in ["", 1]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "profile_json": invalid_path}
+                )
+                input_data.get_profile_json()
+
+    def test_get_cache_dir(self):
+        """
+        Tests the get_cache_dir method with valid and invalid input.
+        """
+        input_data = InputData(**self.default_args)
+        self.assertIsNone(input_data.get_cache_dir())
+        input_data2 = InputData(
+            **{**self.default_args, "cache_dir": ".price_cache"}
+        )
+        self.assertEqual(input_data2.get_cache_dir(), ".price_cache")
+        for invalid_dir in ["", 1]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "cache_dir": invalid_dir}
+                )
+                input_data.get_cache_dir()
+
+    def test_get_weights_cache(self):
+        """
+        Tests the get_weights_cache method with valid and invalid input.
+        """
+        input_data = InputData(**self.default_args)
+        self.assertIsNone(input_data.get_weights_cache())
+        input_data2 = InputData(
+            **{**self.default_args, "weights_cache": ".weights_cache"}
+        )
+        self.assertEqual(input_data2.get_weights_cache(), ".weights_cache")
+        for invalid_dir in ["", 1]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "weights_cache": invalid_dir}
+                )
+                input_data.get_weights_cache()
+
+    def test_get_warm_start(self):
+        """
+        Tests the get_warm_start method with valid and invalid input.
+        """
+        input_data = InputData(**self.default_args)
+        self.assertFalse(input_data.get_warm_start())
+        input_data2 = InputData(**{**self.default_args, "warm_start": True})
+        self.assertTrue(input_data2.get_warm_start())
+        for invalid_warm_start in [None, "True"]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "warm_start": invalid_warm_start}
+                )
+                input_data.get_warm_start()
+
+    def test_get_hrp_mode(self):
+        """
+        Tests the get_hrp_mode method with valid and invalid input.
+        """
+        for valid_mode in ["auto", "Exact", "FAST"]:
+            input_data = InputData(
+                **{**self.default_args, "hrp_mode": valid_mode}
+            )
+            self.assertEqual(input_data.get_hrp_mode(), valid_mode.lower())
+        for invalid_mode in ["scipy", 1]:
+            with self.assertRaises(ValueError):
+                input_data = InputData(
+                    **{**self.default_args, "hrp_mode": invalid_mode}
+                )
+                input_data.get_hrp_mode()
@@ -0,0 +1,106 @@
+"""
+This module is responsible for testing the backtests over simulated price
+paths.
+"""
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.backtest_stats import METRIC_COLUMNS, BacktestStats
+from src.monte_carlo import BOOTSTRAP, GBM, PATH, MonteCarloBacktest
+from src.run_backtest import AUM, HRP, MV, RunBacktest
+
+sys.path.append("/.../src")
+
+
+class TestMonteCarloBacktest(unittest.TestCase):
+    """
+    Defines the TestMonteCarloBacktest class which tests the
+    MonteCarloBacktest class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    initial_aum = 10000
+    start_str = "20220915"
+
+    def init_monte_carlo(self, optimizer: str, method: str = BOOTSTRAP,
+                         n_workers: int = 1):
+        """
+        Tests the MonteCarloBacktest class instantiation.
+        """
+        return MonteCarloBacktest(self.stocks_data, self.initial_aum,
+                                  self.start_str, optimizer, n_paths=4,
+                                  method=method, n_workers=n_workers, seed=7)
+
+    def test_simulate_paths(self):
+        """
+        Tests that the paths start from the first prices and that the
+        bootstrapped returns are historical returns.
+        """
+        for method in [BOOTSTRAP, GBM]:
+            mc = self.init_monte_carlo(HRP, method)
+            paths = mc.simulate_paths()
+            self.assertEqual(paths.shape, (4,) + mc.stocks_data.shape)
+            np.testing.assert_array_equal(
+                paths[:, 0], np.tile(mc.stocks_data.iloc[0].to_numpy(), (4, 1))
+            )
+            self.assertTrue((paths > 0).all())
+            np.testing.assert_array_equal(
+                paths, self.init_monte_carlo(HRP, method).simulate_paths()
+            )
+
+        mc = self.init_monte_carlo(HRP)
+        returns = mc.simulate_returns(30)[0]
+        for daily_returns in returns:
+            self.assertTrue(
+                np.isclose(mc.returns, daily_returns).all(axis=1).any()
+            )
+
+    def test_matches_run_backtest(self):
+        """
+        Tests that the AUM and statistics of a path are the ones of a
+        backtest over that path.
+        """
+        mc = self.init_monte_carlo(HRP)
+        paths = mc.simulate_paths()
+        aum = mc.simulate_aum(paths, mc.optimize_paths(paths))
+        results = self.init_monte_carlo(HRP).run()
+        self.assertListEqual(list(results.columns), [PATH] + METRIC_COLUMNS)
+        self.assertEqual(len(results), 4)
+
+        path_data = pd.DataFrame(paths[1], index=mc.stocks_data.index,
+                                 columns=mc.stocks_data.columns)
+        rbt = RunBacktest(path_data, self.initial_aum, self.start_str, HRP)
+        rbt.fill_up_portfolio_performance()
+        expected = rbt.portfolio_performance[AUM].to_numpy()
+        np.testing.assert_allclose(aum[1, -len(expected):], expected,
+                                   rtol=1e-12)
+        metrics = BacktestStats(rbt.portfolio_performance,
+                                rbt.history).get_metrics()
+        for column in METRIC_COLUMNS:
+            self.assertAlmostEqual(results.at[1, column], metrics[column],
+                                   places=8)
+
+    def test_parallel_optimization(self):
+        """
+        Tests that optimizing the paths in worker processes gives the same
+        statistics, and summarises their distribution.
+        """
+        serial = self.init_monte_carlo(MV, GBM).run()
+        parallel = self.init_monte_carlo(MV, GBM, n_workers=2).run()
+        pd.testing.assert_frame_equal(serial, parallel)
+        distribution = MonteCarloBacktest.get_distribution(serial)
+        self.assertListEqual(list(distribution.index), METRIC_COLUMNS)
+        self.assertEqual(distribution.at["final_aum", "count"], 4)
+        self.assertIn("50%", distribution.columns)
+
+    def test_invalid_method(self):
+        """
+        Tests that unknown simulation methods are rejected.
+        """
+        with self.assertRaises(ValueError):
+            self.init_monte_carlo(HRP, "heston")
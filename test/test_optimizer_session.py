@@ -0,0 +1,97 @@
+"""
+This module is responsible for testing the compiled optimizer session.
+"""
+import pickle
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from pypfopt.efficient_frontier import EfficientFrontier
+
+from src.optimizer_session import MSR, MV, OptimizerSession
+from src.rolling_moments import RollingMoments
+
+sys.path.append("/.../src")
+
+
+class TestOptimizerSession(unittest.TestCase):
+    """
+    Defines the TestOptimizerSession class which tests the OptimizerSession
+    class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    moments = RollingMoments(stocks_data, 250)
+    date_indexes = [300, 320, 340, 360, 380]
+
+    def helper_matches_efficient_frontier(self, optimizer: str):
+        """
+        Auxiliary function that tests that a session re-solved over several
+        windows gives the weights of EfficientFrontier.
+        """
+        session = OptimizerSession(optimizer, self.stocks_data.columns)
+        problem = session.problem
+        for date_index in self.date_indexes:
+            exp_returns, covariance = self.moments.get_moments(date_index)
+            ef = EfficientFrontier(exp_returns, covariance)
+            if optimizer == MSR:
+                ef.max_sharpe()
+            else:
+                ef.min_volatility()
+            expected = ef.clean_weights()
+            weights = session.solve(exp_returns, covariance)
+            self.assertListEqual(list(weights), list(expected))
+            np.testing.assert_allclose(list(weights.values()),
+                                       list(expected.values()), atol=1e-3)
+        self.assertIs(session.problem, problem)
+        self.assertEqual(session.solves, len(self.date_indexes))
+
+    def test_max_sharpe(self):
+        """
+        Tests the max Sharpe ratio session.
+        """
+        self.helper_matches_efficient_frontier(MSR)
+
+    def test_min_volatility(self):
+        """
+        Tests the min volatility session.
+        """
+        self.helper_matches_efficient_frontier(MV)
+
+    def test_singular_covariance(self):
+        """
+        Tests that a singular covariance matrix is factorised.
+        """
+        covariance = np.array([[1.0, 1.0], [1.0, 1.0]])
+        factor = OptimizerSession.get_factor(covariance)
+        np.testing.assert_allclose(factor @ factor.T, covariance, atol=1e-12)
+
+    def test_invalid_inputs(self):
+        """
+        Tests that unsupported optimizers and windows without an asset above
+        the risk-free rate are rejected.
+        """
+        with self.assertRaises(ValueError):
+            OptimizerSession("hrp", self.stocks_data.columns)
+        session = OptimizerSession(MSR, self.stocks_data.columns)
+        exp_returns, covariance = self.moments.get_moments(300)
+        with self.assertRaises(ValueError):
+            session.solve(exp_returns * 0, covariance)
+
+    def test_pickle(self):
+        """
+        Tests that an unpickled session builds its problem again and keeps
+        its settings.
+        """
+        session = OptimizerSession(MV, self.stocks_data.columns)
+        exp_returns, covariance = self.moments.get_moments(300)
+        expected = session.solve(exp_returns, covariance)
+        unpickled = pickle.loads(pickle.dumps(session))
+        self.assertEqual(unpickled.solves, 1)
+        self.assertIsNot(unpickled.problem, session.problem)
+        weights = unpickled.solve(exp_returns, covariance)
+        np.testing.assert_allclose(list(weights.values()),
+                                   list(expected.values()), atol=1e-4)
@@ -0,0 +1,209 @@
+"""
+This module is responsible for testing the parameter sweep runner.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import cvxpy as cp
+import pandas as pd
+from pypfopt.exceptions import OptimizationError
+
+from src.backtest_stats import BacktestStats
+from src.parameter_sweep import ParameterSweep
+from src.run_backtest import HRP, MSR, MV, RunBacktest
+
+sys.path.append("/.../src")
+
+
+class TestParameterSweep(unittest.TestCase):
+    """
+    Defines the TestParameterSweep class which tests the ParameterSweep
+    class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    initial_aum = 10000
+    start_str = "20220915"
+    grid = {
+        "tickers": [["GM", "MSFT", "PG"], ["LMT", "SPY", "WMT"]],
+        "optimizer": [MSR, HRP],
+        "lookback": [60, 250],
+        "rebalance": ["month_end"],
+    }
+
+    def setUp(self):
+        """
+        Sets up a temporary results file.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.results_path = os.path.join(self.tmp_dir, "results.csv")
+
+    def tearDown(self):
+        """
+        Removes the temporary results file.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def init_sweep(self, n_workers: int = 1):
+        """
+        Tests the ParameterSweep class instantiation.
+        """
+        return ParameterSweep(self.stocks_data, self.initial_aum,
+                              self.start_str, self.results_path,
+                              n_workers=n_workers)
+
+    def test_expand_grid(self):
+        """
+        Tests the combinations of a grid and its defaults.
+        """
+        sweep = self.init_sweep()
+        self.assertEqual(len(sweep.expand_grid(self.grid)), 8)
+        combinations = sweep.expand_grid({"optimizer": [MV]})
+        self.assertListEqual(combinations, [{
+            "tickers": list(self.stocks_data.columns),
+            "optimizer": MV,
+            "lookback": 250,
+            "rebalance": "month_end",
+        }])
+        with self.assertRaises(ValueError):
+            sweep.expand_grid({"lookback": [60]})
+        with self.assertRaises(ValueError):
+            sweep.expand_grid({"optimizer": [MV], "solver": ["osqp"]})
+
+    def test_matches_single_backtest(self):
+        """
+        Tests that a combination of the sweep has the statistics of a single
+        backtest of that combination.
+        """
+        results = pd.read_csv(self.init_sweep().run(self.grid))
+        self.assertEqual(len(results), 8)
+        row = results[(results["tickers"] == "GM,MSFT,PG")
+                      & (results["optimizer"] == HRP)
+                      & (results["lookback"] == 60)].iloc[0]
+        rbt = RunBacktest(self.stocks_data[["GM", "MSFT", "PG"]],
+                          self.initial_aum, self.start_str, HRP, lookback=60)
+        rbt.fill_up_portfolio_performance()
+        bts = BacktestStats(rbt.portfolio_performance, rbt.weights_record)
+        self.assertAlmostEqual(row["final_aum"], bts.get_final_aum(), places=6)
+        self.assertAlmostEqual(row["annual_sharpe_ratio"],
+                               bts.get_annualized_sharpe_ratio(), places=9)
+
+    def test_rebalance_schedules(self):
+        """
+        Tests that the rebalance schedules of a universe and lookback are
+        run as one group which shares its moments, and that each schedule
+        has the statistics of a single backtest.
+        """
+        sweep = self.init_sweep()
+        grid = {"tickers": [["GM", "MSFT", "PG"]], "optimizer": [MV, HRP],
+                "lookback": [60], "rebalance": ["month_end", "week_end"]}
+        groups = sweep.group_combinations(sweep.expand_grid(grid))
+        self.assertListEqual(groups, [{
+            "tickers": ["GM", "MSFT", "PG"],
+            "lookback": 60,
+            "schedules": {"month_end": [MV, HRP], "week_end": [MV, HRP]},
+        }])
+        results = pd.read_csv(sweep.run(grid)).set_index(["optimizer",
+                                                          "rebalance"])
+        self.assertEqual(len(results), 4)
+        for rebalance in grid["rebalance"]:
+            rbt = RunBacktest(self.stocks_data[["GM", "MSFT", "PG"]],
+                              self.initial_aum, self.start_str, [MV, HRP],
+                              lookback=60, rebalance=rebalance)
+            rbt.fill_up_portfolio_performance()
+            stats = BacktestStats(rbt.portfolio_performance,
+                                  rbt.history).get_strategy_stats()
+            for optimizer in [MV, HRP]:
+                self.assertAlmostEqual(
+                    results.at[(optimizer, rebalance), "final_aum"],
+                    stats[optimizer].get_final_aum(), places=6,
+                )
+
+    def test_resume(self):
+        """
+        Tests that a resumed sweep only runs the missing combinations.
+        """
+        sweep = self.init_sweep()
+        sweep.run({**self.grid, "lookback": [60]})
+        self.assertEqual(len(sweep.get_completed()), 4)
+        results = pd.read_csv(sweep.run(self.grid))
+        self.assertEqual(len(results), 8)
+        self.assertEqual(len(sweep.get_completed()), 8)
+        self.assertEqual(len(pd.read_csv(sweep.run(self.grid))), 8)
+
+    def test_parallel_sweep(self):
+        """
+        Tests that a sweep across processes gives the results of a sweep in
+        this process.
+        """
+        results = pd.read_csv(self.init_sweep(n_workers=2).run(self.grid))
+        self.setUp()
+        expected = pd.read_csv(self.init_sweep().run(self.grid))
+        key = ["tickers", "optimizer", "lookback"]
+        pd.testing.assert_frame_equal(
+            results.sort_values(key).reset_index(drop=True),
+            expected.sort_values(key).reset_index(drop=True),
+        )
+
+    def test_failed_combination(self):
+        """
+        Tests that a combination without enough history records its error.
+        """
+        results = pd.read_csv(self.init_sweep().run({"optimizer": [MV],
+                                                     "lookback": [400]}))
+        self.assertIn("trading days", results["error"][0])
+        self.assertTrue(pd.isna(results["final_aum"][0]))
+
+    def test_resume_after_crash(self):
+        """
+        Tests that a row left partially written by a crash is dropped and
+        its combination is run again when the sweep is resumed.
+        """
+        sweep = self.init_sweep()
+        sweep.run({**self.grid, "lookback": [60]})
+        with open(self.results_path, "a", encoding="utf-8") as file:
+            file.write("\"GM,MSFT,PG\",msr,250,month_end,10000.0,1")
+        self.assertEqual(len(sweep.get_completed()), 4)
+        results = pd.read_csv(sweep.run(self.grid))
+        self.setUp()
+        expected = pd.read_csv(self.init_sweep().run(self.grid))
+        key = ["tickers", "optimizer", "lookback"]
+        pd.testing.assert_frame_equal(
+            results.sort_values(key).reset_index(drop=True),
+            expected.sort_values(key).reset_index(drop=True),
+        )
+
+    def test_solver_errors(self):
+        """
+        Tests that optimization and solver errors are recorded for the
+        failing optimizers without stopping the sweep.
+        """
+        fill_up = RunBacktest.fill_up_portfolio_performance
+        errors = {MSR: OptimizationError("infeasible"),
+                  HRP: cp.SolverError("solver failed")}
+
+        def failing_fill_up(backtest, *args):
+            for optimizer, error in errors.items():
+                if optimizer in backtest.optimizers and \
+                        backtest.stocks_data.columns[0] == "LMT":
+                    raise error
+            return fill_up(backtest, *args)
+
+        with mock.patch.object(RunBacktest, "fill_up_portfolio_performance",
+                               autospec=True, side_effect=failing_fill_up):
+            results = pd.read_csv(
+                self.init_sweep().run({**self.grid, "lookback": [60]})
+            )
+        results = results.set_index(["tickers", "optimizer"])
+        self.assertIn("infeasible", results.at[("LMT,SPY,WMT", MSR), "error"])
+        self.assertIn("solver failed",
+                      results.at[("LMT,SPY,WMT", HRP), "error"])
+        self.assertTrue(pd.isna(results.at[("GM,MSFT,PG", HRP), "error"]))
+        self.assertFalse(pd.isna(results.at[("GM,MSFT,PG", HRP),
+                                            "final_aum"]))
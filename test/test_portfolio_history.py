@@ -0,0 +1,82 @@
+"""
+This module is responsible for testing the array-backed record of the
+portfolio at each rebalance.
+"""
+import sys
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio_history import PortfolioHistory
+
+sys.path.append("/.../src")
+
+
+class TestPortfolioHistory(unittest.TestCase):
+    """
+    Defines the TestPortfolioHistory class which tests the PortfolioHistory
+    class.
+    """
+
+    tickers = ["AAPL", "MSFT", "TSLA"]
+
+    def test_append(self):
+        """
+        Tests that rebalances are recorded beyond the allocated capacity.
+        """
+        history = PortfolioHistory(self.tickers, capacity=1)
+        dates = pd.date_range("2022-01-31", periods=5, freq="M",
+                              tz="America/New_York")
+        for step, date in enumerate(dates):
+            history.append(date, np.full(3, step / 3), np.full(3, step))
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history.get_weights().shape, (5, 3))
+        np.testing.assert_array_equal(history.get_shares()[:, 0],
+                                      np.arange(5.0))
+        self.assertEqual(history.get_dates().dtype, np.dtype("datetime64[ns]"))
+        self.assertListEqual(
+            history.get_date_strings(),
+            ["2022-01-31", "2022-02-28", "2022-03-31", "2022-04-30",
+             "2022-05-31"],
+        )
+
+    def test_align(self):
+        """
+        Tests that weights are aligned to the tickers of the history.
+        """
+        history = PortfolioHistory(self.tickers)
+        np.testing.assert_array_equal(
+            history.align(OrderedDict([("TSLA", 0.5), ("AAPL", 0.5)])),
+            [0.5, 0.0, 0.5],
+        )
+        np.testing.assert_array_equal(
+            history.align(OrderedDict(zip(self.tickers, [0.2, 0.3, 0.5]))),
+            [0.2, 0.3, 0.5],
+        )
+
+    def test_records(self):
+        """
+        Tests the weights frame and the conversion to the records of ordered
+        dictionaries.
+        """
+        history = PortfolioHistory(self.tickers)
+        history.append(pd.Timestamp("2022-09-16"), np.array([0.2, 0.3, 0.5]),
+                       np.array([1.0, 2.0, 3.0]))
+        history.append(pd.Timestamp("2022-10-31"), np.array([1.0, 0.0, 0.0]),
+                       np.array([4.0, 0.0, 0.0]))
+        frame = history.get_weights_frame()
+        self.assertListEqual(list(frame.columns), self.tickers)
+        self.assertListEqual(list(frame.index), ["2022-09-16", "2022-10-31"])
+        self.assertEqual(frame.at["2022-09-16", "TSLA"], 0.5)
+        self.assertEqual(
+            history.to_weights_record(),
+            (["2022-09-16", "2022-10-31"],
+             [OrderedDict(zip(self.tickers, [0.2, 0.3, 0.5])),
+              OrderedDict(zip(self.tickers, [1.0, 0.0, 0.0]))]),
+        )
+        self.assertEqual(history.to_portfolio_record()[0],
+                         OrderedDict(zip(self.tickers, [1.0, 2.0, 3.0])))
+        self.assertEqual(history.get_portfolio(),
+                         OrderedDict(zip(self.tickers, [4.0, 0.0, 0.0])))
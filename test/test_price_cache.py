@@ -0,0 +1,190 @@
+"""
+This module is responsible for testing the functions that cache stock data.
+"""
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+
+from src.price_cache import PriceCache, merge_ranges, subtract_ranges
+from src.stocks_fetcher import StocksFetcher
+from src.trading_calendar import DEFAULT_LOOKBACK, get_lookback_start
+
+sys.path.append("/.../src")
+
+
+class TestPriceCache(unittest.TestCase):
+    """
+    Defines the TestPriceCache class which tests the PriceCache class.
+    """
+
+    stocks_path = "./test/data/stocks_data.csv"
+    stocks_data = pd.read_csv(stocks_path,
+                              parse_dates=["Date"],
+                              index_col="Date")
+
+    def setUp(self):
+        """
+        Sets up a temporary cache directory for the tests.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = PriceCache(self.tmp_dir)
+
+    def tearDown(self):
+        """
+        Removes the temporary cache directory.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def fake_download(self, tickers, dt_start, dt_end):
+        """
+        Auxiliary function that serves the test data in place of Yahoo
+        Finance.
+        """
+        data = self.stocks_data[tickers]
+        return data[(data.index >= dt_start) & (data.index < dt_end)]
+
+    def test_merge_ranges(self):
+        """
+        Tests the merge_ranges function.
+        """
+        ranges = [
+            (datetime(2022, 3, 1), datetime(2022, 4, 1)),
+            (datetime(2022, 1, 1), datetime(2022, 2, 1)),
+            (datetime(2022, 2, 1), datetime(2022, 2, 15)),
+        ]
+        expected = [
+            (datetime(2022, 1, 1), datetime(2022, 2, 15)),
+            (datetime(2022, 3, 1), datetime(2022, 4, 1)),
+        ]
+        self.assertListEqual(merge_ranges(ranges), expected)
+
+    def test_subtract_ranges(self):
+        """
+        Tests the subtract_ranges function.
+        """
+        covered = [(datetime(2022, 2, 1), datetime(2022, 3, 1))]
+        missing = subtract_ranges(
+            datetime(2022, 1, 1), datetime(2022, 4, 1), covered
+        )
+        expected = [
+            (datetime(2022, 1, 1), datetime(2022, 2, 1)),
+            (datetime(2022, 3, 1), datetime(2022, 4, 1)),
+        ]
+        self.assertListEqual(missing, expected)
+        inside = subtract_ranges(datetime(2022, 2, 5), datetime(2022, 2, 9),
+                                 covered)
+        self.assertListEqual(inside, [])
+
+    def test_store_and_load(self):
+        """
+        Tests that stored prices are loaded back within the coverage.
+        """
+        start, end = datetime(2022, 1, 1), datetime(2022, 7, 1)
+        prices = self.fake_download(["MSFT"], start, end)["MSFT"]
+        self.cache.store("MSFT", prices, start, end)
+
+        self.assertListEqual(self.cache.get_missing_ranges("MSFT", start, end),
+                             [])
+        loaded = self.cache.load(["MSFT"], start, end)
+        self.assertListEqual(loaded.columns.to_list(), ["MSFT"])
+        pd.testing.assert_series_equal(loaded["MSFT"], prices,
+                                       check_names=False, check_freq=False)
+
+    def test_concurrent_stores(self):
+        """
+        Tests that processes storing different ranges of the same ticker at
+        the same time keep all the prices and the whole coverage.
+        """
+        months = pd.date_range("2022-01-01", "2022-12-01", freq="MS")
+        ranges = list(zip(months[:-1], months[1:]))
+
+        def store_ranges(ranges):
+            for start, end in ranges:
+                prices = self.fake_download(["MSFT"], start, end)["MSFT"]
+                self.cache.store("MSFT", prices, start, end)
+
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=store_ranges, args=(ranges[offset::2],))
+            for offset in range(2)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        start, end = months[0].to_pydatetime(), months[-1].to_pydatetime()
+        self.assertListEqual(self.cache.get_coverage("MSFT"), [(start, end)])
+        expected = self.fake_download(["MSFT"], start, end)["MSFT"]
+        pd.testing.assert_series_equal(self.cache.read_prices("MSFT"),
+                                       expected, check_freq=False)
+
+    def test_fetch_only_missing_ranges(self):
+        """
+        Tests that the fetcher only downloads the date ranges missing from
+        the cache and merges them with the cached prices.
+        """
+        fetcher = StocksFetcher(cache_dir=self.tmp_dir)
+        tickers = ["MSFT", "WMT"]
+        with mock.patch.object(fetcher, "download",
+                               side_effect=self.fake_download) as download:
+            first = fetcher.fetch_stocks_data(tickers, "20221001", "20221201")
+            self.assertEqual(download.call_count, 1)
+
+            again = fetcher.fetch_stocks_data(tickers, "20221001", "20221201")
+            self.assertEqual(download.call_count, 1)
+            pd.testing.assert_frame_equal(first, again)
+
+            extended = fetcher.fetch_stocks_data(tickers, "20221001",
+                                                 "20221231")
+            self.assertEqual(download.call_count, 2)
+            _, dt_start, dt_end = download.call_args.args
+            self.assertEqual(dt_start, datetime(2022, 12, 2))
+            self.assertEqual(dt_end, datetime(2023, 1, 1))
+
+        dt_start = get_lookback_start(datetime(2022, 10, 1), DEFAULT_LOOKBACK)
+        expected = self.fake_download(tickers, dt_start, datetime(2023, 1, 1))
+        pd.testing.assert_frame_equal(extended, expected, check_names=False,
+                                      check_freq=False)
+
+    def test_refetch_missing_ticker(self):
+        """
+        Tests that a ticker missing from a download, or returned without
+        prices, is not marked as cached, and is fetched again by the next
+        request.
+        """
+        fetcher = StocksFetcher(cache_dir=self.tmp_dir)
+        tickers = ["MSFT", "WMT"]
+
+        def partial_download(tickers, dt_start, dt_end):
+            return self.fake_download(tickers, dt_start, dt_end).drop(
+                columns="WMT", errors="ignore"
+            )
+
+        def failed_download(tickers, dt_start, dt_end):
+            data = self.fake_download(tickers, dt_start, dt_end).copy()
+            data["WMT"] = float("nan")
+            return data
+
+        for download in [partial_download, failed_download]:
+            with mock.patch.object(fetcher, "download",
+                                   side_effect=download):
+                first = fetcher.fetch_stocks_data(tickers, "20221001",
+                                                  "20221201")
+            self.assertTrue(first["WMT"].isna().all())
+            self.assertEqual(self.cache.get_coverage("WMT"), [])
+
+        with mock.patch.object(fetcher, "download",
+                               side_effect=self.fake_download) as download:
+            again = fetcher.fetch_stocks_data(tickers, "20221001", "20221201")
+            self.assertEqual(download.call_count, 1)
+            self.assertListEqual(download.call_args.args[0], ["WMT"])
+        self.assertFalse(again["WMT"].isna().any())
+        pd.testing.assert_series_equal(again["MSFT"], first["MSFT"],
+                                       check_freq=False)
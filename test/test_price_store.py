@@ -0,0 +1,89 @@
+"""
+This module is responsible for testing the memory-mapped price store.
+"""
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.price_store import PriceStore
+from src.run_backtest import AUM, MV, RunBacktest
+
+sys.path.append("/.../src")
+
+
+class TestPriceStore(unittest.TestCase):
+    """
+    Defines the TestPriceStore class which tests the PriceStore class.
+    """
+
+    data_path = "./test/data/"
+    stocks_data = pd.read_csv(data_path + "stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+
+    def setUp(self):
+        """
+        Sets up a temporary store directory for the tests.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """
+        Removes the temporary store directory.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_write_and_read(self):
+        """
+        Tests that a written store reads back the same prices.
+        """
+        store = PriceStore.write(self.tmp_dir, self.stocks_data)
+        self.assertListEqual(store.tickers, self.stocks_data.columns.to_list())
+        pd.testing.assert_frame_equal(store.to_frame(), self.stocks_data)
+
+    def test_zero_copy_views(self):
+        """
+        Tests that the windows and the dataframe share the mapped values.
+        """
+        store = PriceStore.write(self.tmp_dir, self.stocks_data)
+        window = store.window(10, 260)
+        self.assertEqual(window.shape, (250, 6))
+        self.assertTrue(np.shares_memory(window, store.values))
+        self.assertFalse(window.flags.writeable)
+
+        frame = store.to_frame()
+        self.assertTrue(np.shares_memory(frame[10:260].values, store.values))
+
+    def test_float32_and_timezone(self):
+        """
+        Tests a float32 store of timezone aware prices.
+        """
+        stocks_data = self.stocks_data.tz_localize("America/New_York")
+        store = PriceStore.write(self.tmp_dir, stocks_data, "float32")
+        self.assertEqual(store.values.dtype, np.float32)
+        frame = store.to_frame()
+        self.assertTrue(frame.index.equals(stocks_data.index))
+        np.testing.assert_allclose(frame.values, stocks_data.values,
+                                   rtol=1e-6)
+
+    def test_invalid_dtype(self):
+        """
+        Tests that unsupported dtypes are rejected.
+        """
+        with self.assertRaises(ValueError):
+            PriceStore.write(self.tmp_dir, self.stocks_data, "int64")
+
+    def test_run_backtest_from_store(self):
+        """
+        Tests that the backtest gives the same performance from a store.
+        """
+        store = PriceStore.write(self.tmp_dir, self.stocks_data)
+        rbt = RunBacktest(store, 10000, "20220915", MV)
+        rbt.fill_up_portfolio_performance()
+        expected = pd.read_csv(self.data_path + "mv_portfolio_performance.csv")
+        np.testing.assert_allclose(rbt.portfolio_performance[AUM],
+                                   expected[AUM])
@@ -0,0 +1,117 @@
+"""
+This module is responsible for testing the stage profiler.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.profiler import (
+    CALLS,
+    CPU_TIME,
+    DISABLED_STAGE,
+    PEAK_MEMORY,
+    REPORT_COLUMNS,
+    WALL_TIME,
+    StageProfiler,
+)
+from src.run_backtest import MV, RunBacktest
+
+sys.path.append("/.../src")
+
+
+class TestStageProfiler(unittest.TestCase):
+    """
+    Defines the TestStageProfiler class which tests the StageProfiler class.
+    """
+
+    def test_disabled(self):
+        """
+        Tests that a disabled profiler records nothing.
+        """
+        profiler = StageProfiler()
+        with profiler.stage("outer"):
+            pass
+        self.assertIs(profiler.stage("outer"), DISABLED_STAGE)
+        self.assertFalse(profiler.stats)
+        self.assertTrue(profiler.get_report().empty)
+
+    def test_close(self):
+        """
+        Tests that closing a profiler stops the memory tracing it started.
+        """
+        profiler = StageProfiler(enabled=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        with profiler.stage("stage"):
+            pass
+        profiler.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIs(profiler.stage("stage"), DISABLED_STAGE)
+        self.assertEqual(profiler.stats["stage"][CALLS], 1)
+
+    def test_nested_stages(self):
+        """
+        Tests the calls, times and peak memory of nested stages.
+        """
+        profiler = StageProfiler(enabled=True)
+        with profiler.stage("outer"):
+            for _ in range(3):
+                with profiler.stage("inner"):
+                    block = np.ones(2**20)
+                    time.sleep(0.01)
+                del block
+        profiler.close()
+        report = profiler.get_report()
+        self.assertListEqual(list(report.columns), REPORT_COLUMNS)
+        self.assertListEqual(list(report.index), ["outer", "inner"])
+        self.assertEqual(report.at["inner", CALLS], 3)
+        self.assertEqual(report.at["outer", CALLS], 1)
+        self.assertGreaterEqual(report.at["inner", WALL_TIME], 0.03)
+        self.assertGreaterEqual(report.at["outer", WALL_TIME],
+                                report.at["inner", WALL_TIME])
+        self.assertLess(report.at["inner", CPU_TIME],
+                        report.at["inner", WALL_TIME])
+        # the 8 MiB block of the inner stage is part of the outer peak
+        self.assertGreaterEqual(report.at["inner", PEAK_MEMORY], 8 * 2**20)
+        self.assertGreaterEqual(report.at["outer", PEAK_MEMORY],
+                                report.at["inner", PEAK_MEMORY])
+
+    def test_dump_json(self):
+        """
+        Tests that the JSON dump holds the report.
+        """
+        profiler = StageProfiler(enabled=True, trace_memory=False)
+        with profiler.stage("stage"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "profile.json")
+            contents = profiler.dump_json(path)
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(file.read(), contents)
+        profile = json.loads(contents)
+        self.assertListEqual(list(profile), ["stage"])
+        self.assertEqual(profile["stage"][CALLS], 1)
+        self.assertEqual(profile["stage"][PEAK_MEMORY], 0)
+
+    def test_backtest_stages(self):
+        """
+        Tests that a profiled backtest records each rebalance.
+        """
+        stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                                  parse_dates=["Date"],
+                                  index_col="Date")
+        profiler = StageProfiler(enabled=True)
+        rbt = RunBacktest(stocks_data, 10000, "20220915", MV,
+                          profiler=profiler)
+        rbt.fill_up_portfolio_performance()
+        profiler.close()
+        report = profiler.get_report()
+        n_rebalances = len(rbt.rebalance_indexes)
+        for stage in ["moments", "optimize", "rebalance", "calc_aum"]:
+            self.assertEqual(report.at[stage, CALLS], n_rebalances)
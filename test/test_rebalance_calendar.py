@@ -0,0 +1,105 @@
+"""
+This module is responsible for testing the rebalance calendar.
+"""
+import sys
+import unittest
+
+import pandas as pd
+
+from src.rebalance_calendar import (
+    CUSTOM,
+    EVERY_N_DAYS,
+    MONTH_END,
+    QUARTER_END,
+    WEEK_END,
+    RebalanceCalendar,
+)
+
+sys.path.append("/.../src")
+
+
+class TestRebalanceCalendar(unittest.TestCase):
+    """
+    Defines the TestRebalanceCalendar class which tests the
+    RebalanceCalendar class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    index = stocks_data.index
+    start_str = "20220915"
+
+    def rebalance_dates(self, calendar: RebalanceCalendar):
+        """
+        Auxiliary function that returns the rebalance dates as strings.
+        """
+        indexes = calendar.get_rebalance_indexes(self.index, self.start_str)
+        return self.index[indexes].strftime("%Y%m%d").to_list()
+
+    def test_month_end(self):
+        """
+        Tests the month end rebalance dates.
+        """
+        self.assertListEqual(
+            self.rebalance_dates(RebalanceCalendar(MONTH_END)),
+            ["20220930", "20221031", "20221130", "20221230"],
+        )
+
+    def test_month_end_matches_loop(self):
+        """
+        Tests that the month end mask matches a loop over consecutive dates
+        over the whole test data.
+        """
+        mask = RebalanceCalendar(MONTH_END).get_rebalance_mask(self.index,
+                                                               "20210101")
+        expected = [
+            self.index[idx].month != self.index[idx + 1].month
+            for idx in range(len(self.index) - 1)
+        ] + [False]
+        self.assertListEqual(mask.tolist(), expected)
+
+    def test_week_and_quarter_end(self):
+        """
+        Tests the week end and quarter end rebalance dates.
+        """
+        week_ends = self.rebalance_dates(RebalanceCalendar(WEEK_END))
+        self.assertEqual(week_ends[:3], ["20220916", "20220923", "20220930"])
+        # the last trading date has no holding period after it
+        self.assertEqual(week_ends[-1], "20230106")
+        self.assertListEqual(
+            self.rebalance_dates(RebalanceCalendar(QUARTER_END)),
+            ["20220930", "20221230"],
+        )
+
+    def test_every_n_days(self):
+        """
+        Tests the every N trading days rebalance dates.
+        """
+        calendar = RebalanceCalendar(EVERY_N_DAYS, n_days=20)
+        self.assertListEqual(
+            self.rebalance_dates(calendar)[:3],
+            ["20220916", "20221014", "20221111"],
+        )
+        self.assertEqual(RebalanceCalendar.from_string("20").n_days, 20)
+
+    def test_custom_dates(self):
+        """
+        Tests custom rebalance dates rolled back to trading dates.
+        """
+        calendar = RebalanceCalendar(
+            CUSTOM, dates=["20220101", "20221009", "20221125", "20230201"]
+        )
+        self.assertListEqual(self.rebalance_dates(calendar),
+                             ["20221007", "20221125"])
+
+    def test_invalid_calendar(self):
+        """
+        Tests that invalid calendars are rejected.
+        """
+        with self.assertRaises(ValueError):
+            RebalanceCalendar("year_end")
+        with self.assertRaises(ValueError):
+            RebalanceCalendar(EVERY_N_DAYS)
+        with self.assertRaises(ValueError):
+            RebalanceCalendar(CUSTOM)
@@ -0,0 +1,107 @@
+"""
+This module is responsible for testing the rolling moments engine.
+"""
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from pypfopt import expected_returns, risk_models
+
+from src.rolling_moments import RollingMoments
+
+sys.path.append("/.../src")
+
+
+class TestRollingMoments(unittest.TestCase):
+    """
+    Defines the TestRollingMoments class which tests the RollingMoments
+    class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    lookback = 250
+
+    def assert_window_moments(self, moments, prices, date_index):
+        """
+        Auxiliary function that compares the moments of a window with the
+        PyPortfolioOpt functions.
+        """
+        window = prices[date_index - self.lookback + 1 : date_index + 1]
+        mean_returns, covariance = moments.get_moments(date_index)
+        np.testing.assert_allclose(
+            mean_returns, expected_returns.mean_historical_return(window),
+            rtol=1e-10,
+        )
+        np.testing.assert_allclose(
+            covariance, risk_models.sample_cov(window), rtol=1e-10, atol=1e-15
+        )
+
+    def test_incremental_windows(self):
+        """
+        Tests windows moving forward by different steps, including steps
+        longer than the window.
+        """
+        moments = RollingMoments(self.stocks_data, self.lookback)
+        date_indexes = [249, 250, 270, 271, 300, 360, 361, 381]
+        for date_index in date_indexes:
+            self.assert_window_moments(moments, self.stocks_data, date_index)
+
+    def test_periodic_refresh(self):
+        """
+        Tests that the sums are recomputed after the refresh interval.
+        """
+        moments = RollingMoments(self.stocks_data, self.lookback,
+                                 refresh_every=2)
+        for date_index in range(249, 260):
+            self.assert_window_moments(moments, self.stocks_data, date_index)
+            self.assertLessEqual(moments.updates, 2)
+
+    def test_missing_prices(self):
+        """
+        Tests that windows with missing prices fall back to PyPortfolioOpt.
+        """
+        prices = self.stocks_data.copy()
+        prices.iloc[100:120, 2] = np.nan
+        moments = RollingMoments(prices, self.lookback)
+        self.assertTrue(moments.has_missing_prices(300))
+        self.assertFalse(moments.has_missing_prices(370))
+        for date_index in [300, 369, 370, 381]:
+            self.assert_window_moments(moments, prices, date_index)
+
+    def test_append(self):
+        """
+        Tests that windows ending at appended prices match the moments of
+        the full prices.
+        """
+        prices = self.stocks_data.copy()
+        prices.iloc[355:358, 1] = np.nan
+        moments = RollingMoments(prices[:350], self.lookback)
+        self.assert_window_moments(moments, prices, 349)
+        moments.append(prices[350:])
+        self.assertEqual(len(moments.nan_counts), len(prices) - 1)
+        for date_index in [360, 370, 381]:
+            self.assert_window_moments(moments, prices, date_index)
+
+    def test_daily_append_in_place(self):
+        """
+        Tests that the prices are read in place, and that appending one day
+        at a time grows the buffer geometrically.
+        """
+        prices = self.stocks_data.copy()
+        moments = RollingMoments(prices[:300], self.lookback)
+        self.assertTrue(np.shares_memory(moments.values,
+                                         prices.to_numpy(dtype="float64")))
+        buffers = set()
+        for date_index in range(300, len(prices)):
+            moments.append(prices[date_index : date_index + 1])
+            buffers.add(id(moments.value_buffer))
+            self.assertIs(moments.values.base, moments.value_buffer)
+        self.assertLessEqual(len(buffers), 2)
+        self.assertTrue(moments.dates.equals(prices.index))
+        pd.testing.assert_frame_equal(moments.get_prices(), prices,
+                                      check_freq=False)
+        for date_index in [320, 381]:
+            self.assert_window_moments(moments, prices, date_index)
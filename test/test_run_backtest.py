@@ -4,11 +4,24 @@ the backtest
 """
 import pickle
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
+import numpy as np
 import pandas as pd
 
-from src.run_backtest import AUM, DATE_FORMAT, HRP, MSR, MV, RunBacktest
+from src.backtest_stats import BacktestStats
+from src.run_backtest import (
+    AUM,
+    DATE_FORMAT,
+    HRP,
+    MSR,
+    MV,
+    PREVIOUS,
+    RunBacktest,
+)
+from src.weights_cache import WeightsCache
 
 sys.path.append("/.../src")
 
@@ -49,20 +62,326 @@ class TestRunBacktest(unittest.TestCase):
             self.stocks_data, self.initial_aum, self.start_str, optimizer
         )
 
-    def test_get_month_end_indexes_from_b(self):
+    def test_get_rebalance_indexes(self):
         """
-        Tests the get_month_end_indexes_from_b method.
+        Tests the rebalance indexes with the default month end calendar.
         """
         rbt = self.init_run_backtest(MSR)
-        self.assertEqual(len(rbt.month_end_indexes), 4)
+        self.assertEqual(len(rbt.rebalance_indexes), 4)
+        self.assertEqual(rbt.rebalance_mask.sum(), 4)
         month_end_dates = (
-            self.stocks_data.index[rbt.month_end_indexes]
+            rbt.stocks_data.index[rbt.rebalance_indexes]
             .map(lambda s: s.strftime(DATE_FORMAT))
             .to_list()
         )
         expected = ["20220930", "20221031", "20221130", "20221230"]
         self.assertListEqual(month_end_dates, expected)
 
+    def test_drop_unused_history(self):
+        """
+        Tests that only the lookback window of the first rebalance date is
+        kept before the beginning date.
+        """
+        rbt = self.init_run_backtest(MSR)
+        self.assertEqual(rbt.rebalance_indexes[0], rbt.lookback - 1)
+        self.assertEqual(rbt.stocks_data.index[0], pd.Timestamp("2021-10-05"))
+
+        short = RunBacktest(
+            self.stocks_data, self.initial_aum, self.start_str, MSR, lookback=60
+        )
+        self.assertEqual(short.rebalance_indexes[0], 59)
+        self.assertEqual(len(short.stocks_data.index),
+                         len(rbt.stocks_data.index) - 190)
+
+    def test_lookback_too_long(self):
+        """
+        Tests that a lookback longer than the stocks data is rejected.
+        """
+        with self.assertRaises(ValueError):
+            RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                        MSR, lookback=400)
+
+    def test_calc_aum_segment(self):
+        """
+        Tests that the AUM of a segment is exactly the day by day AUM of
+        the portfolio.
+        """
+        rbt = self.init_run_backtest(MV)
+        rbt.update_portfolio(rbt.rebalance_indexes[0])
+        start, stop = rbt.rebalance_indexes[0] + 1, rbt.rebalance_indexes[1] + 1
+        segment = rbt.calc_aum_segment(start, stop)
+        for offset, date_index in enumerate(range(start, stop)):
+            expected = 0
+            for stock, amount in rbt.portfolio.items():
+                if amount != 0.0:
+                    expected += amount * rbt.stocks_data[stock].iloc[date_index]
+            self.assertEqual(segment[offset], expected)
+            self.assertEqual(rbt.calc_aum(date_index), expected)
+
+    def test_weekly_rebalance(self):
+        """
+        Tests a backtest rebalanced at every week end.
+        """
+        rbt = RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                          MV, rebalance="week_end")
+        self.assertEqual(len(rbt.rebalance_indexes), 17)
+        rbt.fill_up_portfolio_performance()
+        self.assertEqual(len(rbt.weights_record[0]), 17)
+        self.assertEqual(rbt.weights_record[0][0], "2022-09-16")
+
+    def test_parallel_optimization(self):
+        """
+        Tests that optimizing the rebalance dates across processes gives the
+        same weights and AUM, in the same order, as optimizing them inline.
+        """
+        for optimizer in [MSR, HRP]:
+            rbt = RunBacktest(self.stocks_data, self.initial_aum,
+                              self.start_str, optimizer, rebalance="week_end")
+            rbt.fill_up_portfolio_performance()
+            parallel = RunBacktest(self.stocks_data, self.initial_aum,
+                                   self.start_str, optimizer,
+                                   rebalance="week_end", n_workers=3)
+            parallel.fill_up_portfolio_performance()
+            self.assertEqual(parallel.weights_record, rbt.weights_record)
+            pd.testing.assert_frame_equal(parallel.portfolio_performance,
+                                          rbt.portfolio_performance)
+
+    def test_warm_start(self):
+        """
+        Tests that a warm started optimizer session gives weights close to
+        the ones of a fresh optimizer at each rebalance.
+        """
+        for optimizer in [MSR, MV]:
+            rbt = self.init_run_backtest(optimizer)
+            rbt.fill_up_portfolio_performance()
+            warm = RunBacktest(self.stocks_data, self.initial_aum,
+                               self.start_str, optimizer, warm_start=True)
+            warm.fill_up_portfolio_performance()
+            self.assertEqual(warm.sessions[optimizer].solves, 4)
+            self.assertListEqual(warm.weights_record[0], rbt.weights_record[0])
+            for weights, expected in zip(warm.weights_record[1],
+                                         rbt.weights_record[1]):
+                for stock, weight in expected.items():
+                    self.assertAlmostEqual(weights[stock], weight, places=3)
+
+    def test_multiple_optimizers(self):
+        """
+        Tests that a backtest of several optimizers gives each optimizer
+        the results of a backtest of that optimizer alone.
+        """
+        optimizers = [MSR, MV, HRP]
+        rbt = RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                          optimizers)
+        rbt.fill_up_portfolio_performance()
+        self.assertListEqual(list(rbt.portfolio_performance.columns),
+                             ["datetime"] + optimizers)
+        for optimizer in optimizers:
+            single = self.init_run_backtest(optimizer)
+            single.fill_up_portfolio_performance()
+            self.assertEqual(rbt.weights_record[optimizer],
+                             single.weights_record)
+            self.assertListEqual(rbt.portfolio_record[optimizer],
+                                 single.portfolio_record)
+            self.assertListEqual(
+                rbt.portfolio_performance[optimizer].to_list(),
+                single.portfolio_performance[AUM].to_list(),
+            )
+        with self.assertRaises(ValueError):
+            RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                        [MSR, MSR])
+
+    def test_portfolio_history(self):
+        """
+        Tests that the history of the backtest holds the weights and amounts
+        held at each rebalance, and feeds the backtest statistics.
+        """
+        rbt = self.init_run_backtest(HRP)
+        rbt.fill_up_portfolio_performance()
+        history = rbt.history
+        self.assertEqual(len(history), len(rbt.rebalance_indexes))
+        self.assertEqual(history.get_weights().shape,
+                         (len(history), len(rbt.stocks_data.columns)))
+        np.testing.assert_allclose(history.get_weights().sum(axis=1), 1,
+                                   atol=1e-4)
+        self.assertEqual(rbt.portfolio, history.get_portfolio())
+        bts = BacktestStats(rbt.portfolio_performance, history)
+        weights = bts.get_weights_frame()
+        self.assertListEqual(list(weights.index), rbt.weights_record[0])
+        self.assertEqual(weights.iloc[-1].to_dict(), rbt.weights_record[1][-1])
+
+    def test_advance(self):
+        """
+        Tests that advancing a backtest day by day, through a saved state,
+        gives the results of a backtest over all the days.
+        """
+        optimizers = [MSR, HRP]
+        expected = RunBacktest(self.stocks_data, self.initial_aum,
+                               self.start_str, optimizers)
+        expected.fill_up_portfolio_performance()
+        split = self.stocks_data.index.get_loc(pd.Timestamp("2022-10-20"))
+        rbt = RunBacktest(self.stocks_data[:split], self.initial_aum,
+                          self.start_str, optimizers)
+        with self.assertRaises(ValueError):
+            rbt.advance(self.stocks_data[split:])
+        rbt.fill_up_portfolio_performance()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            state_path = cache_dir + "/state.pkl"
+            for date_index in range(split, len(self.stocks_data), 10):
+                rbt.save_state(state_path)
+                rbt = RunBacktest.load_state(state_path)
+                rbt.advance(self.stocks_data[date_index : date_index + 10])
+        pd.testing.assert_frame_equal(rbt.portfolio_performance,
+                                      expected.portfolio_performance)
+        self.assertEqual(rbt.weights_record, expected.weights_record)
+        with self.assertRaises(ValueError):
+            rbt.advance(self.stocks_data[-1:])
+
+    def test_time_budget(self):
+        """
+        Tests that optimizations within their time budget give the same
+        backtest, and that a rebalance without any fallback in time raises.
+        """
+        rbt = self.init_run_backtest(MSR)
+        rbt.fill_up_portfolio_performance()
+        for n_workers in [1, 3]:
+            budgeted = RunBacktest(self.stocks_data, self.initial_aum,
+                                   self.start_str, MSR, n_workers=n_workers,
+                                   time_budget=60)
+            budgeted.fill_up_portfolio_performance()
+            self.assertListEqual(budgeted.fallback_record, [])
+            self.assertEqual(budgeted.weights_record, rbt.weights_record)
+            pd.testing.assert_frame_equal(budgeted.portfolio_performance,
+                                          rbt.portfolio_performance)
+
+        for fallbacks in [None, []]:
+            short = RunBacktest(self.stocks_data, self.initial_aum,
+                                self.start_str, MSR, time_budget=1e-4,
+                                fallbacks=fallbacks)
+            with self.assertRaisesRegex(ValueError, "Timed out"):
+                short.fill_up_portfolio_performance()
+        with self.assertRaises(ValueError):
+            RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                        MSR, time_budget=0)
+        with self.assertRaises(ValueError):
+            RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                        MSR, fallbacks=["equal"])
+
+    def test_fallbacks(self):
+        """
+        Tests that failed msr optimizations fall back to mv at the first
+        rebalance and to the previous weights afterwards, and are recorded.
+        """
+        # no stock beats the risk-free rate, so every msr optimization fails
+        falling = self.stocks_data * \
+            np.exp(-np.arange(len(self.stocks_data)) / 252)[:, None]
+        rbt = RunBacktest(falling, self.initial_aum, self.start_str, MSR)
+        with self.assertRaises(ValueError):
+            rbt.fill_up_portfolio_performance()
+
+        mv = RunBacktest(falling, self.initial_aum, self.start_str, MV)
+        mv.fill_up_portfolio_performance()
+        for warm_start, n_workers in [(False, 1), (True, 1), (False, 3)]:
+            rbt = RunBacktest(falling, self.initial_aum, self.start_str, MSR,
+                              warm_start=warm_start, n_workers=n_workers,
+                              fallbacks=[PREVIOUS, MV])
+            # without a time budget nothing runs in a budgeted child process
+            with mock.patch("src.run_backtest.BudgetedRunner") as runner:
+                rbt.fill_up_portfolio_performance()
+            runner.assert_not_called()
+            dates, weights = rbt.weights_record
+            self.assertListEqual(
+                [fallback["fallback"] for fallback in rbt.fallback_record],
+                [MV] + [PREVIOUS] * (len(dates) - 1),
+            )
+            self.assertListEqual(
+                [fallback["datetime"] for fallback in rbt.fallback_record],
+                [date.replace("-", "") for date in dates],
+            )
+            self.assertIn("risk-free rate",
+                          rbt.fallback_record[0]["reason"].lower())
+            for weight in weights:
+                self.assertEqual(dict(weight), dict(mv.weights_record[1][0]))
+
+    def test_weights_cache(self):
+        """
+        Tests that a backtest with a later ending date only optimizes the
+        rebalance dates which are not in the weights cache.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for optimizer in [MSR, HRP]:
+                cache = WeightsCache(cache_dir)
+                short = RunBacktest(self.stocks_data[:-20], self.initial_aum,
+                                    self.start_str, optimizer,
+                                    weights_cache=cache)
+                short.fill_up_portfolio_performance()
+                self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+                rbt = RunBacktest(self.stocks_data, self.initial_aum,
+                                  self.start_str, optimizer,
+                                  weights_cache=cache)
+                rbt.fill_up_portfolio_performance()
+                self.assertEqual((cache.hits, cache.misses), (3, 4))
+                expected = self.init_run_backtest(optimizer)
+                expected.fill_up_portfolio_performance()
+                self.assertEqual(rbt.weights_record, expected.weights_record)
+
+    def test_weights_cache_fast_hrp(self):
+        """
+        Tests that the weights of the large universe hrp optimizer are only
+        cached when they do not depend on the ordering of the previous
+        rebalance.
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = WeightsCache(cache_dir)
+            rbt = RunBacktest(self.stocks_data, self.initial_aum,
+                              self.start_str, [MV, HRP], hrp_mode="fast",
+                              weights_cache=cache)
+            rbt.fill_up_portfolio_performance()
+            self.assertEqual((cache.hits, cache.misses), (0, 4))
+            self.assertEqual(len(cache.get_entries()), 4)
+
+            stateless = RunBacktest(self.stocks_data, self.initial_aum,
+                                    self.start_str, HRP, hrp_mode="fast",
+                                    weights_cache=cache)
+            stateless.fast_hrp.reuse_tolerance = 0
+            stateless.fill_up_portfolio_performance()
+            self.assertEqual(len(cache.get_entries()), 8)
+            self.assertEqual(stateless.weights_record,
+                             rbt.weights_record[HRP])
+
+    def test_covariance_estimator(self):
+        """
+        Tests a backtest with a batched covariance estimator.
+        """
+        rbt = RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                          MV, cov="ledoit_wolf")
+        rbt.fill_up_portfolio_performance()
+        self.assertEqual(rbt.moments.covariances.shape, (4, 6, 6))
+        sample = self.init_run_backtest(MV)
+        sample.fill_up_portfolio_performance()
+        self.assertListEqual(rbt.weights_record[0], sample.weights_record[0])
+        self.assertNotEqual(rbt.weights_record[1], sample.weights_record[1])
+
+    def test_fast_hrp(self):
+        """
+        Tests that the large universe hrp optimizer reproduces the weights
+        and AUM of the test backtest.
+        """
+        rbt = RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                          HRP, hrp_mode="fast")
+        rbt.fill_up_portfolio_performance()
+        self.assertIsNotNone(rbt.fast_hrp)
+        with open(self.data_path + "hrp_weights_record.obj", "rb") as file:
+            self.assertEqual(pickle.load(file), rbt.weights_record)
+        expected = self.init_run_backtest(HRP)
+        self.assertIsNone(expected.fast_hrp)
+        expected.fill_up_portfolio_performance()
+        pd.testing.assert_frame_equal(rbt.portfolio_performance,
+                                      expected.portfolio_performance)
+        with self.assertRaises(ValueError):
+            RunBacktest(self.stocks_data, self.initial_aum, self.start_str,
+                        HRP, hrp_mode="approximate")
+
     def helper_portfolio_performance(self, optimizer: str):
         """
         Auxiliary function that tests the fill_up_portfolio_performance method
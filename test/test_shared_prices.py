@@ -0,0 +1,108 @@
+"""
+This module is responsible for testing the shared memory price matrix.
+"""
+import pickle
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from src.run_backtest import AUM, HRP, RunBacktest
+from src.shared_prices import SharedPrices
+
+sys.path.append("/.../src")
+
+
+def sum_column(shared_prices: SharedPrices, column: int) -> tuple:
+    """
+    tuple: Returns the sum of a column of shared prices attached in a worker
+        process, and whether its values are writeable.
+    """
+    frame = shared_prices.to_frame()
+    return float(frame.iloc[:, column].sum()), frame.values.flags.writeable
+
+
+class TestSharedPrices(unittest.TestCase):
+    """
+    Defines the TestSharedPrices class which tests the SharedPrices class.
+    """
+
+    data_path = "./test/data/"
+    stocks_data = pd.read_csv(data_path + "stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+
+    def test_read_only_views(self):
+        """
+        Tests that the shared prices read back the same prices through
+        read-only views of the block.
+        """
+        with SharedPrices(self.stocks_data) as shared_prices:
+            pd.testing.assert_frame_equal(shared_prices.to_frame(),
+                                          self.stocks_data)
+            window = shared_prices.window(10, 260)
+            self.assertEqual(window.shape, (250, 6))
+            self.assertTrue(np.shares_memory(window, shared_prices.values))
+            self.assertFalse(window.flags.writeable)
+            frame = shared_prices.to_frame()
+            self.assertTrue(np.shares_memory(frame.values,
+                                             shared_prices.values))
+
+    def test_timezone(self):
+        """
+        Tests that a timezone-aware index is shared.
+        """
+        stocks_data = self.stocks_data.tz_localize("America/New_York")
+        with SharedPrices(stocks_data) as shared_prices:
+            pd.testing.assert_frame_equal(shared_prices.to_frame(),
+                                          stocks_data)
+
+    def test_workers(self):
+        """
+        Tests that worker processes attach to the block of pickled shared
+        prices, and that closing the owner unlinks the block.
+        """
+        with SharedPrices(self.stocks_data) as shared_prices:
+            self.assertLess(len(pickle.dumps(shared_prices)), 1000)
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(sum_column,
+                                            [shared_prices] * 6, range(6)))
+            for column, (total, writeable) in enumerate(results):
+                self.assertAlmostEqual(total,
+                                       self.stocks_data.iloc[:, column].sum())
+                self.assertFalse(writeable)
+            name = shared_prices.block.name
+            # the workers detached without unlinking the block
+            SharedMemory(name=name).close()
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    def test_garbage_collection(self):
+        """
+        Tests that the block is unlinked when the shared prices are garbage
+        collected.
+        """
+        shared_prices = SharedPrices(self.stocks_data)
+        name = shared_prices.block.name
+        del shared_prices
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+    def test_backtest(self):
+        """
+        Tests that a backtest of shared prices, and a parallel backtest
+        which shares its windows, match a backtest of the dataframe.
+        """
+        rbt = RunBacktest(self.stocks_data, 10000, "20220915", HRP,
+                          rebalance="week_end")
+        rbt.fill_up_portfolio_performance()
+        with SharedPrices(self.stocks_data) as shared_prices:
+            shared = RunBacktest(shared_prices, 10000, "20220915", HRP,
+                                 rebalance="week_end", n_workers=2)
+            shared.fill_up_portfolio_performance()
+        self.assertEqual(shared.weights_record, rbt.weights_record)
+        self.assertTrue(np.array_equal(shared.portfolio_performance[AUM],
+                                       rbt.portfolio_performance[AUM]))
@@ -4,6 +4,7 @@ This module is responsible for testing the functions that fetch stock data.
 import sys
 import unittest
 
+from src.data_providers import LocalFileProvider
 from src.stocks_fetcher import StocksFetcher
 
 sys.path.append("/.../src")
@@ -14,15 +15,23 @@ class TestStocksFetcher(unittest.TestCase):
     Defines the TestStocksFetcher class which tests the StocksFetcher class.
     """
 
+    data_path = "./test/data/"
+
+    def init_stocks_fetcher(self):
+        """
+        Tests the StocksFetcher class instantiation with the local test data.
+        """
+        return StocksFetcher(provider=LocalFileProvider(self.data_path))
+
     def test_fetch_single_ticker(self):
         """
         Tests the fetch_stocks_data method with a single ticker.
         """
-        start_str = "20230301"
-        end_str = "20230302"
-        ticker = "AAPL"
+        start_str = "20221201"
+        end_str = "20221202"
+        ticker = "MSFT"
         tickers_str = [ticker]
-        sf = StocksFetcher()
+        sf = self.init_stocks_fetcher()
         res = sf.fetch_stocks_data(tickers_str, start_str, end_str)
         self.assertFalse(res.empty)
         self.assertTrue(len(res.index) > 250)
@@ -32,10 +41,10 @@ class TestStocksFetcher(unittest.TestCase):
         """
         Tests the fetch_stocks_data method with multiple tickers.
         """
-        start_str = "20230301"
-        end_str = "20230302"
-        tickers_str = ["AAPL", "MSFT", "WMT"]
-        sf = StocksFetcher()
+        start_str = "20221201"
+        end_str = "20221202"
+        tickers_str = ["MSFT", "PG", "WMT"]
+        sf = self.init_stocks_fetcher()
         res = sf.fetch_stocks_data(tickers_str, start_str, end_str)
         self.assertFalse(res.empty)
         self.assertTrue(len(res.index) > 250)
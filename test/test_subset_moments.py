@@ -0,0 +1,93 @@
+"""
+This module is responsible for testing the subset moments.
+"""
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from pypfopt import expected_returns, risk_models
+
+from src.rolling_moments import RollingMoments
+from src.subset_moments import SubsetMoments
+
+sys.path.append("/.../src")
+
+
+class TestSubsetMoments(unittest.TestCase):
+    """
+    Defines the TestSubsetMoments class which tests the SubsetMoments
+    class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    lookback = 250
+    subset = ["PG", "MSFT", "GM"]
+
+    def assert_window_moments(self, moments, prices, date_index):
+        """
+        Auxiliary function that compares the moments of a window with the
+        PyPortfolioOpt functions.
+        """
+        window = prices[date_index - self.lookback + 1 : date_index + 1]
+        mean_returns, covariance = moments.get_moments(date_index)
+        self.assertListEqual(list(covariance.columns), list(prices.columns))
+        np.testing.assert_allclose(
+            mean_returns, expected_returns.mean_historical_return(window),
+            rtol=1e-10,
+        )
+        np.testing.assert_allclose(
+            covariance, risk_models.sample_cov(window), rtol=1e-10, atol=1e-15
+        )
+
+    def test_sliced_windows(self):
+        """
+        Tests that several subsets sliced out of a universe match the
+        moments of their own windows, and share the window and the prices of
+        the universe.
+        """
+        universe = RollingMoments(self.stocks_data, self.lookback)
+        subsets = [
+            SubsetMoments(self.stocks_data[tickers], universe)
+            for tickers in [self.subset, ["WMT"], list(self.stocks_data)]
+        ]
+        for date_index in [249, 250, 270, 300, 381]:
+            for moments in subsets:
+                self.assert_window_moments(
+                    moments, self.stocks_data[moments.tickers], date_index
+                )
+            self.assertEqual(universe.end, date_index)
+        for moments in subsets:
+            self.assertNotIn("values", vars(moments))
+
+    def test_missing_prices(self):
+        """
+        Tests windows with missing prices in the subset, and in the universe
+        only.
+        """
+        prices = self.stocks_data.copy()
+        prices.iloc[255, prices.columns.get_loc("WMT")] = np.nan
+        universe = RollingMoments(prices, self.lookback)
+        clean = SubsetMoments(prices[self.subset], universe)
+        missing = SubsetMoments(prices[["WMT", "PG"]], universe)
+        for date_index in [249, 260, 300, 381]:
+            self.assert_window_moments(clean, prices[clean.tickers],
+                                       date_index)
+            self.assert_window_moments(missing, prices[missing.tickers],
+                                       date_index)
+
+    def test_invalid_subset(self):
+        """
+        Tests subsets which are not part of the universe.
+        """
+        universe = RollingMoments(self.stocks_data[self.subset], self.lookback)
+        with self.assertRaises(ValueError):
+            SubsetMoments(self.stocks_data[["WMT"]], universe)
+        with self.assertRaises(ValueError):
+            SubsetMoments(self.stocks_data[self.subset][1:], universe)
+        with self.assertRaises(ValueError):
+            SubsetMoments(self.stocks_data[self.subset], universe).append(
+                self.stocks_data[self.subset][-1:]
+            )
@@ -0,0 +1,67 @@
+"""
+This module is responsible for testing the synthetic market generator.
+"""
+import sys
+import unittest
+
+import numpy as np
+
+from src.synthetic_market import TRADING_DAYS_PER_YEAR, SyntheticMarket
+
+sys.path.append("/.../src")
+
+
+class TestSyntheticMarket(unittest.TestCase):
+    """
+    Defines the TestSyntheticMarket class which tests the SyntheticMarket
+    class.
+    """
+
+    def test_generate_prices(self):
+        """
+        Tests the size, dates and tickers of the prices.
+        """
+        prices = SyntheticMarket(12, 2, lookback=60).generate_prices()
+        self.assertEqual(prices.shape, (2 * TRADING_DAYS_PER_YEAR + 60, 12))
+        self.assertEqual(prices.columns[0], "S0000")
+        self.assertEqual(prices.columns[-1], "S0011")
+        self.assertTrue(prices.index.is_monotonic_increasing)
+        self.assertTrue((prices.index.dayofweek < 5).all())
+        self.assertFalse(prices.isna().any().any())
+        self.assertTrue((prices > 0).all().all())
+
+    def test_deterministic(self):
+        """
+        Tests that a seed always gives the same prices, and another seed
+        different ones.
+        """
+        prices = SyntheticMarket(5, 1, seed=3).generate_prices()
+        np.testing.assert_array_equal(
+            prices, SyntheticMarket(5, 1, seed=3).generate_prices()
+        )
+        self.assertFalse(np.array_equal(
+            prices, SyntheticMarket(5, 1, seed=4).generate_prices()
+        ))
+
+    def test_correlated_returns(self):
+        """
+        Tests that the returns are positively correlated, with a realistic
+        volatility.
+        """
+        prices = SyntheticMarket(40, 4).generate_prices()
+        returns = np.log(prices).diff().dropna()
+        correlations = returns.corr().to_numpy()
+        off_diagonal = correlations[np.triu_indices(40, 1)]
+        self.assertGreater(off_diagonal.mean(), 0.2)
+        self.assertLess(off_diagonal.mean(), 0.6)
+        volatility = returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+        self.assertTrue(volatility.between(0.05, 0.5).all())
+
+    def test_invalid_size(self):
+        """
+        Tests that empty markets are rejected.
+        """
+        with self.assertRaises(ValueError):
+            SyntheticMarket(0, 1)
+        with self.assertRaises(ValueError):
+            SyntheticMarket(5, 0)
@@ -0,0 +1,43 @@
+"""
+This module is responsible for testing the exchange trading calendar.
+"""
+import sys
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from src.trading_calendar import count_trading_days, get_lookback_start
+
+sys.path.append("/.../src")
+
+
+class TestTradingCalendar(unittest.TestCase):
+    """
+    Defines the TestTradingCalendar class which tests the trading calendar
+    functions.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+
+    def test_count_trading_days(self):
+        """
+        Tests that the calendar matches the trading days of the test data.
+        """
+        dt_start = self.stocks_data.index[0]
+        dt_end = self.stocks_data.index[-1] + pd.Timedelta(days=1)
+        self.assertEqual(count_trading_days(dt_start, dt_end),
+                         len(self.stocks_data.index))
+
+    def test_get_lookback_start(self):
+        """
+        Tests that the lookback start leaves the window plus the buffer of
+        trading days before the beginning date.
+        """
+        beginning_date = datetime(2022, 9, 15)
+        for lookback in [20, 250]:
+            dt_start = get_lookback_start(beginning_date, lookback)
+            self.assertEqual(count_trading_days(dt_start, beginning_date),
+                             lookback + 5)
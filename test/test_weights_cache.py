@@ -0,0 +1,131 @@
+"""
+This module is responsible for testing the on-disk cache of optimized
+weights.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.weights_cache import WeightsCache
+
+sys.path.append("/.../src")
+
+
+def write_entries(cache_dir: str, worker: int) -> int:
+    """
+    Auxiliary function that writes and reads entries from another process.
+    """
+    cache = WeightsCache(cache_dir, max_bytes=4000)
+    read = 0
+    for idx in range(50):
+        weights = OrderedDict([("MSFT", worker / 10), ("PG", idx / 100)])
+        cache.put(f"{worker}-{idx}", weights)
+        for key in [f"{worker}-{idx}", f"{1 - worker}-{idx}"]:
+            entry = cache.get(key)
+            if entry is not None:
+                assert list(entry) == ["MSFT", "PG"]
+                read += 1
+    return read
+
+
+class TestWeightsCache(unittest.TestCase):
+    """
+    Defines the TestWeightsCache class which tests the WeightsCache class.
+    """
+
+    stocks_data = pd.read_csv("./test/data/stocks_data.csv",
+                              parse_dates=["Date"],
+                              index_col="Date")
+    weights = OrderedDict([("MSFT", 0.25), ("PG", 0.75), ("WMT", 0.0)])
+
+    def setUp(self):
+        """
+        Sets up a temporary cache directory.
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = self.tmp_dir
+
+    def tearDown(self):
+        """
+        Removes the temporary cache directory.
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_keys(self):
+        """
+        Tests that keys only depend on the window contents, the optimizer
+        and the settings.
+        """
+        window = self.stocks_data[100:350]
+        digest = WeightsCache.get_window_digest(window)
+        self.assertEqual(digest,
+                         WeightsCache.get_window_digest(window.copy()))
+        key = WeightsCache.get_key(digest, "msr", {"solver": None})
+        self.assertEqual(key, WeightsCache.get_key(digest, "msr",
+                                                   {"solver": None}))
+        changed = window.copy()
+        changed.iloc[-1, 0] += 1e-9
+        for other_key in [
+            WeightsCache.get_key(digest, "mv", {"solver": None}),
+            WeightsCache.get_key(digest, "msr", {"solver": "OSQP"}),
+            WeightsCache.get_key(WeightsCache.get_window_digest(changed),
+                                 "msr", {"solver": None}),
+            WeightsCache.get_key(
+                WeightsCache.get_window_digest(self.stocks_data[101:351]),
+                "msr", {"solver": None},
+            ),
+        ]:
+            self.assertNotEqual(key, other_key)
+
+    def test_put_and_get(self):
+        """
+        Tests that stored weights are read back in the same order.
+        """
+        cache = WeightsCache(self.cache_dir)
+        self.assertIsNone(cache.get("missing"))
+        cache.put("key", self.weights)
+        self.assertEqual(cache.get("key"), self.weights)
+        self.assertListEqual(list(cache.get("key")), list(self.weights))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+        self.assertEqual(WeightsCache(self.cache_dir).get("key"),
+                         self.weights)
+
+    def test_lru_eviction(self):
+        """
+        Tests that the least recently used entries are evicted when the
+        cache grows beyond its maximum size.
+        """
+        cache = WeightsCache(self.cache_dir)
+        cache.put("first", self.weights)
+        entry_size = cache.size
+        cache.max_bytes = 3 * entry_size
+        for idx, key in enumerate(["first", "second", "third"]):
+            cache.put(key, self.weights)
+            os.utime(cache.get_path(key), ns=(idx, idx))
+        # reading the oldest entry makes it the most recently used
+        cache.get("first")
+        cache.put("fourth", self.weights)
+        self.assertIsNone(cache.get("second"))
+        for key in ["first", "third", "fourth"]:
+            self.assertIsNotNone(cache.get(key))
+        self.assertLessEqual(cache.get_size(), cache.max_bytes)
+
+    def test_concurrent_processes(self):
+        """
+        Tests that processes writing, reading and evicting at the same time
+        never read a partial entry and keep the cache within its bound.
+        """
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            reads = list(executor.map(write_entries, [self.cache_dir] * 2,
+                                      [0, 1]))
+        self.assertTrue(all(read >= 50 for read in reads))
+        cache = WeightsCache(self.cache_dir, max_bytes=4000)
+        cache.evict()
+        self.assertLessEqual(cache.get_size(), 4000)
+        self.assertGreater(cache.get_size(), 3000)